@@ -0,0 +1,155 @@
+"""
+Admission control: per-route concurrency limits with bounded queues.
+
+Each route named in ``ADMISSION_LIMITS`` gets a Limiter per HTTP method, so
+that writes never wait behind reads. It runs at most
+``concurrency`` requests at once and queues up to ``queue`` more, in
+arrival order, for at most ``max_wait`` seconds. A request that finds the
+queue full, or whose expected wait (from the route's recent service time)
+is already past ``max_wait``, is turned away at once, so a burst on an
+expensive route costs the rejected clients a few microseconds instead of a
+worker each. Routes without limits, such as detail reads, never wait.
+
+Waiters may be threads or coroutines: a finishing request hands its slot
+straight to the oldest waiter, whichever kind it is.
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+# Weight of the latest request in the service time average.
+SMOOTHING = 0.2
+
+
+class Rejected(Exception):
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ThreadWaiter:
+
+    def __init__(self):
+        self.event = threading.Event()
+
+    def wake(self):
+        self.event.set()
+
+
+class TaskWaiter:
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.future = self.loop.create_future()
+
+    def wake(self):
+        self.loop.call_soon_threadsafe(self.resolve)
+
+    def resolve(self):
+        if not self.future.done():
+            self.future.set_result(True)
+
+
+class Limiter:
+
+    def __init__(self, concurrency, queue=0, max_wait=1.0):
+        self.concurrency = concurrency
+        self.queue = queue
+        self.max_wait = max_wait
+        self.lock = threading.Lock()
+        self.active = 0
+        self.waiters = deque()
+        self.service_time = 0.0
+
+    def expected_wait(self):
+        # Everyone queued ahead, then this request, spread over the slots.
+        return (len(self.waiters) + 1) * self.service_time / self.concurrency
+
+    def admit(self, waiter_class):
+        """Take a slot (None) or a place in the queue (a waiter); raises Rejected."""
+        with self.lock:
+            if self.active < self.concurrency and not self.waiters:
+                self.active += 1
+                return None
+            if len(self.waiters) >= self.queue:
+                raise Rejected('queue full', self.retry_after())
+            if self.expected_wait() > self.max_wait:
+                raise Rejected('too slow', self.retry_after())
+            waiter = waiter_class()
+            self.waiters.append(waiter)
+            return waiter
+
+    def give_up(self, waiter):
+        with self.lock:
+            try:
+                self.waiters.remove(waiter)
+            except ValueError:
+                # Handed a slot just as the wait ran out: keep it.
+                return
+        raise Rejected('timed out', self.retry_after())
+
+    def acquire(self):
+        waiter = self.admit(ThreadWaiter)
+        if waiter is not None and not waiter.event.wait(self.max_wait):
+            self.give_up(waiter)
+        return time.perf_counter()
+
+    async def aacquire(self):
+        waiter = self.admit(TaskWaiter)
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter.future), self.max_wait)
+            except asyncio.TimeoutError:
+                self.give_up(waiter)
+            except asyncio.CancelledError:
+                # The client went away: leave the queue, or pass on a slot
+                # handed over meanwhile.
+                try:
+                    self.give_up(waiter)
+                except Rejected:
+                    pass
+                else:
+                    self.release(None)
+                raise
+        return time.perf_counter()
+
+    def release(self, started):
+        """Free the slot taken at ``started`` (None when nothing ran in it)."""
+        with self.lock:
+            if started is not None:
+                elapsed = time.perf_counter() - started
+                self.service_time += SMOOTHING * (elapsed - self.service_time)
+            if self.waiters:
+                # The slot passes to the next waiter; active stays the same.
+                self.waiters.popleft().wake()
+            else:
+                self.active -= 1
+
+    def retry_after(self):
+        return max(1, math.ceil(self.expected_wait()))
+
+
+LIMITERS = {}
+limiters_lock = threading.Lock()
+
+
+def get_limiter(route, method):
+    """The Limiter for ``method`` on ``route`` (a URL name), or None when it has no limits."""
+    limiter = LIMITERS.get((route, method))
+    if limiter is None:
+        config = settings.ADMISSION_LIMITS.get(route)
+        if config is None:
+            return None
+        with limiters_lock:
+            limiter = LIMITERS.setdefault((route, method), Limiter(**config))
+    return limiter
+
+
+def reset():
+    LIMITERS.clear()
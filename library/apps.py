@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+def install_search_index(using, **kwargs):
+    from library import search
+    search.install(using)
 
 
 class LibraryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'library'
+
+    def ready(self):
+        from library import db, lookups, metrics, signals  # noqa: F401
+        post_migrate.connect(install_search_index, sender=self)
+        connection_created.connect(db.configure_connection)
+        connection_created.connect(metrics.install)
@@ -0,0 +1,74 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+
+from library import cache
+
+
+def get_cache():
+    return caches[getattr(settings, 'AUTH_TOKEN_CACHE_ALIAS', 'default')]
+
+
+def cache_key(key):
+    # Never store raw tokens as cache keys, the backend may be shared.
+    return 'token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def prime(token):
+    get_cache().set(cache_key(token.key), (token.user, token))
+
+
+def forget(*keys):
+    get_cache().delete_many([cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that keeps resolved tokens in the auth cache
+    (``AUTH_TOKEN_CACHE_ALIAS``), so repeated requests skip the
+    token/user join. Entries are dropped when the token is deleted or its
+    user is saved, e.g. deactivated, and otherwise expire with the cache
+    TIMEOUT.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = get_cache().get(cache_key(key))
+        if cached is not None:
+            return cached
+
+        user, token = super().authenticate_credentials(key)
+        prime(token)
+        return user, token
+
+    async def aauthenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        try:
+            key = auth[1].decode() if len(auth) == 2 else None
+        except UnicodeError:
+            key = None
+        if key is None:
+            # Malformed header: raises the same error as the sync path.
+            return self.authenticate(request)
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        backend = get_cache()
+        cached = await cache.call(backend, backend.get, cache_key(key))
+        if cached is not None:
+            return cached
+
+        model = self.get_model()
+        try:
+            token = await model.objects.select_related('user').aget(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        await cache.call(backend, prime, token)
+        return token.user, token
@@ -0,0 +1,118 @@
+import os
+import random
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from django.db import connection, transaction
+from library import stats, versions
+from library.models import Author, Books
+
+WORDS = (
+    'night', 'river', 'garden', 'shadow', 'glass', 'winter', 'silent', 'house',
+    'golden', 'city', 'secret', 'storm', 'forest', 'letter', 'ocean', 'memory',
+    'paper', 'iron', 'summer', 'crown', 'empire', 'bridge', 'stone', 'wolf',
+)
+FIRST_NAMES = (
+    'Anna', 'Ivan', 'Maria', 'John', 'Olga', 'Peter', 'Sara', 'Leo', 'Nina',
+    'Omar', 'Elena', 'Jacob', 'Lucia', 'Mark', 'Irene', 'Paul', 'Rosa', 'Adam',
+)
+# Most books have one author, a few are collaborations.
+AUTHORS_PER_BOOK = (1, 1, 1, 1, 1, 1, 2, 2, 3, 4)
+
+
+@contextmanager
+def temporary_database(verbosity=0, on_disk=False):
+    """
+    Run against a throwaway copy of the default database, the same way the
+    test runner does, so benchmarks never touch real data. ``on_disk`` puts
+    a SQLite copy in a file, for benchmarks that write from several threads.
+    """
+    creation = connection.creation
+    old_name = connection.settings_dict['NAME']
+    test_settings = connection.settings_dict['TEST']
+    old_test_name = test_settings.get('NAME')
+    directory = None
+    if on_disk and connection.vendor == 'sqlite':
+        directory = tempfile.TemporaryDirectory()
+        test_settings['NAME'] = os.path.join(directory.name, 'bench.sqlite3')
+    creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield connection
+    finally:
+        creation.destroy_test_db(old_name, verbosity=verbosity)
+        test_settings['NAME'] = old_test_name
+        if directory is not None:
+            directory.cleanup()
+
+
+def seed_catalog(books, authors=None, seed=0, batch_size=5000):
+    """
+    Bulk-insert ``books`` books and ``authors`` authors with a realistic
+    many-to-many fan-out. Returns the number of author links created.
+    """
+    rng = random.Random(seed)
+    authors = authors or max(1, books // 5)
+    through = Books.author.through
+    start = date(1950, 1, 1)
+
+    with transaction.atomic():
+        Author.objects.bulk_create(
+            (
+                Author(
+                    name=rng.choice(FIRST_NAMES),
+                    surname=f'Surname{i}',
+                    email=f'author{i}@example.com',
+                    phone=rng.randint(10 ** 8, 10 ** 9),
+                )
+                for i in range(authors)
+            ),
+            batch_size=batch_size,
+        )
+        Books.objects.bulk_create(
+            (
+                Books(
+                    title=f'{rng.choice(WORDS).title()} {rng.choice(WORDS)} {i}',
+                    book_pages=rng.randint(40, 1200),
+                    genre=rng.randint(1, 20),
+                    release_date=start + timedelta(days=rng.randint(0, 365 * 73)),
+                )
+                for i in range(books)
+            ),
+            batch_size=batch_size,
+        )
+
+        author_ids = list(Author.objects.values_list('id', flat=True))
+        links = []
+        for book_id in Books.objects.values_list('id', flat=True).iterator():
+            for author_id in rng.sample(author_ids, min(len(author_ids), rng.choice(AUTHORS_PER_BOOK))):
+                links.append(through(books_id=book_id, author_id=author_id))
+        through.objects.bulk_create(links, batch_size=batch_size)
+        stats.rebuild()
+        versions.touch(Author, Books)
+
+    return len(links)
+
+
+def seed_user(username='bench', password='bench-password'):
+    """Create (or reset) a user for authenticated benchmark requests and return its token."""
+    from django.contrib.auth import get_user_model
+    from rest_framework.authtoken.models import Token
+
+    user, _ = get_user_model().objects.get_or_create(username=username)
+    user.set_password(password)
+    user.save()
+    token, _ = Token.objects.get_or_create(user=user)
+    return token
+
+
+def timed(func, repeat=5):
+    """Call ``func`` ``repeat`` times and return (median, min) in ms."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), min(samples)
@@ -0,0 +1,262 @@
+"""
+Load generator for the REST API, used by the bench_api command.
+
+Scenarios build requests, transports send them either through Django
+in-process (``django.test.Client``) or over HTTP to a running server, and
+``run`` drives one scenario from a pool of client threads. Queries per
+request are read from the ``Server-Timing`` header InstrumentationMiddleware
+adds, so they are reported in both modes.
+"""
+import http.client
+import io
+import itertools
+import json
+import random
+import re
+import statistics
+import threading
+import time
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections
+from django.test import Client
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+
+Request = namedtuple('Request', 'method path body content_type headers')
+
+QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+    return register
+
+
+class Context:
+    """What the scenarios need to know about the target catalog."""
+
+    def __init__(self, book_ids, author_ids, token, username, password):
+        self.book_ids = book_ids
+        self.author_ids = author_ids
+        self.token = token
+        self.username = username
+        self.password = password
+        self.run_id = uuid.uuid4().hex[:8]
+        self.counter = itertools.count()
+        self.images = [make_image(index) for index in range(16)]
+
+    def unique(self, prefix):
+        return f'{prefix}-{self.run_id}-{next(self.counter)}'
+
+    def auth(self):
+        return {'Authorization': f'Token {self.token}'}
+
+
+def make_image(index):
+    from PIL import Image
+
+    # Distinct content per upload, or content-addressed storage dedupes them.
+    buffer = io.BytesIO()
+    Image.new('RGB', (400, 300), (index * 16 % 256, 90, 160)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+def get(path, headers=None):
+    return Request('GET', path, b'', None, {'Accept': 'application/json', **(headers or {})})
+
+
+def post_json(path, data, headers=None):
+    return Request(
+        'POST', path, json.dumps(data).encode(), 'application/json',
+        {'Accept': 'application/json', **(headers or {})},
+    )
+
+
+@scenario('books-list')
+def books_list(context, rng):
+    if rng.random() < 0.5:
+        return get(f'/v1/books?page_size=20&genre={rng.randint(1, 20)}')
+    return get('/v1/books?page_size=20')
+
+
+@scenario('books-list-sparse')
+def books_list_sparse(context, rng):
+    return get('/v1/books?page_size=20&fields=id,title')
+
+
+@scenario('books-detail')
+def books_detail(context, rng):
+    return get(f'/v1/books/{rng.choice(context.book_ids)}')
+
+
+@scenario('author-list')
+def author_list(context, rng):
+    return get('/v1/author?page_size=20')
+
+
+@scenario('author-detail')
+def author_detail(context, rng):
+    return get(f'/v1/author/{rng.choice(context.author_ids)}')
+
+
+@scenario('books-create')
+def books_create(context, rng):
+    return post_json('/v1/books', {
+        'title': context.unique('Bench book'),
+        'book_pages': rng.randint(40, 1200),
+        'genre': rng.randint(1, 20),
+        'release_date': '2020-01-01',
+        'author_ids': rng.sample(context.author_ids, min(2, len(context.author_ids))),
+    }, context.auth())
+
+
+@scenario('upload-image')
+def upload_image(context, rng):
+    image = SimpleUploadedFile('bench.jpg', rng.choice(context.images), 'image/jpeg')
+    return Request(
+        'POST', f'/v1/author/{rng.choice(context.author_ids)}/upload-image',
+        encode_multipart(BOUNDARY, {'image': image}), MULTIPART_CONTENT,
+        {'Accept': 'application/json', **context.auth()},
+    )
+
+
+@scenario('user-create')
+def user_create(context, rng):
+    return post_json('/create/', {'username': context.unique('bench'), 'password': 'bench-password'})
+
+
+@scenario('token')
+def token(context, rng):
+    return post_json('/token/', {'username': context.username, 'password': context.password})
+
+
+class InProcessTransport:
+    """Requests through the Django handler in this process, one client per thread."""
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def send(self, request):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = Client()
+        meta = {'HTTP_' + name.upper().replace('-', '_'): value for name, value in request.headers.items()}
+        response = client.generic(
+            request.method, request.path, request.body,
+            content_type=request.content_type or 'application/octet-stream', **meta,
+        )
+        body = b''.join(response) if response.streaming else response.content
+        return response.status_code, response.get('Server-Timing'), len(body)
+
+    def close(self):
+        connections.close_all()
+
+
+class HTTPTransport:
+    """Requests to a running server, one keep-alive connection per thread."""
+
+    def __init__(self, base_url):
+        url = urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = url.netloc
+        self.prefix = url.path.rstrip('/')
+        self.local = threading.local()
+
+    def send(self, request):
+        status, server_timing, body = self.fetch(request)
+        return status, server_timing, len(body)
+
+    def fetch(self, request):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = self.connection_class(self.netloc, timeout=60)
+        headers = dict(request.headers)
+        if request.content_type:
+            headers['Content-Type'] = request.content_type
+        try:
+            connection.request(request.method, self.prefix + request.path, body=request.body, headers=headers)
+            response = connection.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self.local.connection = None
+            raise
+        return response.status, response.getheader('Server-Timing'), body
+
+    def close(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None:
+            connection.close()
+
+
+def run(transport, name, context, requests, concurrency, seed=0):
+    """Send ``requests`` requests of scenario ``name`` from ``concurrency`` threads."""
+    build = SCENARIOS[name]
+    pending = itertools.count()
+    lock = threading.Lock()
+    latencies, queries, sizes, errors = [], [], [], []
+
+    def client(worker):
+        rng = random.Random(seed * 1000 + worker)
+        try:
+            while next(pending) < requests:
+                request = build(context, rng)
+                started = time.perf_counter()
+                try:
+                    status, server_timing, size = transport.send(request)
+                except Exception as exc:
+                    with lock:
+                        errors.append(repr(exc))
+                    continue
+                elapsed = time.perf_counter() - started
+                match = QUERIES_RE.search(server_timing or '')
+                with lock:
+                    latencies.append(elapsed)
+                    sizes.append(size)
+                    if match:
+                        queries.append(int(match.group(1)))
+                    if status >= 400:
+                        errors.append(status)
+        finally:
+            transport.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(client, range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return summarize(name, concurrency, latencies, queries, sizes, errors, elapsed)
+
+
+def summarize(name, concurrency, latencies, queries, sizes, errors, elapsed):
+    result = {
+        'scenario': name,
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': None,
+        'p50_ms': None,
+        'p95_ms': None,
+        'p99_ms': None,
+        'queries_per_request': round(statistics.mean(queries), 2) if queries else None,
+        'bytes_per_request': round(statistics.mean(sizes)) if sizes else None,
+    }
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+        result.update(
+            mean_ms=round(statistics.mean(latencies) * 1000, 2),
+            p50_ms=round(cuts[49] * 1000, 2),
+            p95_ms=round(cuts[94] * 1000, 2),
+            p99_ms=round(cuts[98] * 1000, 2),
+        )
+    if errors:
+        result['error_samples'] = sorted({str(error) for error in errors})[:5]
+    return result
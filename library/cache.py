@@ -0,0 +1,110 @@
+"""
+Response cache for the read endpoints.
+
+Cached entries are keyed on generation tokens rather than deleted one by one:
+a list response is stored under the model's list token, a detail response
+under the object's token, and invalidating a model or object just replaces
+its token with a new random one. Stale entries are never read again and age
+out through the cache's TIMEOUT and MAX_ENTRIES.
+"""
+import hashlib
+import json
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def get_cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+async def call(backend, function, *args):
+    """
+    ``function(*args)``, whose cache calls go to ``backend``, from async code.
+    Local memory never blocks, so it is called directly rather than paying
+    a thread hop per call as Django's async cache methods do; network
+    backends (Redis, Memcached) block on I/O and are called in a thread.
+    """
+    if isinstance(backend, LocMemCache):
+        return function(*args)
+    return await sync_to_async(function, thread_sensitive=False)(*args)
+
+
+def get_token(key):
+    cache = get_cache()
+    token = cache.get(key)
+    if token is None:
+        # A missing token may have been evicted after a bump, so never fall
+        # back to a fixed default: start a fresh generation instead.
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        token = cache.get(key)
+    return token
+
+
+def bump(*keys):
+    get_cache().set_many({key: uuid.uuid4().hex for key in keys}, timeout=None)
+
+
+def response_key(label, object_id, request):
+    if object_id is None:
+        generation = f'{label}:list'
+    else:
+        generation = f'{label}:{object_id}'
+    tokens = get_token(f'gen:{label}'), get_token(f'gen:{generation}')
+    # The absolute URL is part of the key because file fields render as
+    # absolute URLs built from the request host. The format is too, as the
+    # stored ETag depends on it.
+    renderer = getattr(request, 'accepted_renderer', None)
+    url = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+    return f'resp:{generation}:{tokens[0]}:{tokens[1]}:{url}:{getattr(renderer, "format", "")}'
+
+
+def store(key, data, etag=None, last_modified=None, timeout=DEFAULT_TIMEOUT):
+    if etag is None:
+        body = json.dumps(data, cls=JSONEncoder, sort_keys=True).encode()
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+    entry = {
+        'data': data,
+        'etag': etag,
+        'last_modified': int(last_modified or time.time()),
+    }
+    get_cache().set(key, entry, timeout=timeout)
+    return entry
+
+
+def fetch(key):
+    return get_cache().get(key)
+
+
+def invalidate(label, pks=()):
+    keys = [f'gen:{label}:list'] + [f'gen:{label}:{pk}' for pk in pks]
+    bump(*keys)
+    # Bump again once the transaction commits, so a response cached by a
+    # concurrent request in between from pre-commit data is discarded too.
+    transaction.on_commit(lambda: bump(*keys))
+
+
+def invalidate_all(label):
+    bump(f'gen:{label}')
+    transaction.on_commit(lambda: bump(f'gen:{label}'))
+
+
+def invalidate_objects(model, pks):
+    """Invalidate cached responses that include any of these objects."""
+    from library.models import Author, Books
+
+    pks = list(pks)
+    invalidate(model._meta.label_lower, pks)
+    if model is Author:
+        # Books embed their authors.
+        book_ids = Books.author.through.objects.filter(
+            author_id__in=pks
+        ).values_list('books_id', flat=True)
+        invalidate(Books._meta.label_lower, set(book_ids))
@@ -0,0 +1,79 @@
+"""
+Response body compression for CompressionMiddleware and the bench_formats
+command: gzip always, brotli when the ``brotli`` package is installed.
+
+Streamed bodies are flushed after every chunk, so each chunk still reaches
+the client as soon as it is produced (an NDJSON export, for one).
+"""
+import re
+import zlib
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Media types worth compressing; images and archives already are.
+COMPRESSIBLE_TYPES = re.compile(
+    r'^(text/|application/(json|javascript|xml|x-ndjson|msgpack|[\w.+-]+\+json)\b)'
+)
+
+
+def available():
+    """Supported content codings, preferred first."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encoding):
+    """The best coding both sides support for an ``Accept-Encoding`` header, or None."""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        match = re.search(r'q=([0-9.]+)', params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                continue
+        accepted[coding.strip().lower()] = quality
+    for coding in available():
+        if accepted.get(coding, accepted.get('*', 0)) > 0:
+            return coding
+    return None
+
+
+def compressible(response):
+    return bool(COMPRESSIBLE_TYPES.match(response.get('Content-Type', '')))
+
+
+def compress(content, coding):
+    if coding == 'br':
+        return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return zlib.compress(content, settings.COMPRESSION_GZIP_LEVEL, wbits=31)
+
+
+def stream_compressor(coding):
+    """(compress a chunk, finish) functions for a streamed body."""
+    if coding == 'br':
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        return lambda chunk: compressor.process(chunk) + compressor.flush(), compressor.finish
+    compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, wbits=31)
+    return lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+def compress_stream(chunks, coding):
+    compress, finish = stream_compressor(coding)
+    for chunk in chunks:
+        yield compress(chunk)
+    yield finish()
+
+
+async def acompress_stream(chunks, coding):
+    # For async iterators, which StreamingHttpResponse takes from Django 4.2.
+    compress, finish = stream_compressor(coding)
+    async for chunk in chunks:
+        yield compress(chunk)
+    yield finish()
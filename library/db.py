@@ -0,0 +1,25 @@
+import functools
+
+import django
+from django.conf import settings
+
+
+def configure_connection(sender, connection, **kwargs):
+    """
+    Apply ``SQLITE_PRAGMAS`` to each new SQLite connection, and before Django
+    5.1, which has the ``transaction_mode`` option for it, start its
+    transactions with ``SQLITE_TRANSACTION_MODE``.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    mode = getattr(settings, 'SQLITE_TRANSACTION_MODE', None)
+    if mode and django.VERSION < (5, 1):
+        # atomic() calls this to open a transaction on SQLite.
+        connection._start_transaction_under_autocommit = functools.partial(begin, connection, mode)
+
+
+def begin(connection, mode):
+    connection.cursor().execute(f'BEGIN {mode}')
@@ -0,0 +1,110 @@
+import csv
+import itertools
+import json
+import queue
+import threading
+
+import django
+from asgiref.sync import sync_to_async
+from django.db import connections
+from rest_framework.utils.encoders import JSONEncoder
+from library.serializers import BooksSerializer
+from library.serializers.values import ValuesSerializer
+
+CSV_COLUMNS = ('id', 'title', 'book_pages', 'genre', 'release_date', 'author')
+
+
+class Echo:
+    """File-like object whose write() hands back the line for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def iter_book_rows(queryset, chunk_size=2000):
+    # iterator() keeps only one chunk of books in memory, and each chunk
+    # gets its authors in one query.
+    serializer = ValuesSerializer(BooksSerializer())
+    rows = serializer.get_queryset(queryset.order_by('id')).iterator(chunk_size=chunk_size)
+    while chunk := list(itertools.islice(rows, chunk_size)):
+        yield from serializer.data(chunk)
+
+
+def ndjson_lines(queryset, chunk_size=2000):
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for row in iter_book_rows(queryset, chunk_size):
+        yield encoder.encode(row) + '\n'
+
+
+def csv_lines(queryset, chunk_size=2000):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for row in iter_book_rows(queryset, chunk_size):
+        # Authors go in a single JSON cell so the file round-trips through
+        # import_catalog without losing any author fields.
+        row['author'] = json.dumps(row['author'], cls=JSONEncoder, ensure_ascii=False)
+        yield writer.writerow([row[column] for column in CSV_COLUMNS])
+
+
+def asgi_lines(lines, chunk_size=2000):
+    """
+    ``lines`` for a response served under ASGI, whose handler iterates the
+    content on the event loop, where the ORM can't run. From Django 4.2 that
+    is an async iterator that builds each chunk of lines in a thread. Older
+    versions only iterate synchronously, so there a background thread builds
+    the chunks and the handler waits for each one: memory stays bounded, but
+    the event loop is blocked while a chunk is read.
+    """
+    if django.VERSION < (4, 2):
+        return from_thread(lines, chunk_size)
+    return in_thread(lines, chunk_size)
+
+
+async def in_thread(iterable, chunk_size):
+    iterator = iter(iterable)
+    take = sync_to_async(lambda: list(itertools.islice(iterator, chunk_size)))
+    while chunk := await take():
+        for item in chunk:
+            yield item
+
+
+def from_thread(iterable, chunk_size, buffered=2):
+    """
+    Iterate ``iterable`` in a thread of its own, ``chunk_size`` items at a
+    time, with at most ``buffered`` chunks waiting to be consumed.
+    """
+    chunks = queue.Queue(maxsize=buffered)
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def produce():
+        iterator = iter(iterable)
+        try:
+            while not stopped.is_set():
+                chunk = list(itertools.islice(iterator, chunk_size))
+                put(chunk)
+                if not chunk:
+                    break
+        except Exception as error:
+            put(error)
+        finally:
+            if hasattr(iterator, 'close'):
+                iterator.close()
+            connections.close_all()
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while chunk := chunks.get():
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield from chunk
+    finally:
+        # Also reached when the client goes away and the response is closed.
+        stopped.set()
@@ -0,0 +1,37 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+class FieldFilterBackend(BaseFilterBackend):
+    """
+    Filters the queryset from query parameters declared on the view.
+
+    ``filter_fields`` maps a query parameter to either an ORM lookup or a
+    callable ``(queryset, value) -> queryset``::
+
+        filter_fields = {
+            'title': 'title__prefix',
+            'genre': 'genre',
+        }
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        filter_fields = getattr(view, 'filter_fields', {})
+        errors = {}
+
+        for param, lookup in filter_fields.items():
+            value = request.query_params.get(param)
+            if value in (None, ''):
+                continue
+            try:
+                if callable(lookup):
+                    queryset = lookup(queryset, value)
+                else:
+                    queryset = queryset.filter(**{lookup: value})
+            except (DjangoValidationError, ValueError, TypeError):
+                errors[param] = [f'Invalid value: {value!r}.']
+
+        if errors:
+            raise ValidationError(errors)
+        return queryset
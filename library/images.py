@@ -0,0 +1,181 @@
+"""
+Background processing of author images.
+
+The upload request only stores the file; decoding, validation and thumbnail
+generation run on a small thread pool once the upload has committed. Pillow
+releases the GIL while decoding and resizing, so threads are enough.
+
+Stored images are shared by every author with the same content (see
+library.storage), so files are only deleted once no author refers to them.
+"""
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+executor = None
+
+
+def get_executor():
+    global executor
+    if executor is None:
+        executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_WORKERS', 2),
+            thread_name_prefix='author-images',
+        )
+    return executor
+
+
+def wait_for_workers():
+    """Block until queued processing has finished (benchmarks, shutdown)."""
+    global executor
+    if executor is not None:
+        executor.shutdown(wait=True)
+        executor = None
+
+
+def image_storage():
+    from library.models import Author
+    return Author._meta.get_field('image').storage
+
+
+def source_name(storage, name):
+    """The name prefix shared by a stored image and its thumbnails."""
+    digest = storage.source_digest(name)
+    return storage.addressed_name(digest) if digest else name
+
+
+def reference_count(name):
+    from library.models import Author
+
+    storage = image_storage()
+    source = source_name(storage, name)
+    if source == name:
+        return Author.objects.filter(image=name).count()
+    return Author.objects.filter(image__prefix=source).count()
+
+
+def release(*names, grace=None):
+    """
+    Delete the stored images in ``names`` that no author refers to any more,
+    along with their thumbnails. Files touched in the last ``grace`` seconds
+    (``IMAGE_GC_GRACE``) are left for ``gc_images``, as a concurrent upload of
+    the same content may be about to reference them.
+    """
+    storage = image_storage()
+    if grace is None:
+        grace = getattr(settings, 'IMAGE_GC_GRACE', 3600)
+    deleted = []
+    for name in filter(None, names):
+        if reference_count(name):
+            continue
+        if storage.exists(name) and storage.age(name) < grace:
+            continue
+        for related in storage.related_names(name):
+            storage.delete(related)
+            deleted.append(related)
+    return deleted
+
+
+def release_on_commit(*names):
+    transaction.on_commit(lambda: release(*names))
+
+
+def thumbnail_sizes():
+    return getattr(settings, 'AUTHOR_THUMBNAIL_SIZES', (64, 256, 512))
+
+
+def thumbnail_name(name, size):
+    root, _ = os.path.splitext(name)
+    return f'{root}_{size}.jpg'
+
+
+def schedule(author_id, name):
+    """Process ``name`` for the author once the current transaction commits."""
+    def submit():
+        if getattr(settings, 'IMAGE_PROCESSING_EAGER', False):
+            process_author_image(author_id, name)
+        else:
+            get_executor().submit(run_in_worker, author_id, name)
+
+    transaction.on_commit(submit)
+
+
+def run_in_worker(author_id, name):
+    try:
+        process_author_image(author_id, name)
+    except Exception:
+        logger.exception('Processing image %s of author %s failed', name, author_id)
+    finally:
+        # Worker threads get their own connection; don't leak it.
+        connection.close()
+
+
+def shared_variants(author_id, name, storage):
+    """Thumbnails already made for the same content by another author."""
+    from library.models import Author
+
+    sizes = {str(size) for size in thumbnail_sizes()}
+    candidates = (
+        Author.objects.filter(image=name).exclude(pk=author_id)
+        .values_list('image_variants', flat=True)
+    )
+    for variants in candidates:
+        if set(variants) == sizes and all(map(storage.exists, variants.values())):
+            return variants
+    return None
+
+
+def process_author_image(author_id, name, storage=None):
+    from library import cache, versions
+    from library.models import Author
+
+    storage = storage or image_storage()
+    variants = shared_variants(author_id, name, storage)
+    if variants is None:
+        variants = make_thumbnails(author_id, name, storage)
+
+    # Only touch the row if the image wasn't replaced in the meantime.
+    authors = Author.objects.filter(pk=author_id, image=name)
+    if variants is None:
+        updated = authors.update(image=None, image_variants={}, modified=timezone.now())
+        release(name, grace=0)
+    else:
+        updated = authors.update(image_variants=variants, modified=timezone.now())
+        if not updated:
+            release(name)
+    if updated:
+        cache.invalidate_objects(Author, [author_id])
+        versions.touch(Author)
+    return variants
+
+
+def make_thumbnails(author_id, name, storage):
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with storage.open(name) as handle:
+            image = Image.open(handle)
+            image.load()
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        logger.warning('Discarding invalid image %s of author %s', name, author_id)
+        return None
+
+    image = ImageOps.exif_transpose(image).convert('RGB')
+    variants = {}
+    for size in thumbnail_sizes():
+        thumbnail = image.copy()
+        thumbnail.thumbnail((size, size))
+        buffer = io.BytesIO()
+        thumbnail.save(buffer, format='JPEG', quality=85, optimize=True)
+        variants[str(size)] = storage.save(
+            thumbnail_name(name, size), ContentFile(buffer.getvalue())
+        )
+    return variants
@@ -0,0 +1,22 @@
+from django.db.models import CharField, FileField, Lookup
+
+
+class Prefix(Lookup):
+    """
+    Case-sensitive ``startswith`` written as a half-open range.
+
+    ``LIKE 'abc%'`` cannot use a plain b-tree index on SQLite (LIKE is case
+    insensitive there) and needs ``varchar_pattern_ops`` on PostgreSQL,
+    whereas ``col >= 'abc' AND col < 'abc\\U0010ffff'`` is a range scan on
+    any ordinary index.
+    """
+    lookup_name = 'prefix'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        params = [*lhs_params, self.rhs, *lhs_params, self.rhs + '\U0010ffff']
+        return f'{lhs} >= %s AND {lhs} < %s', params
+
+
+CharField.register_lookup(Prefix)
+FileField.register_lookup(Prefix)
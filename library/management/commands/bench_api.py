@@ -0,0 +1,177 @@
+import json
+import platform
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from library import images
+from library.bench import seed_catalog, seed_user, temporary_database
+from library.bench.api import SCENARIOS, Context, HTTPTransport, InProcessTransport, get, post_json, run
+from library.management.commands.bench_asgi import NO_RESPONSE_CACHE
+from library.models import Author, Books
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the API scenarios at fixed concurrency, in-process against a '
+        'seeded throwaway database or over HTTP against a running server '
+        '(--url), and write req/s, latency percentiles and queries per '
+        'request to a JSON report.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Base URL of a running server, e.g. http://127.0.0.1:8000.')
+        parser.add_argument('--books', type=int, default=10_000, help='Books to seed (in-process only).')
+        parser.add_argument('--authors', type=int, help='Authors to seed (default books / 5).')
+        parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=list(SCENARIOS))
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10])
+        parser.add_argument('--requests', type=int, default=500, help='Measured requests per scenario run.')
+        parser.add_argument('--warmup', type=int, default=20, help='Unmeasured requests before each scenario.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--username', default='bench')
+        parser.add_argument('--password', default='bench-password')
+        parser.add_argument('--no-cache', action='store_true', help='Turn the API response cache off (in-process).')
+        parser.add_argument('--output', default='bench_api.json')
+        parser.add_argument('--compare', help='A previous report to print the differences against.')
+
+    def handle(self, *args, **options):
+        if options['url']:
+            report = self.run_http(options)
+        else:
+            report = self.run_in_process(options)
+
+        with open(options['output'], 'w') as output:
+            json.dump(report, output, indent=2)
+        self.stdout.write(f'Report written to {options["output"]}')
+        if options['compare']:
+            self.compare(options['compare'], report)
+
+    def run_in_process(self, options):
+        caches = {'CACHES': NO_RESPONSE_CACHE} if options['no_cache'] else {}
+        with temporary_database(on_disk=True), tempfile.TemporaryDirectory() as media_root, override_settings(
+            DEBUG=False, ALLOWED_HOSTS=['*'], MEDIA_ROOT=media_root, SERVER_TIMING=True, **caches,
+        ):
+            self.stdout.write(f'Seeding {options["books"]} books...')
+            seed_catalog(options['books'], options['authors'], seed=options['seed'])
+            token = seed_user(options['username'], options['password'])
+            context = Context(
+                list(Books.objects.values_list('id', flat=True)),
+                list(Author.objects.values_list('id', flat=True)),
+                token.key, options['username'], options['password'],
+            )
+            try:
+                results = self.run_scenarios(InProcessTransport(), context, options)
+            finally:
+                images.wait_for_workers()
+        return self.report('in-process', options, results)
+
+    def run_http(self, options):
+        transport = HTTPTransport(options['url'])
+        try:
+            context = self.http_context(transport, options)
+        except OSError as exc:
+            raise CommandError(f'Cannot reach {options["url"]}: {exc}')
+        finally:
+            transport.close()
+        results = self.run_scenarios(transport, context, options)
+        return self.report(options['url'], options, results)
+
+    def http_context(self, transport, options):
+        # The ids come from the API itself, so any seeded server works (see
+        # the seed_catalog command).
+        context = Context([], [], None, options['username'], options['password'])
+        for path, ids in (
+            ('/v1/books?page_size=1000', context.book_ids),
+            ('/v1/author?page_size=1000', context.author_ids),
+        ):
+            ids.extend(item['id'] for item in self.fetch_json(transport, get(path))['results'])
+        if not context.book_ids or not context.author_ids:
+            raise CommandError('The server has no books or authors; run seed_catalog first.')
+        response = self.fetch_json(transport, post_json(
+            '/token/', {'username': options['username'], 'password': options['password']},
+        ))
+        context.token = response.get('token')
+        if context.token is None:
+            self.stderr.write('Could not get a token; authenticated scenarios will fail.')
+        return context
+
+    def fetch_json(self, transport, request):
+        status, _, body = transport.fetch(request)
+        try:
+            return json.loads(body)
+        except ValueError:
+            raise CommandError(f'{request.method} {request.path} returned {status}, not JSON.')
+
+    def run_scenarios(self, transport, context, options):
+        results = []
+        for name in options['scenarios']:
+            for concurrency in options['concurrency']:
+                if options['warmup']:
+                    run(transport, name, context, options['warmup'], concurrency, options['seed'])
+                result = run(transport, name, context, options['requests'], concurrency, options['seed'])
+                results.append(result)
+                self.stdout.write(self.format_result(result))
+        return results
+
+    def format_result(self, result):
+        def number(value, spec):
+            return format(value, spec) if value is not None else '-'.rjust(len(format(0, spec)))
+
+        line = (
+            f'{result["scenario"]:14} c={result["concurrency"]:<4} {result["rps"]:8.1f} req/s  '
+            f'p50 {number(result["p50_ms"], "8.2f")}  p95 {number(result["p95_ms"], "8.2f")}  '
+            f'p99 {number(result["p99_ms"], "8.2f")} ms  '
+            f'{number(result["queries_per_request"], "5.1f")} queries/req'
+        )
+        if result['errors']:
+            line += self.style.ERROR(f'  {result["errors"]} errors {result["error_samples"]}')
+        return line
+
+    def report(self, target, options, results):
+        return {
+            'meta': {
+                'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'commit': current_commit(),
+                'target': target,
+                'books': None if options['url'] else options['books'],
+                'requests': options['requests'],
+                'warmup': options['warmup'],
+                'seed': options['seed'],
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1],
+            },
+            'results': results,
+        }
+
+    def compare(self, path, report):
+        with open(path) as previous_file:
+            previous = json.load(previous_file)
+        baseline = {(result['scenario'], result['concurrency']): result for result in previous['results']}
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'Against {path} ({previous["meta"].get("commit") or "unknown commit"})'
+        ))
+        for result in report['results']:
+            before = baseline.get((result['scenario'], result['concurrency']))
+            if before is None:
+                continue
+            changes = []
+            for key, label in (('rps', 'req/s'), ('p95_ms', 'p95'), ('queries_per_request', 'queries/req')):
+                if before.get(key) and result.get(key) is not None:
+                    changes.append(f'{label} {(result[key] - before[key]) / before[key]:+.1%}')
+            self.stdout.write(f'  {result["scenario"]:14} c={result["concurrency"]:<4} ' + ', '.join(changes))
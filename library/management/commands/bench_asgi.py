@@ -0,0 +1,180 @@
+import asyncio
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.test import override_settings
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from library import views
+from library.bench import seed_catalog, temporary_database
+from library.models import Books
+
+# The same routes as library.urls, with the async views switched on.
+with override_settings(ASYNC_VIEWS=True):
+    router = DefaultRouter(trailing_slash=False)
+    router.register(r'books', views.BooksViewSet)
+    router.register(r'author', views.AuthorViewSet)
+    urlpatterns = [path('v1/', include(router.urls))]
+
+NO_RESPONSE_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'api': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    'auth': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'auth'},
+}
+
+
+def request_paths(book_ids, count, seed=0):
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            paths.append(('/v1/books', 'page_size=20'))
+        elif kind < 0.6:
+            paths.append(('/v1/books', f'genre={rng.randint(1, 20)}&page_size=20'))
+        else:
+            paths.append((f'/v1/books/{rng.choice(book_ids)}', ''))
+    return paths
+
+
+def summarize(latencies, elapsed):
+    cuts = statistics.quantiles(latencies, n=100)
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'p50': cuts[49] * 1000,
+        'p99': cuts[98] * 1000,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test the books API in-process: WSGI with a thread pool and the '
+        'sync views against ASGI on one event loop with the async views.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=20_000)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 100, 500])
+        parser.add_argument('--threads', type=int, default=8, help='WSGI worker threads.')
+        parser.add_argument(
+            '--client-delay', type=float, default=250,
+            help='Milliseconds a slow client keeps each response in flight.',
+        )
+        parser.add_argument('--cache', action='store_true', help='Keep the API response cache on.')
+
+    def handle(self, *args, **options):
+        caches = {} if options['cache'] else {'CACHES': NO_RESPONSE_CACHE}
+        with temporary_database(), override_settings(DEBUG=False, ALLOWED_HOSTS=['*'], **caches):
+            self.stdout.write(f'Seeding {options["books"]} books...')
+            seed_catalog(options['books'])
+            book_ids = list(Books.objects.values_list('id', flat=True))
+            paths = request_paths(book_ids, options['requests'])
+            delay = options['client_delay'] / 1000
+
+            for concurrency in options['concurrency']:
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f'{concurrency} concurrent clients, {delay * 1000:.0f} ms client delay'
+                ))
+                wsgi = self.run_wsgi(paths, concurrency, options['threads'], delay)
+                with override_settings(ROOT_URLCONF=__name__):
+                    asgi = self.run_asgi(paths, concurrency, delay)
+                for label, result in ((f'WSGI ({options["threads"]} threads)', wsgi), ('ASGI', asgi)):
+                    self.stdout.write(
+                        f'  {label:20} {result["rps"]:8.1f} req/s, '
+                        f'p50 {result["p50"]:8.1f} ms, p99 {result["p99"]:8.1f} ms'
+                    )
+
+    def run_wsgi(self, paths, concurrency, threads, delay):
+        application = get_wsgi_application()
+
+        def serve(path, query):
+            environ = {
+                'PATH_INFO': path, 'QUERY_STRING': query, 'wsgi.input': BytesIO(),
+                'HTTP_ACCEPT': 'application/json',
+            }
+            setup_testing_defaults(environ)
+            statuses = []
+            result = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+            try:
+                b''.join(result)
+            finally:
+                result.close()
+            # The worker thread is busy until the slow client has the body.
+            time.sleep(delay)
+            assert statuses[0].startswith('200'), statuses
+            connections.close_all()
+
+        return self.drive_threads(paths, concurrency, ThreadPoolExecutor(threads), serve)
+
+    def drive_threads(self, paths, concurrency, server, serve):
+        pending = iter(paths)
+        lock = threading.Lock()
+        latencies = []
+
+        def client():
+            while True:
+                with lock:
+                    request = next(pending, None)
+                if request is None:
+                    return
+                started = time.perf_counter()
+                server.submit(serve, *request).result()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with server, ThreadPoolExecutor(concurrency) as clients:
+            for _ in range(concurrency):
+                clients.submit(client)
+        return summarize(latencies, time.perf_counter() - started)
+
+    def run_asgi(self, paths, concurrency, delay):
+        application = get_asgi_application()
+
+        async def serve(path, query):
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+                'query_string': query.encode(), 'root_path': '', 'client': ('127.0.0.1', 0),
+                'server': ('testserver', 80), 'headers': [(b'accept', b'application/json')],
+            }
+            statuses = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.append(message['status'])
+                elif not message.get('more_body'):
+                    await asyncio.sleep(delay)
+
+            await application(scope, receive, send)
+            assert statuses == [200], statuses
+
+        async def drive():
+            pending = iter(paths)
+            latencies = []
+
+            async def client():
+                for request in pending:
+                    started = time.perf_counter()
+                    await serve(*request)
+                    latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(client() for _ in range(concurrency)))
+            return summarize(latencies, time.perf_counter() - started)
+
+        return asyncio.run(drive())
@@ -0,0 +1,105 @@
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connection, connections, transaction
+from django.db.models import F
+from django.test import override_settings
+
+from library.bench import seed_catalog, temporary_database
+from library.models import Books
+
+# Django's SQLite behaviour before library.db (journal_mode persists in the
+# file, so the baseline has to switch it back explicitly).
+SQLITE_DEFAULTS = {'journal_mode': 'delete', 'synchronous': 'full'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Run concurrent reads and writes against the configured database, '
+        'with and without persistent connections (and, on SQLite, with and '
+        'without SQLITE_PRAGMAS).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=20_000)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=500, help='Requests per thread.')
+        parser.add_argument('--write-ratio', type=float, default=0.2)
+
+    def handle(self, *args, **options):
+        # On a file, so the pragmas (WAL in particular) apply.
+        with temporary_database(on_disk=True):
+            self.stdout.write(f'Seeding {options["books"]} books...')
+            seed_catalog(options['books'])
+            self.book_ids = list(Books.objects.values_list('id', flat=True))
+            connection.close()
+            self.run_profiles(options)
+
+    def run_profiles(self, options):
+        if connection.vendor == 'sqlite':
+            pragma_profiles = (('Django defaults', SQLITE_DEFAULTS), ('SQLITE_PRAGMAS', settings.SQLITE_PRAGMAS))
+        else:
+            pragma_profiles = ((connection.vendor, {}),)
+
+        database = connections.settings['default']
+        old_max_age = database['CONN_MAX_AGE']
+        try:
+            for label, pragmas in pragma_profiles:
+                self.stdout.write(self.style.MIGRATE_HEADING(label))
+                for mode, max_age in (('connection per request', 0), ('persistent connections', 600)):
+                    database['CONN_MAX_AGE'] = max_age
+                    with override_settings(SQLITE_PRAGMAS=pragmas):
+                        result = self.run_workload(options)
+                    self.stdout.write(
+                        f'  {mode:24} {result["rps"]:8.1f} req/s, p50 {result["p50"]:7.2f} ms, '
+                        f'p99 {result["p99"]:7.2f} ms, {result["errors"]} errors'
+                    )
+        finally:
+            database['CONN_MAX_AGE'] = old_max_age
+
+    def run_workload(self, options):
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            try:
+                for _ in range(options['requests']):
+                    started = time.perf_counter()
+                    try:
+                        if rng.random() < options['write_ratio']:
+                            with transaction.atomic():
+                                Books.objects.filter(pk=rng.choice(self.book_ids)).update(
+                                    book_pages=F('book_pages') + 1
+                                )
+                        else:
+                            list(Books.objects.filter(genre=rng.randint(1, 20)).order_by('id')[:20].values())
+                            Books.objects.get(pk=rng.choice(self.book_ids))
+                    except OperationalError as exc:
+                        with lock:
+                            errors.append(exc)
+                    # What the request_finished signal does after each request.
+                    close_old_connections()
+                    with lock:
+                        latencies.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['threads']) as executor:
+            list(executor.map(worker, range(options['threads'])))
+        elapsed = time.perf_counter() - started
+
+        cuts = statistics.quantiles(latencies, n=100)
+        return {
+            'rps': len(latencies) / elapsed,
+            'p50': cuts[49] * 1000,
+            'p99': cuts[98] * 1000,
+            'errors': len(errors),
+        }
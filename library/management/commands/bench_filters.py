@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from library.bench import seed_catalog, temporary_database, timed
+from library.filters import FieldFilterBackend
+from library.models import Author, Books
+from library.views import AuthorViewSet, BooksViewSet
+
+SCENARIOS = (
+    (BooksViewSet, {'title': 'Night'}),
+    (BooksViewSet, {'author': 'Anna'}),
+    (BooksViewSet, {'released_after': '1990-01-01', 'released_before': '1990-03-01'}),
+    (BooksViewSet, {'genre': '7'}),
+    (BooksViewSet, {'genre': '7', 'released_after': '2000-01-01', 'released_before': '2001-01-01'}),
+    (AuthorViewSet, {'surname': 'Surname123'}),
+    (AuthorViewSet, {'email': 'author42@example.com'}),
+)
+
+
+class Command(BaseCommand):
+    help = 'Print query plans and timings for the list filters on a seeded catalog.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--compare', action='store_true',
+            help='Drop the filter indexes afterwards and run the scenarios again.',
+        )
+
+    def handle(self, *args, **options):
+        with temporary_database():
+            self.stdout.write(f'Seeding {options["books"]} books...')
+            links = seed_catalog(options['books'])
+            self.stdout.write(f'{Author.objects.count()} authors, {links} author links\n')
+
+            self.run_scenarios(options['repeat'])
+            if options['compare']:
+                self.drop_indexes()
+                self.stdout.write(self.style.WARNING('\nWithout filter indexes:'))
+                self.run_scenarios(options['repeat'])
+
+    def run_scenarios(self, repeat):
+        factory = APIRequestFactory()
+        backend = FieldFilterBackend()
+
+        for viewset, params in SCENARIOS:
+            view = viewset()
+            request = Request(factory.get('/', params))
+            queryset = backend.filter_queryset(request, viewset.queryset.model.objects.all(), view)
+            page = queryset.order_by('id')[:100]
+
+            median, best = timed(lambda: list(page.all()), repeat)
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{viewset.__name__} {params}'))
+            self.stdout.write(f'  median {median:.2f} ms, best {best:.2f} ms, rows {len(page)}')
+            for line in page.explain().splitlines():
+                self.stdout.write(f'  {line}')
+
+    def drop_indexes(self):
+        with connection.schema_editor() as editor:
+            for model in (Books, Author):
+                for index in model._meta.indexes:
+                    editor.remove_index(model, index)
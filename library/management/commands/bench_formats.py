@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from library import compression
+from library.bench import seed_catalog, temporary_database, timed
+from library.models import Books
+from library.renderers import ColumnarJSONRenderer, FastJSONRenderer, MessagePackRenderer, msgpack
+from library.serializers import BooksSerializer
+from library.serializers.books import AUTHORS
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the response formats on pages of seeded books: bytes as '
+        'rendered and compressed, and the time to render and to compress.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=5_000)
+        parser.add_argument('--rows', type=int, nargs='+', default=[20, 100, 1000])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        renderers = [JSONRenderer(), FastJSONRenderer(), ColumnarJSONRenderer()]
+        if msgpack is not None:
+            renderers.append(MessagePackRenderer())
+        else:
+            self.stdout.write(self.style.WARNING('msgpack is not installed; skipping MessagePack.'))
+        codings = compression.available()[::-1]
+
+        with temporary_database():
+            self.stdout.write(f'Seeding {options["books"]} books...')
+            seed_catalog(options['books'])
+            context = {'request': APIRequestFactory().get('/v1/books')}
+            for rows in options['rows']:
+                books = Books.objects.prefetch_related(AUTHORS).order_by('id')[:rows]
+                data = {
+                    'count': options['books'], 'next': 'http://testserver/v1/books?cursor=cD0xMDA%3D',
+                    'previous': None, 'results': BooksSerializer(books, many=True, context=context).data,
+                }
+                self.stdout.write(self.style.MIGRATE_HEADING(f'{rows} books'))
+                self.stdout.write(f'  {"format":22} {"bytes":>10} ' + ' '.join(
+                    f'{coding:>8} {coding + " ms":>8}' for coding in codings
+                ) + f' {"render ms":>10}')
+                for renderer in renderers:
+                    self.report(renderer, data, codings, options['repeat'])
+
+    def report(self, renderer, data, codings, repeat):
+        body = renderer.render(data, renderer.media_type)
+        render_ms, _ = timed(lambda: renderer.render(data, renderer.media_type), repeat)
+        columns = []
+        for coding in codings:
+            compressed = compression.compress(body, coding)
+            compress_ms, _ = timed(lambda: compression.compress(body, coding), repeat)
+            columns.append(f'{len(compressed):8,} {compress_ms:8.2f}')
+        self.stdout.write(f'  {type(renderer).__name__:22} {len(body):10,} {" ".join(columns)} {render_ms:10.2f}')
@@ -0,0 +1,107 @@
+import asyncio
+import os
+import shutil
+import tempfile
+from wsgiref.util import FileWrapper, setup_testing_defaults
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.test import override_settings
+from django.urls import re_path
+from django.views.static import serve
+
+from library.bench import timed
+from library.views.media import serve_media
+
+SIZES = {'16k': 16 * 2 ** 10, '1m': 2 ** 20, '32m': 32 * 2 ** 20}
+RANGE = 'bytes=0-65535'
+
+
+def legacy_serve(request, path):
+    # What django.conf.urls.static() routed MEDIA_URL to.
+    return serve(request, path, document_root=settings.MEDIA_ROOT)
+
+
+urlpatterns = [
+    re_path(r'^legacy/(?P<path>.+)$', legacy_serve),
+    re_path(r'^media/(?P<path>.+)$', serve_media),
+]
+
+
+def wsgi_get(application, path, **headers):
+    environ = {'PATH_INFO': path, 'wsgi.file_wrapper': FileWrapper, **headers}
+    setup_testing_defaults(environ)
+    result = application(environ, lambda status, headers, exc_info=None: None)
+    try:
+        return sum(map(len, result))
+    finally:
+        getattr(result, 'close', lambda: None)()
+
+
+def asgi_get(application, path, **headers):
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'query_string': b'', 'root_path': '', 'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+        'headers': [(name[5:].lower().replace('_', '-').encode(), value.encode()) for name, value in headers.items()],
+    }
+    received = 0
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal received
+        if message['type'] == 'http.response.body':
+            received += len(message.get('body', b''))
+
+    asyncio.run(application(scope, receive, send))
+    return received
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare media throughput of django.views.static.serve with '
+        'library.views.media under WSGI and ASGI.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', choices=SIZES, default=list(SIZES))
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        media_root = tempfile.mkdtemp()
+        try:
+            for label in options['sizes']:
+                with open(os.path.join(media_root, f'{label}.bin'), 'wb') as handle:
+                    handle.write(os.urandom(SIZES[label]))
+            with override_settings(MEDIA_ROOT=media_root, ROOT_URLCONF=__name__, DEBUG=False, ALLOWED_HOSTS=['*']):
+                self.run_scenarios(options)
+        finally:
+            shutil.rmtree(media_root)
+
+    def run_scenarios(self, options):
+        wsgi = get_wsgi_application()
+        asgi = get_asgi_application()
+        scenarios = (
+            ('static.serve (WSGI)', wsgi_get, wsgi, '/legacy/', {}, None),
+            ('FileResponse (WSGI)', wsgi_get, wsgi, '/media/', {}, None),
+            ('FileResponse (ASGI)', asgi_get, asgi, '/media/', {}, None),
+            (f'range {RANGE} (WSGI)', wsgi_get, wsgi, '/media/', {'HTTP_RANGE': RANGE}, None),
+            ('X-Accel-Redirect (WSGI)', wsgi_get, wsgi, '/media/', {}, 'x-accel-redirect'),
+        )
+        for label in options['sizes']:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{label} file'))
+            for name, get, application, prefix, headers, accel in scenarios:
+                with override_settings(MEDIA_ACCEL_REDIRECT=accel):
+                    path = f'{prefix}{label}.bin'
+                    received = get(application, path, **headers)
+                    median, best = timed(lambda: get(application, path, **headers), options['repeat'])
+                throughput = received / 2 ** 20 / (median / 1000) if received else 0
+                self.stdout.write(
+                    f'  {name:28} median {median:8.2f} ms, best {best:8.2f} ms, '
+                    f'{received / 2 ** 10:9.0f} KiB, {throughput:8.1f} MiB/s'
+                )
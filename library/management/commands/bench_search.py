@@ -0,0 +1,40 @@
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+
+from library.bench import seed_catalog, temporary_database, timed
+from library.models import Books
+from library.search import fts_available, search_books
+
+QUERIES = ('night', 'golden river', 'anna', 'win sto', 'summer 4217')
+
+
+class Command(BaseCommand):
+    help = 'Time /v1/books/search queries on a seeded catalog, with and without FTS5.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=200_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--limit', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with temporary_database():
+            self.stdout.write(f'Seeding {options["books"]} books...')
+            seed_catalog(options['books'])
+            queryset = Books.objects.prefetch_related('author')
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f'FTS5 (available: {fts_available()})'))
+            self.run_queries(queryset, options)
+
+            self.stdout.write(self.style.MIGRATE_HEADING('LIKE fallback'))
+            with mock.patch('library.search.fts_available', return_value=False):
+                self.run_queries(queryset, options)
+
+    def run_queries(self, queryset, options):
+        for query in QUERIES:
+            median, best = timed(
+                lambda: search_books(queryset, query, options['limit']),
+                options['repeat'],
+            )
+            hits = len(search_books(queryset, query, options['limit']))
+            self.stdout.write(f'  {query!r:16} median {median:8.2f} ms, best {best:8.2f} ms, hits {hits}')
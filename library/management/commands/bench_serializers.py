@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from library import renderers
+from library.bench import seed_catalog, temporary_database, timed
+from library.models import Author, Books
+from library.renderers import FastJSONRenderer
+from library.serializers import AuthorSerializer, BooksSerializer
+from library.serializers.books import AUTHORS
+from library.serializers.values import ValuesSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare rows/s of the model serializers against ValuesSerializer '
+        '(fetch and serialize), and of JSONRenderer against FastJSONRenderer.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=20_000)
+        parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with temporary_database():
+            self.stdout.write(f'Seeding {options["books"]} books...')
+            seed_catalog(options['books'])
+            context = {'request': APIRequestFactory().get('/v1/books')}
+            targets = (
+                ('books', BooksSerializer, Books.objects.prefetch_related(AUTHORS)),
+                ('authors', AuthorSerializer, Author.objects.all()),
+            )
+            if renderers.orjson is None:
+                self.stdout.write(self.style.WARNING('orjson is not installed; FastJSONRenderer falls back to json.'))
+            for label, serializer_class, queryset in targets:
+                for rows in options['rows']:
+                    self.stdout.write(self.style.MIGRATE_HEADING(f'{rows} {label}'))
+                    self.run(serializer_class, queryset.order_by('id')[:rows], rows, context, options['repeat'])
+
+    def run(self, serializer_class, queryset, rows, context, repeat):
+        def model_serializer():
+            return serializer_class(list(queryset.all()), many=True, context=context).data
+
+        def values_serializer():
+            values = ValuesSerializer(serializer_class(context=context))
+            return values.data(list(values.get_queryset(queryset.all())))
+
+        data = model_serializer()
+        self.report('ModelSerializer', model_serializer, rows, repeat)
+        self.report('ValuesSerializer', values_serializer, rows, repeat)
+        self.report('JSONRenderer', lambda: JSONRenderer().render(data), rows, repeat)
+        self.report('FastJSONRenderer', lambda: FastJSONRenderer().render(data), rows, repeat)
+
+    def report(self, label, func, rows, repeat):
+        median, _ = timed(func, repeat)
+        self.stdout.write(f'  {label:18} {rows / median * 1000:12,.0f} rows/s  (median {median:8.2f} ms)')
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from library import images
+from library.models import Author
+
+# Where images were stored before content-addressed storage.
+LEGACY_DIRECTORY = 'uploads/recipe'
+
+
+class Command(BaseCommand):
+    help = 'Delete stored author images and thumbnails that no author refers to.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int,
+            help='Keep files touched in the last GRACE seconds. Defaults to IMAGE_GC_GRACE.',
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        storage = images.image_storage()
+        grace = options['grace']
+        if grace is None:
+            grace = getattr(settings, 'IMAGE_GC_GRACE', 3600)
+
+        referenced = set()
+        for name, variants in Author.objects.exclude(image='').exclude(image=None).values_list('image', 'image_variants'):
+            referenced.add(name)
+            referenced.add(images.source_name(storage, name))
+            referenced.update(variants.values())
+
+        deleted = kept = 0
+        for directory in (storage.prefix, LEGACY_DIRECTORY):
+            for name in storage.walk(directory):
+                if name in referenced or images.source_name(storage, name) in referenced:
+                    kept += 1
+                    continue
+                if storage.age(name) < grace:
+                    kept += 1
+                    continue
+                if options['verbosity'] > 1:
+                    self.stdout.write(name)
+                if not options['dry_run']:
+                    storage.delete(name)
+                deleted += 1
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(f'{verb} {deleted} files, kept {kept}.')
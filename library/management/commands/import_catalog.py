@@ -0,0 +1,231 @@
+import csv
+import json
+import os
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from library import cache, stats, versions
+from library.models import Author, Books
+from library.serializers import CatalogBookSerializer
+
+BOOK_FIELDS = ('book_pages', 'genre', 'release_date', 'modified')
+AUTHOR_FIELDS = ('email', 'phone', 'fb_name', 'modified')
+MAX_REPORTED_ERRORS = 20
+
+
+class Lines:
+    """
+    The decoded lines of a file opened in binary mode, keeping the line
+    number and byte offset after the last line read, for checkpoints.
+    """
+
+    def __init__(self, handle, line_number=0):
+        self.handle = handle
+        self.offset = handle.tell()
+        self.line_number = line_number
+
+    def __iter__(self):
+        for line in iter(self.handle.readline, b''):
+            self.offset += len(line)
+            self.line_number += 1
+            yield line.decode('utf-8')
+
+
+def read_ndjson(lines, header=None):
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield lines.line_number, json.loads(line), lines.offset
+        except ValueError as exc:
+            yield lines.line_number, exc, lines.offset
+
+
+def read_csv(lines, header=None):
+    # The author column holds a JSON array, as written by
+    # /v1/books/export?type=csv. ``header`` is given when resuming past it.
+    for row in csv.DictReader(lines, fieldnames=header):
+        try:
+            row['author'] = json.loads(row.get('author') or '[]')
+        except ValueError as exc:
+            yield lines.line_number, exc, lines.offset
+        else:
+            yield lines.line_number, row, lines.offset
+
+
+def read_header(handle):
+    header = next(csv.reader(Lines(handle)), None)
+    handle.seek(0)
+    return header
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream a CSV or NDJSON catalog dump into the database, upserting '
+        'authors on (name, surname) and books on title.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=('csv', 'ndjson'), help='Defaults to the file extension.')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Skip the rows committed by a previous interrupted run.',
+        )
+        parser.add_argument('--checkpoint', help='Defaults to <path>.checkpoint.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in ('csv', 'ndjson', 'jsonl'):
+            raise CommandError('Cannot tell the file format, pass --format.')
+        reader = read_csv if file_format == 'csv' else read_ndjson
+
+        checkpoint = options['checkpoint'] or f'{path}.checkpoint'
+        position = self.read_checkpoint(checkpoint) if options['resume'] else {}
+        done = position.get('rows', 0)
+        if done:
+            self.stdout.write(f'Resuming after {done} rows')
+
+        self.imported = self.skipped = 0
+        # Reused for every row: building serializer fields costs far more
+        # than validating a row.
+        self.serializer = CatalogBookSerializer()
+        started = time.monotonic()
+        with open(path, 'rb') as handle:
+            if 'offset' in position:
+                # Straight to the first row not yet imported.
+                header = read_header(handle) if reader is read_csv else None
+                handle.seek(position['offset'])
+                rows = reader(Lines(handle, position['line']), header)
+            else:
+                # Checkpoints from before offsets were recorded count rows only.
+                rows = islice(reader(Lines(handle)), done, None)
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                self.import_batch(batch)
+                done += len(batch)
+                line_number, _, offset = batch[-1]
+                self.write_checkpoint(checkpoint, {'rows': done, 'offset': offset, 'line': line_number})
+
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'{done} rows read, {self.imported} imported, {self.skipped} skipped '
+                    f'({self.imported / elapsed:.0f} rows/s)'
+                )
+
+        # The upserts send no signals; recount once rather than per batch.
+        stats.rebuild()
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {self.imported} books in {elapsed:.1f}s '
+            f'({self.imported / elapsed if elapsed else 0:.0f} rows/s), skipped {self.skipped}'
+        ))
+
+    def read_checkpoint(self, checkpoint):
+        """Rows done, with the byte offset and line number after them."""
+        try:
+            with open(checkpoint) as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return {}
+
+    def write_checkpoint(self, checkpoint, position):
+        # Written only after the batch has committed, so a crash can at
+        # worst replay one batch, which the upserts make harmless.
+        with open(f'{checkpoint}.tmp', 'w') as handle:
+            json.dump(position, handle)
+        os.replace(f'{checkpoint}.tmp', checkpoint)
+
+    def validate(self, batch):
+        books = {}
+        for line_number, row, _ in batch:
+            if isinstance(row, Exception):
+                self.report(line_number, str(row))
+                continue
+            try:
+                data = self.serializer.run_validation(row)
+            except ValidationError as exc:
+                self.report(line_number, json.dumps(exc.detail))
+                continue
+            # Later rows win when a title repeats inside a batch.
+            books[data['title']] = data
+        return list(books.values())
+
+    def report(self, line_number, message):
+        self.skipped += 1
+        if self.skipped <= MAX_REPORTED_ERRORS:
+            self.stderr.write(f'line {line_number}: {message}')
+        elif self.skipped == MAX_REPORTED_ERRORS + 1:
+            self.stderr.write('further errors are not shown')
+
+    def import_batch(self, batch):
+        books = self.validate(batch)
+        if not books:
+            return
+
+        authors = {}
+        for book in books:
+            for author in book.get('author', ()):
+                authors[(author['name'], author['surname'])] = author
+
+        with transaction.atomic():
+            author_ids = self.upsert_authors(authors)
+            book_ids = self.upsert_books(books)
+
+            through = Books.author.through
+            through.objects.filter(books_id__in=book_ids.values()).delete()
+            through.objects.bulk_create(
+                [
+                    through(books_id=book_ids[book['title']], author_id=author_ids[(author['name'], author['surname'])])
+                    for book in books
+                    for author in book.get('author', ())
+                ],
+                ignore_conflicts=True,
+            )
+            cache.invalidate_all(Author._meta.label_lower)
+            cache.invalidate_all(Books._meta.label_lower)
+            versions.touch(Author, Books)
+        self.imported += len(books)
+
+    def upsert_authors(self, authors):
+        if not authors:
+            return {}
+        Author.objects.bulk_create(
+            [Author(**author) for author in authors.values()],
+            update_conflicts=True,
+            unique_fields=('name', 'surname'),
+            update_fields=AUTHOR_FIELDS,
+        )
+        # Upserts don't return primary keys, so read them back in one query.
+        names = {name for name, _ in authors}
+        surnames = {surname for _, surname in authors}
+        return {
+            (name, surname): pk
+            for name, surname, pk in Author.objects.filter(
+                name__in=names, surname__in=surnames
+            ).values_list('name', 'surname', 'id')
+            if (name, surname) in authors
+        }
+
+    def upsert_books(self, books):
+        Books.objects.bulk_create(
+            [Books(**{key: value for key, value in book.items() if key != 'author'}) for book in books],
+            update_conflicts=True,
+            unique_fields=('title',),
+            update_fields=BOOK_FIELDS,
+        )
+        return dict(
+            Books.objects.filter(
+                title__in=[book['title'] for book in books]
+            ).values_list('title', 'id')
+        )
@@ -0,0 +1,79 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter, so that nothing is imported yet.
+BOOT = '''
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urls = time.perf_counter()
+warm_up = 0.0
+if {warm_up}:
+    from library.warmup import warm_up as run
+    warm_up = run()
+print(json.dumps({{
+    'setup': setup - started, 'urls': urls - setup, 'warm_up': warm_up, 'modules': len(sys.modules),
+}}))
+'''
+
+
+def parse_importtime(lines):
+    """(module, self µs, cumulative µs) from ``python -X importtime`` output."""
+    for line in lines:
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        own, cumulative, module = line[len('import time:'):].split('|')
+        yield module.strip(), int(own), int(cumulative)
+
+
+def package(module, depth):
+    return '.'.join(module.split('.')[:depth])
+
+
+class Command(BaseCommand):
+    help = (
+        'Boot the project as a worker would, in a fresh interpreter, and report '
+        'the time spent in each phase and the import cost per package and module. '
+        'Use --settings to profile library_app.settings_api.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20, help='Packages and modules to list.')
+        parser.add_argument('--depth', type=int, default=1, help='Dotted name parts to group packages by.')
+        parser.add_argument('--no-warm-up', action='store_true')
+
+    def handle(self, *args, **options):
+        environment = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE}
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT.format(warm_up=not options['no_warm_up'])],
+            capture_output=True, text=True, cwd=settings.BASE_DIR, env=environment,
+        )
+        if result.returncode:
+            raise CommandError(f'Startup failed:\n{result.stderr[-2000:]}')
+        phases = json.loads(result.stdout.strip().splitlines()[-1])
+        imports = list(parse_importtime(result.stderr.splitlines()))
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'{settings.SETTINGS_MODULE}: {phases["modules"]} modules'))
+        for phase in ('setup', 'urls', 'warm_up'):
+            self.stdout.write(f'  {phase:10} {phases[phase] * 1000:8.1f} ms')
+
+        packages = defaultdict(int)
+        for module, own, _ in imports:
+            packages[package(module, options['depth'])] += own
+        self.stdout.write(self.style.MIGRATE_HEADING('Import time by package (self, ms)'))
+        for name, own in sorted(packages.items(), key=lambda item: -item[1])[:options['limit']]:
+            self.stdout.write(f'  {own / 1000:8.1f}  {name}')
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Slowest modules (self ms, cumulative ms)'))
+        for module, own, cumulative in sorted(imports, key=lambda item: -item[1])[:options['limit']]:
+            self.stdout.write(f'  {own / 1000:8.1f} {cumulative / 1000:8.1f}  {module}')
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from library.bench import seed_catalog, seed_user
+from library.models import Books
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the configured database with generated authors and books, plus '
+        'a user for authenticated benchmark requests (see bench_api --url).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=10_000)
+        parser.add_argument('--authors', type=int, help='Defaults to books / 5.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--username', default='bench')
+        parser.add_argument('--password', default='bench-password')
+        parser.add_argument('--force', action='store_true', help='Seed even if there are books already.')
+
+    def handle(self, *args, **options):
+        if Books.objects.exists() and not options['force']:
+            raise CommandError('The database already has books; pass --force to add more.')
+        links = seed_catalog(options['books'], options['authors'], seed=options['seed'])
+        seed_user(options['username'], options['password'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {options["books"]} books with {links} author links and user {options["username"]!r}.'
+        ))
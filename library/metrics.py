@@ -0,0 +1,213 @@
+"""
+Per-route request metrics.
+
+InstrumentationMiddleware opens a RequestStats for each request in a context
+variable. Every connection gets ``record_query`` as an execute wrapper (see
+``install``), which adds to the current stats, including from the threads
+sync_to_async runs queries in. At the end of the request the stats go into
+the histograms below, exposed in the Prometheus text format at ``/metrics``.
+
+The histograms live in process memory, so each worker process reports its
+own; Prometheus sums them across scrape targets.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+current = ContextVar('request_stats', default=None)
+
+SECONDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class RequestStats:
+    __slots__ = ('started', 'queries', 'db_time', 'serialize_time', 'render_time')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values = {}
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            values = dict(self.values)
+        for labels, value in sorted(values.items()):
+            yield self.name, self.labelnames, labels, value
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames, buckets=SECONDS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last one is +Inf), sum, count]
+        self.values = {}
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            entry = self.values.get(labels)
+            if entry is None:
+                entry = self.values[labels] = [[0] * (len(self.buckets) + 1), 0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        with self.lock:
+            values = {labels: (list(counts), total, count) for labels, (counts, total, count) in self.values.items()}
+        labelnames = self.labelnames + ('le',)
+        for labels, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                yield f'{self.name}_bucket', labelnames, labels + (format_value(bound),), cumulative
+            yield f'{self.name}_sum', self.labelnames, labels, total
+            yield f'{self.name}_count', self.labelnames, labels, count
+
+
+REGISTRY = []
+
+REQUESTS = Counter('library_requests_total', 'Requests by route, method and status.', ('route', 'method', 'status'))
+REQUEST_DURATION = Histogram(
+    'library_request_duration_seconds', 'Wall time spent in Django per request.', ('route', 'method'),
+)
+DB_QUERIES = Histogram(
+    'library_db_queries', 'Database queries per request.', ('route', 'method'),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200),
+)
+DB_DURATION = Histogram('library_db_duration_seconds', 'Time spent in database queries per request.', ('route', 'method'))
+SERIALIZE_DURATION = Histogram(
+    'library_serialize_duration_seconds', 'Time spent building serializer data, less its queries.', ('route', 'method'),
+)
+RENDER_DURATION = Histogram(
+    'library_render_duration_seconds', 'Time spent rendering serialized data to bytes.', ('route', 'method'),
+)
+REJECTED = Counter(
+    'library_requests_rejected_total', 'Requests turned away by admission control or throttling.', ('route', 'reason'),
+)
+RESPONSE_SIZE = Histogram(
+    'library_response_size_bytes', 'Response body size.', ('route', 'method'),
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def exposition():
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for name, labelnames, labels, value in metric.samples():
+            pairs = ','.join(f'{key}="{escape(label)}"' for key, label in zip(labelnames, labels))
+            lines.append(f'{name}{{{pairs}}} {format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    for metric in REGISTRY:
+        with metric.lock:
+            metric.values.clear()
+
+
+def record_query(execute, sql, params, many, context):
+    stats = current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_time += time.perf_counter() - started
+        stats.queries += 1
+
+
+def install(sender, connection, **kwargs):
+    # First in the list: connection.execute_wrapper() pops the last one, and
+    # the connection may be opened inside such a block.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+@contextmanager
+def timed_render():
+    stats = current.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.render_time += time.perf_counter() - started
+
+
+@contextmanager
+def timed_serialize():
+    # Queries a serializer runs (lazy relations) already count as db time.
+    stats = current.get()
+    if stats is None:
+        yield
+        return
+    started, db_time = time.perf_counter(), stats.db_time
+    try:
+        yield
+    finally:
+        stats.serialize_time += time.perf_counter() - started - (stats.db_time - db_time)
+
+
+def observe(route, method, status, stats, size):
+    labels = (route, method)
+    REQUESTS.inc((route, method, str(status)))
+    REQUEST_DURATION.observe(labels, stats.elapsed())
+    DB_QUERIES.observe(labels, stats.queries)
+    DB_DURATION.observe(labels, stats.db_time)
+    SERIALIZE_DURATION.observe(labels, stats.serialize_time)
+    RENDER_DURATION.observe(labels, stats.render_time)
+    if size is not None:
+        RESPONSE_SIZE.observe(labels, size)
+
+
+def server_timing(stats):
+    return ', '.join((
+        f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries"',
+        f'serialize;dur={stats.serialize_time * 1000:.2f}',
+        f'render;dur={stats.render_time * 1000:.2f}',
+        f'total;dur={stats.elapsed() * 1000:.2f}',
+    ))
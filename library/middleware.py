@@ -0,0 +1,256 @@
+import asyncio
+import functools
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.permissions import SAFE_METHODS
+
+from library import admission, compression, metrics, routers
+from library.querycheck import QueryDetector
+
+logger = logging.getLogger('library.queries')
+
+
+class ReplicaRoutingMiddleware(MiddlewareMixin):
+    """
+    Sends safe requests to views with ``replica_reads = True`` to the read
+    replicas, except for ``REPLICA_LAG`` seconds after the same client wrote
+    something, so clients always read their own writes. The client is
+    recognised by a cookie, and by its Authorization header for API clients
+    that don't keep cookies. Those pins are kept in the
+    ``REPLICA_PIN_CACHE_ALIAS`` cache, which must be shared by all workers
+    for the guarantee to hold.
+    """
+    cookie_name = 'db_pin'
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None)
+        if (
+            request.method in SAFE_METHODS
+            and getattr(view_class, 'replica_reads', False)
+            and not self.is_pinned(request)
+        ):
+            # Under ASGI each hook runs in its own context copy, so the
+            # flag is restored by value rather than with a reset token.
+            request.replica_reads_before = routers.replica_reads.get()
+            routers.replica_reads.set(True)
+        return None
+
+    def process_response(self, request, response):
+        if hasattr(request, 'replica_reads_before'):
+            routers.replica_reads.set(request.replica_reads_before)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            self.pin(request, response)
+        return response
+
+    def pin_key(self, request):
+        authorization = request.META.get('HTTP_AUTHORIZATION')
+        if authorization:
+            return 'db_pin:' + hashlib.sha256(authorization.encode()).hexdigest()
+        return None
+
+    def pin(self, request, response):
+        lag = settings.REPLICA_LAG
+        response.set_cookie(
+            self.cookie_name, str(time.time() + lag), max_age=lag, httponly=True, samesite='Lax'
+        )
+        key = self.pin_key(request)
+        if key is not None:
+            caches[settings.REPLICA_PIN_CACHE_ALIAS].set(key, True, timeout=lag)
+
+    def is_pinned(self, request):
+        try:
+            if float(request.COOKIES.get(self.cookie_name, 0)) > time.time():
+                return True
+        except ValueError:
+            pass
+        key = self.pin_key(request)
+        return key is not None and caches[settings.REPLICA_PIN_CACHE_ALIAS].get(key) is not None
+
+
+class InstrumentationMiddleware(MiddlewareMixin):
+    """
+    Records wall time, database queries, serialize and render time and
+    response size per route (the URL name) into library.metrics, and reports
+    the request's timings in a ``Server-Timing`` header when
+    ``SERVER_TIMING`` is on. Runs natively in both modes, so it adds no
+    thread hops under ASGI.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = metrics.current.set(metrics.RequestStats())
+        try:
+            response = self.get_response(request)
+            return self.finish(request, response, metrics.current.get())
+        finally:
+            metrics.current.reset(token)
+
+    async def __acall__(self, request):
+        token = metrics.current.set(metrics.RequestStats())
+        try:
+            response = await self.get_response(request)
+            return self.finish(request, response, metrics.current.get())
+        finally:
+            metrics.current.reset(token)
+
+    def process_template_response(self, request, response):
+        # Called right before the handler renders the response.
+        stats = metrics.current.get()
+        if stats is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                stats.render_time += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, stats):
+        match = getattr(request, 'resolver_match', None)
+        route = match.view_name if match is not None else 'unmatched'
+        if response.streaming:
+            size = int(response['Content-Length']) if response.has_header('Content-Length') else None
+        else:
+            size = len(response.content)
+        metrics.observe(route, request.method, response.status_code, stats, size)
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = metrics.server_timing(stats)
+        return response
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses response bodies with brotli or gzip, per ``Accept-Encoding``.
+    Bodies under ``COMPRESSION_MIN_SIZE`` bytes, responses that already have a
+    ``Content-Encoding`` and media types that don't compress well are sent as
+    they are; streaming responses are compressed chunk by chunk. Like
+    InstrumentationMiddleware it runs natively in both modes.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        if (
+            response.has_header('Content-Encoding')
+            or not compression.compressible(response)
+            or not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+        # Vary even when this client gets no compression, for shared caches.
+        patch_vary_headers(response, ('Accept-Encoding',))
+        coding = compression.choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if coding is None:
+            return response
+
+        if response.streaming:
+            if getattr(response, 'is_async', False):
+                response.streaming_content = compression.acompress_stream(response.streaming_content, coding)
+            else:
+                response.streaming_content = compression.compress_stream(response.streaming_content, coding)
+            del response['Content-Length']
+        else:
+            compressed = compression.compress(response.content, coding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # The bytes differ per coding, so a strong ETag no longer holds.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = coding
+        return response
+
+
+@functools.lru_cache(maxsize=4096)
+def resolve_path(path, urlconf):
+    try:
+        return resolve(path, urlconf)
+    except Resolver404:
+        return None
+
+
+class AdmissionControlMiddleware(MiddlewareMixin):
+    """
+    Applies the per-route concurrency limits of library.admission. Rejected
+    requests get a 503 with ``Retry-After`` before any view code runs.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        limiter = self.get_limiter(request)
+        if limiter is None:
+            return self.get_response(request)
+        try:
+            started = limiter.acquire()
+        except admission.Rejected as rejected:
+            return self.reject(request, rejected)
+        try:
+            return self.get_response(request)
+        finally:
+            limiter.release(started)
+
+    async def __acall__(self, request):
+        limiter = self.get_limiter(request)
+        if limiter is None:
+            return await self.get_response(request)
+        try:
+            started = await limiter.aacquire()
+        except admission.Rejected as rejected:
+            return self.reject(request, rejected)
+        try:
+            return await self.get_response(request)
+        finally:
+            limiter.release(started)
+
+    def get_limiter(self, request):
+        match = resolve_path(request.path_info, getattr(request, 'urlconf', None) or settings.ROOT_URLCONF)
+        if match is None:
+            return None
+        # The handler resolves again; this labels rejections in the metrics.
+        request.resolver_match = match
+        return admission.get_limiter(match.view_name, request.method)
+
+    def reject(self, request, rejected):
+        metrics.REJECTED.inc((request.resolver_match.view_name, rejected.reason))
+        response = JsonResponse({'detail': f'Server busy ({rejected.reason}), retry later.'}, status=503)
+        response['Retry-After'] = str(rejected.retry_after)
+        return response
+
+
+class QueryInspectionMiddleware:
+    """
+    Development aid: logs repeated (N+1) and slow queries per request to the
+    ``library.queries`` logger. Only active with DEBUG; under ASGI it sees the
+    synchronous views only.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryDetector() as detector:
+            response = self.get_response(request)
+        for problem in detector.problems():
+            logger.warning('%s %s: %s', request.method, request.path, problem)
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.6 on 2026-10-18 18:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0003_row_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
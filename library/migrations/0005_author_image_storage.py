@@ -0,0 +1,20 @@
+# Generated by Django 4.1.6 on 2026-10-18 18:10
+
+from django.db import migrations, models
+import library.models.author
+import library.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0004_author_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='author',
+            name='image',
+            field=models.ImageField(db_index=True, null=True, storage=library.storage.get_author_image_storage, upload_to=library.models.author.recipe_image_file_path),
+        ),
+    ]
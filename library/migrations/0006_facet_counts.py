@@ -0,0 +1,61 @@
+# Generated by Django 4.1.6 on 2026-10-18 18:45
+
+from django.db import migrations, models
+from django.db.models import Case, Count, IntegerField, Value, When
+from django.db.models.functions import ExtractYear
+
+# library.stats as of this migration; later changes there must not alter it.
+PAGE_BUCKETS = (0, 100, 200, 300, 500, 1000)
+
+
+def populate(apps, schema_editor):
+    using = schema_editor.connection.alias
+    FacetCount = apps.get_model('library', 'FacetCount')
+    Books = apps.get_model('library', 'Books')
+    Author = apps.get_model('library', 'Author')
+    books = Books.objects.using(using).order_by()
+    through = Books._meta.get_field('author').remote_field.through
+    pages = Case(
+        *[When(book_pages__gte=bound, then=Value(bound)) for bound in reversed(PAGE_BUCKETS)],
+        output_field=IntegerField(),
+    )
+    groups = (
+        ('genre', books, 'genre'),
+        ('year', books.annotate(year=ExtractYear('release_date')), 'year'),
+        ('pages', books.annotate(bucket=pages), 'bucket'),
+        ('author', through._default_manager.using(using).order_by(), 'author_id'),
+    )
+    rows = [
+        FacetCount(facet='books', value=0, count=books.count()),
+        FacetCount(facet='authors', value=0, count=Author.objects.using(using).count()),
+    ]
+    for facet, queryset, column in groups:
+        rows.extend(
+            FacetCount(facet=facet, value=value, count=count)
+            for value, count in queryset.values(column).annotate(count=Count('pk')).values_list(column, 'count')
+        )
+    FacetCount.objects.using(using).bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0005_author_image_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=20)),
+                ('value', models.BigIntegerField()),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='facetcount',
+            constraint=models.UniqueConstraint(fields=('facet', 'value'), name='facet_count_unique'),
+        ),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
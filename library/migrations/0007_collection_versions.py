@@ -0,0 +1,30 @@
+# Generated by Django 4.1.6 on 2026-10-18 19:04
+
+from django.db import migrations, models
+
+
+def populate(apps, schema_editor):
+    CollectionVersion = apps.get_model('library', 'CollectionVersion')
+    CollectionVersion.objects.using(schema_editor.connection.alias).bulk_create([
+        CollectionVersion(label='library.books', version=1),
+        CollectionVersion(label='library.author', version=1),
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0006_facet_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CollectionVersion',
+            fields=[
+                ('label', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+                ('modified', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
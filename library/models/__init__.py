@@ -1,2 +1,4 @@
 from .books import Books
 from .author import Author
+from .stats import FacetCount
+from .versions import CollectionVersion
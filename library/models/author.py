@@ -1,6 +1,7 @@
 import uuid
 import os
 from django.db import models
+from library.storage import get_author_image_storage
 
 
 def recipe_image_file_path(instance, filename):
@@ -15,10 +16,23 @@ class Author(models.Model):
     email = models.EmailField(max_length=200)
     phone = models.IntegerField()
     fb_name = models.CharField(max_length=200, null=True, blank=True)
-    image = models.ImageField(null=True, upload_to=recipe_image_file_path)
+    # Stored by content hash; upload_to only contributes the extension.
+    image = models.ImageField(
+        null=True,
+        upload_to=recipe_image_file_path,
+        storage=get_author_image_storage,
+        db_index=True,
+    )
+    # Thumbnail size -> storage name, filled in by library.images.
+    image_variants = models.JSONField(default=dict, blank=True)
+    modified = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = [("name", "surname")]
+        indexes = [
+            models.Index(fields=['surname'], name='author_surname_idx'),
+            models.Index(fields=['email'], name='author_email_idx'),
+        ]
 
     def __str__(self):
         return f'{self.name} {self.surname}'
@@ -9,7 +9,14 @@ class Books(models.Model):
     book_pages = models.PositiveIntegerField()
     genre = models.PositiveIntegerField()
     release_date = models.DateField()
+    modified = models.DateTimeField(auto_now=True, db_index=True)
     # user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['release_date'], name='books_release_date_idx'),
+            models.Index(fields=['genre', 'release_date'], name='books_genre_release_idx'),
+        ]
+
     def __str__(self):
         return self.title
@@ -0,0 +1,21 @@
+from django.db import models
+
+
+class FacetCount(models.Model):
+    """
+    A row of the catalog statistics: how many books have ``value`` for
+    ``facet`` (a genre, a release year, an author id, a page-count bucket),
+    plus the ``books`` and ``authors`` totals under value 0. Maintained by
+    library.stats.
+    """
+    facet = models.CharField(max_length=20)
+    value = models.BigIntegerField()
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['facet', 'value'], name='facet_count_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.facet}={self.value}: {self.count}'
@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class CollectionVersion(models.Model):
+    """
+    A counter per model that every write to its table moves, so that list
+    ETags come from one primary key lookup. Maintained by library.versions.
+    """
+    label = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.label}: {self.version}'
@@ -0,0 +1,158 @@
+"""
+N+1 and slow query detection.
+
+QueryDetector records the queries run on this thread's connections while it
+is active and reports SQL that repeats with different parameters (the
+signature of a per-row lookup) and queries slower than a threshold. It is a
+context manager, backs QueryCheckMixin for tests and
+library.middleware.QueryInspectionMiddleware in development.
+"""
+import math
+import re
+import time
+from collections import Counter, namedtuple
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+Query = namedtuple('Query', 'alias sql fingerprint duration')
+
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s|\?")
+IN_LIST_RE = re.compile(r'\(\?(?:\s*,\s*\?)*\)')
+SPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """``sql`` with literals and parameters replaced, so per-row variants match."""
+    sql = LITERAL_RE.sub('?', sql)
+    sql = IN_LIST_RE.sub('(...)', sql)
+    return SPACE_RE.sub(' ', sql).strip()
+
+
+class QueryProblems(AssertionError):
+    pass
+
+
+class QueryDetector:
+
+    def __init__(self, repeat_threshold=None, slow_threshold=None, using=None):
+        if repeat_threshold is None:
+            repeat_threshold = settings.QUERY_REPEAT_THRESHOLD
+        if slow_threshold is None:
+            slow_threshold = settings.QUERY_SLOW_THRESHOLD
+        self.repeat_threshold = repeat_threshold
+        self.slow_threshold = slow_threshold
+        self.using = using
+        self.queries = []
+
+    def __enter__(self):
+        self.queries = []
+        self.stack = ExitStack()
+        for alias in self.using or connections:
+            self.stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stack.close()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(Query(
+                context['connection'].alias, sql, fingerprint(sql), time.perf_counter() - started,
+            ))
+
+    def __len__(self):
+        return len(self.queries)
+
+    def repeated(self):
+        counts = Counter(query.fingerprint for query in self.queries)
+        return [(sql, count) for sql, count in counts.most_common() if count >= self.repeat_threshold]
+
+    def slow(self):
+        return [query for query in self.queries if query.duration >= self.slow_threshold]
+
+    def problems(self):
+        problems = [f'Query repeated {count} times: {sql}' for sql, count in self.repeated()]
+        problems += [f'Slow query ({query.duration * 1000:.1f} ms): {query.sql}' for query in self.slow()]
+        return problems
+
+    def check(self):
+        problems = self.problems()
+        if problems:
+            raise QueryProblems('\n'.join(problems))
+
+
+class QueryCheckMixin:
+    """
+    Test case mixin. With ``check_request_queries`` on, every test client
+    request is checked by a QueryDetector and fails the test on repeated
+    queries; the assertions below check code paths explicitly. Slow queries
+    only fail tests that set ``slow_query_threshold``, since timings on a
+    loaded CI machine would fail unrelated tests.
+    """
+    check_request_queries = True
+    slow_query_threshold = math.inf
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if cls.check_request_queries:
+            cls.request_detector = None
+            request_started.connect(cls.start_request_check, dispatch_uid=cls.dispatch_uid())
+            request_finished.connect(cls.finish_request_check, dispatch_uid=cls.dispatch_uid())
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.check_request_queries:
+            request_started.disconnect(dispatch_uid=cls.dispatch_uid())
+            request_finished.disconnect(dispatch_uid=cls.dispatch_uid())
+        super().tearDownClass()
+
+    @classmethod
+    def dispatch_uid(cls):
+        return f'querycheck:{cls.__module__}.{cls.__qualname__}'
+
+    @classmethod
+    def start_request_check(cls, **kwargs):
+        if cls.request_detector is not None:
+            # The previous request raised before finishing.
+            cls.request_detector.__exit__(None, None, None)
+        cls.request_detector = QueryDetector(slow_threshold=cls.slow_query_threshold).__enter__()
+
+    @classmethod
+    def finish_request_check(cls, **kwargs):
+        detector, cls.request_detector = cls.request_detector, None
+        if detector is not None:
+            detector.__exit__(None, None, None)
+            detector.check()
+
+    @contextmanager
+    def assertNoQueryProblems(self, **kwargs):
+        kwargs.setdefault('slow_threshold', self.slow_query_threshold)
+        with QueryDetector(**kwargs) as detector:
+            yield detector
+        problems = detector.problems()
+        if problems:
+            self.fail('\n'.join(problems))
+
+    def assertQueryCountConstant(self, request, add_rows, sizes=(1, 3, 10)):
+        """
+        Call ``add_rows(n)`` to grow the result set to each of ``sizes`` and
+        fail unless ``request()`` runs the same number of queries every time.
+        """
+        counts = []
+        total = 0
+        for size in sizes:
+            add_rows(size - total)
+            total = size
+            with QueryDetector(repeat_threshold=2) as detector:
+                request()
+            counts.append(len(detector))
+        if len(set(counts)) > 1:
+            repeated = '\n'.join(f'{count}x {sql}' for sql, count in detector.repeated())
+            self.fail(f'Query count grows with result size: {dict(zip(sizes, counts))}\n{repeated}')
@@ -0,0 +1,107 @@
+"""
+Response formats beyond DRF's JSONRenderer.
+
+FastJSONRenderer writes the same bytes as DRF's compact JSONRenderer, with
+orjson, an optional dependency. Values orjson doesn't handle natively
+(dates, decimals, lazy strings) go through DRF's JSONEncoder. Without orjson
+installed, or when indented output is asked for, it is DRF's JSONRenderer.
+
+ColumnarJSONRenderer sends lists as rows of values under one field list,
+with nested objects such as the authors of books sent once each.
+MessagePackRenderer needs the optional ``msgpack`` package and is only
+configured when it is installed.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+if orjson is not None:
+    OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=JSONEncoder().default, option=OPTIONS)
+        except TypeError:
+            # Beyond orjson's limits (integers over 64 bits, for one).
+            return super().render(data, accepted_media_type, renderer_context)
+        # Like JSONRenderer: these are valid JSON but not valid JavaScript.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+def columns(items):
+    """
+    ``items``, a list of dicts, as ``{'fields', 'rows', 'included'}``. Lists
+    of objects with an ``id`` become lists of ids, and the objects go to
+    ``included[field]`` as a table of their own, each one once.
+    """
+    fields = list(items[0]) if items else []
+    rows, included = [], {}
+    for item in items:
+        row = []
+        for name in fields:
+            value = item.get(name)
+            if isinstance(value, list) and value and all(isinstance(obj, dict) and 'id' in obj for obj in value):
+                objects = included.setdefault(name, {})
+                for obj in value:
+                    objects.setdefault(obj['id'], obj)
+                value = [obj['id'] for obj in value]
+            row.append(value)
+        rows.append(row)
+    return {
+        'fields': fields,
+        'rows': rows,
+        'included': {name: columns(list(objects.values())) for name, objects in included.items()},
+    }
+
+
+class ColumnarJSONRenderer(FastJSONRenderer):
+    """
+    Lists, paginated or not, in the layout of ``columns``. Anything else
+    (a single object, errors) is rendered as plain JSON.
+    """
+    media_type = 'application/vnd.library.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict) and isinstance(data.get('results'), list):
+            data = {
+                **{key: value for key, value in data.items() if key != 'results'},
+                **columns(data['results']),
+            }
+        elif isinstance(data, list) and all(isinstance(item, dict) for item in data):
+            data = columns(data)
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Dates, decimals and the like as in JSON.
+        return msgpack.packb(data, default=JSONEncoder().default, use_bin_type=True)
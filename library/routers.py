@@ -0,0 +1,52 @@
+"""
+Read-replica routing.
+
+Reads of this app's models go to a random ``DATABASE_REPLICAS`` alias only
+while ``replica_reads`` is set, which ReplicaRoutingMiddleware does for safe
+requests to views with ``replica_reads = True``. Everything else, including
+all writes and the auth/session tables, uses ``default``.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+REPLICATED_APPS = {'library'}
+
+replica_reads = ContextVar('replica_reads', default=False)
+
+
+def get_replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+def reading_from_replica():
+    return replica_reads.get() and bool(get_replicas())
+
+
+@contextmanager
+def use_replicas(enabled=True):
+    token = replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in REPLICATED_APPS or not replica_reads.get():
+            return 'default'
+        replicas = get_replicas()
+        return random.choice(replicas) if replicas else 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {'default', *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
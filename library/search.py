@@ -0,0 +1,164 @@
+import re
+
+from django.db import OperationalError, connections
+from django.db.models import Q
+from library.models import Books
+
+FTS_TABLE = 'library_books_fts'
+
+AUTHORS_OF = """(
+    SELECT coalesce(group_concat(a.name || ' ' || a.surname, ' '), '')
+    FROM library_author a
+    JOIN library_books_author ba ON ba.author_id = a.id
+    WHERE ba.books_id = {book_id}
+)"""
+
+# The index is maintained by triggers rather than signals so that
+# bulk_create, queryset updates and raw SQL keep it in sync too.
+TRIGGERS = {
+    'library_books_fts_ai': f"""
+        AFTER INSERT ON library_books BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, title, authors) VALUES (new.id, new.title, '');
+        END""",
+    'library_books_fts_au': f"""
+        AFTER UPDATE OF title ON library_books BEGIN
+            UPDATE {FTS_TABLE} SET title = new.title WHERE rowid = new.id;
+        END""",
+    'library_books_fts_ad': f"""
+        AFTER DELETE ON library_books BEGIN
+            DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        END""",
+    'library_books_author_fts_ai': f"""
+        AFTER INSERT ON library_books_author BEGIN
+            UPDATE {FTS_TABLE} SET authors = {AUTHORS_OF.format(book_id='new.books_id')}
+            WHERE rowid = new.books_id;
+        END""",
+    'library_books_author_fts_ad': f"""
+        AFTER DELETE ON library_books_author BEGIN
+            UPDATE {FTS_TABLE} SET authors = {AUTHORS_OF.format(book_id='old.books_id')}
+            WHERE rowid = old.books_id;
+        END""",
+    'library_author_fts_au': f"""
+        AFTER UPDATE OF name, surname ON library_author BEGIN
+            UPDATE {FTS_TABLE} SET authors = {AUTHORS_OF.format(book_id=f'{FTS_TABLE}.rowid')}
+            WHERE rowid IN (SELECT books_id FROM library_books_author WHERE author_id = new.id);
+        END""",
+}
+
+
+# Whether the index exists, per database; set by install() after migrate and
+# otherwise looked up on the first search.
+FTS_AVAILABLE = {}
+
+
+def database_key(using):
+    return using, str(connections[using].settings_dict['NAME'])
+
+
+def has_fts_table(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [FTS_TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def fts_available(using='default'):
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    key = database_key(using)
+    if key not in FTS_AVAILABLE:
+        FTS_AVAILABLE[key] = has_fts_table(connection)
+    return FTS_AVAILABLE[key]
+
+
+def install(using='default'):
+    """
+    Create the FTS5 index and its triggers if they are missing.
+
+    Runs after every ``migrate``: SQLite drops triggers whenever a migration
+    rebuilds one of the underlying tables, so any missing trigger means the
+    index may be stale and is rebuilt from scratch. Returns False when the
+    backend has no FTS5 support, in which case search falls back to LIKE.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    FTS_AVAILABLE.pop(database_key(using), None)
+    if Books._meta.db_table not in connection.introspection.table_names():
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in TRIGGERS if name not in existing]
+        if not missing and has_fts_table(connection):
+            FTS_AVAILABLE[database_key(using)] = True
+            return True
+
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                f"USING fts5(title, authors, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        except OperationalError:
+            # SQLite compiled without FTS5.
+            return False
+
+        for name in missing:
+            cursor.execute(f'CREATE TRIGGER {name} {TRIGGERS[name]}')
+        rebuild(using)
+    FTS_AVAILABLE[database_key(using)] = True
+    return True
+
+
+def rebuild(using='default'):
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, title, authors) "
+            f"SELECT b.id, b.title, {AUTHORS_OF.format(book_id='b.id')} FROM library_books b"
+        )
+
+
+def match_expression(query):
+    # Quote every word so user input can never be parsed as FTS5 syntax,
+    # and prefix-match it so results show up while the user is typing.
+    words = re.findall(r'\w+', query)
+    return ' '.join('"%s"*' % word for word in words)
+
+
+def search_books(queryset, query, limit=20):
+    """
+    Return up to ``limit`` books from ``queryset`` matching ``query`` in the
+    title or author names, best matches first.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return []
+
+    using = queryset.db
+    if not fts_available(using):
+        through = Books.author.through
+        condition = Q()
+        for word in re.findall(r'\w+', query):
+            condition &= Q(title__icontains=word) | Q(
+                id__in=through.objects.filter(
+                    Q(author__name__icontains=word) | Q(author__surname__icontains=word)
+                ).values('books_id')
+            )
+        return list(queryset.filter(condition).order_by('id')[:limit])
+
+    with connections[using].cursor() as cursor:
+        # bm25 weights: a title hit counts twice as much as an author hit.
+        cursor.execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY bm25({FTS_TABLE}, 2.0, 1.0) LIMIT %s',
+            [expression, limit],
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+
+    books = queryset.in_bulk(ids)
+    return [books[book_id] for book_id in ids if book_id in books]
@@ -1,3 +1,21 @@
-from .books import BooksSerializer
-from .author import AuthorSerializer, AuthorImageSerializer
-from .user import UserSerializer, AuthTokenSerializer
+from importlib import import_module
+
+# Imported on first access, like library.views: the catalog serializers,
+# for one, are only needed by imports and exports.
+EXPORTS = {
+    'BooksSerializer': 'books',
+    'AuthorSerializer': 'author',
+    'AuthorImageSerializer': 'author',
+    'UserSerializer': 'user',
+    'AuthTokenSerializer': 'user',
+    'CatalogBookSerializer': 'catalog',
+    'CatalogAuthorSerializer': 'catalog',
+}
+
+__all__ = list(EXPORTS)
+
+
+def __getattr__(name):
+    if name not in EXPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    return getattr(import_module(f'.{EXPORTS[name]}', __name__), name)
@@ -1,17 +1,65 @@
 from rest_framework import serializers
+from library import images
 from library.models import Author
+from .bulk import BulkListSerializer
+from .timing import TimedDataMixin
 
 
-class AuthorSerializer(serializers.ModelSerializer):
+class ThumbnailsField(serializers.ReadOnlyField):
+    """Renders ``Author.image_variants`` as size -> URL, like an ImageField."""
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = 'image_variants'
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        request = self.context.get('request')
+        storage = Author._meta.get_field('image').storage
+        urls = {}
+        for size, name in (value or {}).items():
+            url = storage.url(name)
+            urls[size] = request.build_absolute_uri(url) if request is not None else url
+        return urls
+
+
+class AuthorSerializer(TimedDataMixin, serializers.ModelSerializer):
+    thumbnails = ThumbnailsField()
 
     class Meta:
         model = Author
-        fields = '__all__'
+        exclude = ('image_variants',)
+        list_serializer_class = BulkListSerializer
 
 
-class AuthorImageSerializer(serializers.ModelSerializer):
+class AuthorImageSerializer(TimedDataMixin, serializers.ModelSerializer):
+    # A plain FileField: the full decode Pillow would do for an ImageField
+    # happens in the background worker instead, see library.images.
+    image = serializers.FileField()
+    thumbnails = ThumbnailsField()
 
     class Meta:
         model = Author
-        fields = ('id', 'image')
+        fields = ('id', 'image', 'thumbnails')
         read_only_fields = ('id',)
+
+    def validate_image(self, value):
+        from PIL import Image, UnidentifiedImageError
+
+        # Image.open only parses the header, it doesn't decode pixels.
+        try:
+            Image.open(value)
+        except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+            raise serializers.ValidationError(
+                'Upload a valid image. The file you uploaded was either not an image or a corrupted image.'
+            )
+        value.seek(0)
+        return value
+
+    def update(self, instance, validated_data):
+        previous = instance.image.name
+        validated_data['image_variants'] = {}
+        author = super().update(instance, validated_data)
+        if previous and previous != author.image.name:
+            images.release_on_commit(previous)
+        images.schedule(author.pk, author.image.name)
+        return author
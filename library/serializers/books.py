@@ -1,12 +1,52 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
-from library.models import Books
+from library.models import Author, Books
 from .author import AuthorSerializer
+from .bulk import BulkListSerializer
+from .timing import TimedDataMixin
 
+# Prefetch for BooksSerializer.author. The id order matches ValuesSerializer
+# and keeps the output stable across databases.
+AUTHORS = Prefetch('author', queryset=Author.objects.order_by('id'))
 
-class BooksSerializer(serializers.ModelSerializer):
+
+class BooksListSerializer(BulkListSerializer):
+
+    def to_internal_value(self, data):
+        # Resolve every referenced author in one query instead of one per item.
+        if isinstance(data, list):
+            ids = {
+                author_id
+                for item in data if isinstance(item, dict)
+                for author_id in item.get('author_ids') or ()
+                if isinstance(author_id, int)
+            }
+            self.context['known_author_ids'] = set(
+                Author.objects.filter(id__in=ids).values_list('id', flat=True)
+            )
+        return super().to_internal_value(data)
+
+
+class BooksSerializer(TimedDataMixin, serializers.ModelSerializer):
     author = AuthorSerializer(read_only=True, many=True)
+    author_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        source='author',
+        write_only=True,
+        required=False,
+    )
 
     class Meta:
         model = Books
         fields = '__all__'
+        list_serializer_class = BooksListSerializer
+
+    def validate_author_ids(self, value):
+        known = self.context.get('known_author_ids')
+        if known is None:
+            known = set(Author.objects.filter(id__in=value).values_list('id', flat=True))
 
+        missing = sorted(set(value) - known)
+        if missing:
+            raise serializers.ValidationError(f'Invalid author ids: {missing}')
+        return list(dict.fromkeys(value))
@@ -0,0 +1,171 @@
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils import model_meta
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
+
+from .timing import TimedDataMixin
+
+
+class BulkListSerializer(TimedDataMixin, serializers.ListSerializer):
+    """
+    ``many=True`` serializer that writes all items with one bulk_create or
+    bulk_update and links many-to-many values with one insert per through
+    table. Validation errors are reported per item, aligned with the input.
+
+    For updates ``instance`` must be a list of model instances aligned with
+    the submitted items.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            message = self.error_messages['not_a_list'].format(
+                input_type=type(data).__name__
+            )
+            raise ValidationError({'non_field_errors': [message]}, code='not_a_list')
+
+        # Uniqueness is checked for the whole batch at once below instead of
+        # with one query per item by the child's unique validators.
+        for field in self.child.fields.values():
+            field.validators = [
+                validator for validator in field.validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+        self.child.validators = [
+            validator for validator in self.child.validators
+            if not isinstance(validator, UniqueTogetherValidator)
+        ]
+
+        validated, errors = [], []
+        for index, item in enumerate(data):
+            self.child.instance = self.get_item_instance(index)
+            self.child.initial_data = item
+            try:
+                validated.append(self.child.run_validation(item))
+            except ValidationError as exc:
+                validated.append(None)
+                errors.append(exc.detail)
+            else:
+                errors.append({})
+        self.child.instance = None
+
+        self.check_uniqueness(validated, errors)
+        if any(errors):
+            raise ValidationError(errors)
+        return validated
+
+    def get_item_instance(self, index):
+        return self.instance[index] if self.instance is not None else None
+
+    def check_uniqueness(self, validated, errors):
+        model = self.child.Meta.model
+        opts = model._meta
+        unique_sets = [(field.name,) for field in opts.fields if field.unique and not field.primary_key]
+        unique_sets += [tuple(fields) for fields in opts.unique_together]
+
+        for fields in unique_sets:
+            keys = {}
+            for index, attrs in enumerate(validated):
+                if attrs is None:
+                    continue
+                # Partial updates that don't touch the key can't break it.
+                if self.instance is not None and not any(name in attrs for name in fields):
+                    continue
+                instance = self.get_item_instance(index)
+                keys[index] = tuple(attrs.get(name, getattr(instance, name, None)) for name in fields)
+            if not keys:
+                continue
+
+            lookup = {f'{name}__in': {key[i] for key in keys.values()} for i, name in enumerate(fields)}
+            existing = {
+                tuple(row[1:]): row[0]
+                for row in model._default_manager.filter(**lookup).values_list('pk', *fields)
+            }
+
+            if len(fields) == 1:
+                field = opts.get_field(fields[0])
+                message = f'{opts.verbose_name} with this {field.verbose_name} already exists.'
+                error_key = fields[0]
+            else:
+                message = f'The fields {", ".join(fields)} must make a unique set.'
+                error_key = 'non_field_errors'
+
+            seen = set()
+            for index, key in keys.items():
+                instance = self.get_item_instance(index)
+                taken = key in existing and (instance is None or existing[key] != instance.pk)
+                if taken or key in seen:
+                    errors[index].setdefault(error_key, []).append(message)
+                seen.add(key)
+
+    def split_many_to_many(self, attrs):
+        info = model_meta.get_field_info(self.child.Meta.model)
+        attrs = dict(attrs)
+        many_to_many = {
+            name: attrs.pop(name)
+            for name, relation in info.relations.items()
+            if relation.to_many and name in attrs
+        }
+        return attrs, many_to_many
+
+    def set_many_to_many(self, instances, relations, replace=False):
+        model = self.child.Meta.model
+        for name in {name for relation in relations for name in relation}:
+            field = model._meta.get_field(name)
+            through = field.remote_field.through
+            source = f'{field.m2m_field_name()}_id'
+            target = f'{field.m2m_reverse_field_name()}_id'
+            pairs = [
+                (instance, relation[name])
+                for instance, relation in zip(instances, relations)
+                if name in relation
+            ]
+
+            if replace:
+                through.objects.filter(
+                    **{f'{source}__in': [instance.pk for instance, _ in pairs]}
+                ).delete()
+            through.objects.bulk_create(
+                [
+                    through(**{source: instance.pk, target: getattr(value, 'pk', value)})
+                    for instance, values in pairs
+                    for value in values
+                ],
+                ignore_conflicts=True,
+            )
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        instances, relations = [], []
+        for attrs in validated_data:
+            attrs, many_to_many = self.split_many_to_many(attrs)
+            instances.append(model(**attrs))
+            relations.append(many_to_many)
+
+        model.objects.bulk_create(instances)
+        self.set_many_to_many(instances, relations)
+        return instances
+
+    def update(self, instances, validated_data):
+        model = self.child.Meta.model
+        fields, relations = set(), []
+        for instance, attrs in zip(instances, validated_data):
+            attrs, many_to_many = self.split_many_to_many(attrs)
+            for name, value in attrs.items():
+                setattr(instance, name, value)
+            fields.update(attrs)
+            relations.append(many_to_many)
+
+        # bulk_update bypasses save(), so refresh auto_now columns here. This
+        # also versions rows whose only change is a many-to-many link.
+        now = timezone.now()
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False):
+                fields.add(field.name)
+                for instance in instances:
+                    setattr(instance, field.attname, now)
+
+        if fields:
+            model.objects.bulk_update(instances, fields)
+        self.set_many_to_many(instances, relations, replace=True)
+        return instances
@@ -0,0 +1,26 @@
+from rest_framework import serializers
+from .author import AuthorSerializer
+from .books import BooksSerializer
+
+
+class CatalogAuthorSerializer(AuthorSerializer):
+    thumbnails = None
+
+    class Meta(AuthorSerializer.Meta):
+        fields = ('name', 'surname', 'email', 'phone', 'fb_name')
+        exclude = None
+        list_serializer_class = serializers.ListSerializer
+        # Authors are upserted on (name, surname) by import_catalog.
+        validators = []
+
+
+class CatalogBookSerializer(BooksSerializer):
+    """Validates one row of a catalog dump for ``manage.py import_catalog``."""
+    author = CatalogAuthorSerializer(many=True, required=False)
+    author_ids = None
+
+    class Meta(BooksSerializer.Meta):
+        fields = ('title', 'book_pages', 'genre', 'release_date', 'author')
+        list_serializer_class = serializers.ListSerializer
+        # Books are upserted on title by import_catalog.
+        extra_kwargs = {'title': {'validators': []}}
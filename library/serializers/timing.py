@@ -0,0 +1,10 @@
+from library import metrics
+
+
+class TimedDataMixin:
+    """Counts the time spent building ``.data`` as the request's serialize phase."""
+
+    @property
+    def data(self):
+        with metrics.timed_serialize():
+            return super().data
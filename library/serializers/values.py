@@ -0,0 +1,131 @@
+"""
+Read-only serialization from ``.values()`` rows.
+
+ValuesSerializer takes a bound ModelSerializer and compiles its readable
+fields once into (key, column, converter) steps: plain integer and text
+columns are copied as they come from the database, other fields go through
+their own ``to_representation``, and many-to-many relations, nested
+serializers or lists of ids, are filled from a single query. The output matches the ModelSerializer's for
+the same rows, without building model instances or resolving attributes
+field by field.
+"""
+from django.db.models import F
+from django.db.models.fields.files import FieldFile
+from rest_framework import serializers
+
+from library import metrics
+
+# Whose to_representation returns database values unchanged.
+PASSTHROUGH = {
+    serializers.IntegerField.to_representation,
+    serializers.CharField.to_representation,
+}
+
+PARENT = '_values_parent'
+VALUE = '_values_id'
+
+
+class ValuesSerializer:
+
+    def __init__(self, serializer):
+        self.model = serializer.Meta.model
+        self.columns = [self.model._meta.pk.attname]
+        self.steps = []
+        self.nested = []
+        for key, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.ListSerializer):
+                self.add_nested(key, field)
+            elif isinstance(field, serializers.ManyRelatedField):
+                self.add_ids(key, field)
+            else:
+                self.add_field(key, field)
+
+    def add_field(self, key, field):
+        model_field = self.get_model_field(field)
+        if model_field.is_relation:
+            raise TypeError(f'{key!r}: relations other than nested many-to-many are not supported.')
+        if type(field).to_representation in PASSTHROUGH:
+            convert = None
+        elif isinstance(field, serializers.FileField):
+            def convert(name, field=field, model_field=model_field):
+                return field.to_representation(FieldFile(None, model_field, name))
+        else:
+            convert = field.to_representation
+        if model_field.attname not in self.columns:
+            self.columns.append(model_field.attname)
+        self.steps.append((key, model_field.attname, convert))
+
+    def add_nested(self, key, field):
+        model_field = self.get_model_field(field)
+        if not model_field.many_to_many or not isinstance(field.child, serializers.ModelSerializer):
+            raise TypeError(f'{key!r}: only nested many-to-many model serializers are supported.')
+        child = ValuesSerializer(field.child)
+        if child.nested:
+            raise TypeError(f'{key!r}: nested serializers can only be one level deep.')
+        self.nested.append((key, model_field, child))
+        self.steps.append((key, None, None))
+
+    def add_ids(self, key, field):
+        model_field = self.get_model_field(field)
+        if not model_field.many_to_many or type(field.child_relation) is not serializers.PrimaryKeyRelatedField:
+            raise TypeError(f'{key!r}: only many-to-many primary key fields are supported.')
+        self.nested.append((key, model_field, None))
+        self.steps.append((key, None, None))
+
+    def get_model_field(self, field):
+        if field.source == '*' or '.' in field.source:
+            raise TypeError(f'{field.field_name!r}: source {field.source!r} is not a model field.')
+        return self.model._meta.get_field(field.source)
+
+    def get_queryset(self, queryset):
+        """``queryset`` as the ``.values()`` rows this serializer reads."""
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def related_querysets(self, rows):
+        """(key, queryset) pairs for the nested rows of ``rows``, ordered by id."""
+        ids = [row[self.columns[0]] for row in rows]
+        for key, model_field, child in self.nested:
+            if child is None:
+                # Ids only: the through table has them without the join.
+                source, target = model_field.m2m_field_name(), model_field.m2m_reverse_field_name()
+                queryset = model_field.remote_field.through._default_manager.filter(**{f'{source}__in': ids})
+                yield key, queryset.values(**{PARENT: F(source), VALUE: F(target)}).order_by(target)
+                continue
+            query_name = model_field.related_query_name()
+            queryset = model_field.related_model._default_manager.filter(**{f'{query_name}__in': ids})
+            yield key, child.get_queryset(queryset).annotate(**{PARENT: F(query_name)}).order_by('pk')
+
+    def data(self, rows):
+        related = {key: list(queryset) for key, queryset in self.related_querysets(rows)}
+        with metrics.timed_serialize():
+            return self.represent(rows, related)
+
+    async def adata(self, rows):
+        related = {}
+        for key, queryset in self.related_querysets(rows):
+            related[key] = [row async for row in queryset.aiterator()]
+        with metrics.timed_serialize():
+            return self.represent(rows, related)
+
+    def represent(self, rows, related):
+        nested = {}
+        for key, model_field, child in self.nested:
+            by_parent = nested[key] = {row[self.columns[0]]: [] for row in rows}
+            for row in related[key]:
+                by_parent[row[PARENT]].append(row[VALUE] if child is None else child.represent_row(row, None))
+        return [self.represent_row(row, nested) for row in rows]
+
+    def represent_row(self, row, nested):
+        output = {}
+        for key, column, convert in self.steps:
+            if column is None:
+                output[key] = nested[key][row[self.columns[0]]]
+                continue
+            value = row[column]
+            if value is None or convert is None:
+                output[key] = value
+            else:
+                output[key] = convert(value)
+        return output
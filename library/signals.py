@@ -0,0 +1,141 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from library import authentication, cache, images, stats, versions
+from library.models import Author, Books
+
+
+@receiver(post_save, sender=Books)
+@receiver(post_delete, sender=Books)
+def invalidate_book(sender, instance, **kwargs):
+    cache.invalidate_objects(Books, [instance.pk])
+    versions.touch(Books)
+
+
+@receiver(post_save, sender=Author)
+@receiver(pre_delete, sender=Author)
+def invalidate_author(sender, instance, **kwargs):
+    # pre_delete: the author's book links are gone by post_delete.
+    cache.invalidate_objects(Author, [instance.pk])
+    versions.touch(Author)
+
+
+@receiver(m2m_changed, sender=Books.author.through)
+def invalidate_book_authors(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    versions.touch(Books)
+    if not reverse:
+        cache.invalidate_objects(Books, [instance.pk])
+    elif pk_set is not None:
+        cache.invalidate_objects(Books, pk_set)
+    else:
+        cache.invalidate_all(Books._meta.label_lower)
+
+
+@receiver(m2m_changed, sender=Books.author.through)
+def touch_book_authors(sender, instance, action, reverse, pk_set, **kwargs):
+    # Link changes don't save the book, so move its row version by hand.
+    if not reverse and action.startswith('post_'):
+        books = Books.objects.filter(pk=instance.pk)
+    elif reverse and action in ('post_add', 'post_remove'):
+        books = Books.objects.filter(pk__in=pk_set)
+    elif reverse and action == 'pre_clear':
+        books = Books.objects.filter(author=instance)
+    else:
+        return
+    books.update(modified=timezone.now())
+
+
+@receiver(pre_delete, sender=Author)
+def touch_author_books(sender, instance, **kwargs):
+    Books.objects.filter(author=instance).update(modified=timezone.now())
+
+
+# Catalog statistics. Writes that bypass signals (bulk_create, bulk_update,
+# queryset updates) update them themselves, see library.stats.
+
+FACET_FIELDS = {'genre', 'release_date', 'book_pages'}
+
+
+@receiver(pre_save, sender=Books)
+def remember_book_facets(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not FACET_FIELDS & set(update_fields):
+        instance._facets_before = None
+    elif instance._state.adding and instance.pk is None:
+        instance._facets_before = Counter()
+    else:
+        instance._facets_before = stats.stored_facets(instance.pk)
+
+
+@receiver(post_save, sender=Books)
+def count_book(sender, instance, **kwargs):
+    before = getattr(instance, '_facets_before', None)
+    if before is not None:
+        stats.apply(stats.difference(stats.instance_facets(instance), before))
+
+
+@receiver(pre_delete, sender=Books)
+def remember_deleted_book(sender, instance, **kwargs):
+    # pre_delete: the book's author links are gone by post_delete.
+    facets = stats.instance_facets(instance)
+    for author_id in instance.author.through.objects.filter(books_id=instance.pk).values_list('author_id', flat=True):
+        facets[(stats.AUTHOR, author_id)] += 1
+    instance._facets_before = facets
+
+
+@receiver(post_delete, sender=Books)
+def uncount_book(sender, instance, **kwargs):
+    stats.apply(stats.difference(Counter(), instance._facets_before))
+
+
+@receiver(m2m_changed, sender=Books.author.through)
+def count_book_authors(sender, instance, action, reverse, pk_set, **kwargs):
+    # Links per author id; pk_set on post_add holds only the links that
+    # were actually added, on pre_remove any ids the caller passed.
+    if action in ('pre_remove', 'pre_clear'):
+        links = sender.objects.filter(**{'author_id' if reverse else 'books_id': instance.pk})
+        if action == 'pre_remove':
+            links = links.filter(**{'books_id__in' if reverse else 'author_id__in': pk_set})
+        instance._removed_author_links = Counter(links.values_list('author_id', flat=True))
+    elif action in ('post_remove', 'post_clear'):
+        removed = instance._removed_author_links
+        stats.apply({(stats.AUTHOR, author_id): -links for author_id, links in removed.items()})
+    elif action == 'post_add':
+        added = Counter({instance.pk: len(pk_set)}) if reverse else Counter(pk_set)
+        stats.apply({(stats.AUTHOR, author_id): links for author_id, links in added.items()})
+
+
+@receiver(post_save, sender=Author)
+def count_author(sender, instance, created, **kwargs):
+    if created:
+        stats.apply({(stats.AUTHORS, 0): 1})
+
+
+@receiver(post_delete, sender=Author)
+def uncount_author(sender, instance, **kwargs):
+    stats.apply({(stats.AUTHORS, 0): -1})
+    stats.remove(stats.AUTHOR, instance.pk)
+
+
+@receiver(post_delete, sender=Author)
+def release_author_image(sender, instance, **kwargs):
+    if instance.image:
+        images.release_on_commit(instance.image.name)
+
+
+@receiver(post_delete, sender=Token)
+def forget_token(sender, instance, **kwargs):
+    authentication.forget(instance.key)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_user_tokens(sender, instance, created, **kwargs):
+    # Covers deactivation and any other change to the cached user.
+    if not created:
+        authentication.forget(*Token.objects.filter(user=instance).values_list('key', flat=True))
@@ -0,0 +1,187 @@
+"""
+Catalog statistics: book counts per genre, release year, author and
+page-count bucket, plus the book and author totals, kept in FacetCount.
+
+Signals apply the change of each save, delete and author link change as a
+delta (see library.signals), and bulk writes that bypass signals compare a
+``tally`` of the rows before and after. ``rebuild`` recomputes everything
+from the catalog, for writes that go around the ORM. Reads go through the
+API cache under a generation token that every change bumps.
+"""
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+from django.db.models.functions import ExtractYear
+
+from library import cache
+from library.models import Author, Books, FacetCount
+
+BOOKS = 'books'
+AUTHORS = 'authors'
+GENRE = 'genre'
+YEAR = 'year'
+PAGES = 'pages'
+AUTHOR = 'author'
+
+# Lower bounds of the page-count buckets.
+PAGE_BUCKETS = (0, 100, 200, 300, 500, 1000)
+
+
+def page_bucket(pages):
+    return max(bound for bound in PAGE_BUCKETS if bound <= pages)
+
+
+def book_facets(genre, release_date, pages):
+    return Counter({(BOOKS, 0): 1, (GENRE, genre): 1, (YEAR, release_date.year): 1, (PAGES, page_bucket(pages)): 1})
+
+
+def instance_facets(book):
+    """The facets of an unsaved or just saved ``book``, whose fields may still be strings."""
+    fields = [book._meta.get_field(name) for name in ('genre', 'release_date', 'book_pages')]
+    return book_facets(*(field.to_python(getattr(book, field.attname)) for field in fields))
+
+
+def stored_facets(book_id):
+    """The facets of the row ``book_id`` as it is in the database, without its authors."""
+    row = Books.objects.filter(pk=book_id).values_list('genre', 'release_date', 'book_pages').first()
+    return book_facets(*row) if row else Counter()
+
+
+def tally(model, pks):
+    """Facet counts contributed by rows ``pks`` of ``model``, authors included."""
+    counts = Counter()
+    if model is Books:
+        for row in Books.objects.filter(pk__in=pks).values_list('genre', 'release_date', 'book_pages'):
+            counts.update(book_facets(*row))
+        through = Books.author.through
+        for author_id in through.objects.filter(books_id__in=pks).values_list('author_id', flat=True):
+            counts[(AUTHOR, author_id)] += 1
+    elif model is Author:
+        counts[(AUTHORS, 0)] = Author.objects.filter(pk__in=pks).count()
+    return counts
+
+
+def difference(after, before):
+    # Counter subtraction drops negative counts, which are the point here.
+    changes = Counter(after)
+    changes.subtract(before)
+    return changes
+
+
+def matching(keys):
+    values = defaultdict(list)
+    for facet, value in keys:
+        values[facet].append(value)
+    query = Q()
+    for facet, facet_values in values.items():
+        query |= Q(facet=facet, value__in=facet_values)
+    return query
+
+
+def apply(changes):
+    """Add ``changes``, a mapping of (facet, value) to a delta, to the counts."""
+    changes = {key: delta for key, delta in changes.items() if delta}
+    if not changes:
+        return
+    # Rows start at zero, whether this or a concurrent write creates them,
+    # and every delta is added the same way.
+    FacetCount.objects.bulk_create(
+        [FacetCount(facet=facet, value=value, count=0) for facet, value in changes], ignore_conflicts=True,
+    )
+    by_delta = defaultdict(list)
+    for key, delta in changes.items():
+        by_delta[delta].append(key)
+    for delta, keys in by_delta.items():
+        FacetCount.objects.filter(matching(keys)).update(count=F('count') + delta)
+    invalidate()
+
+
+def remove(facet, value):
+    FacetCount.objects.filter(facet=facet, value=value).delete()
+    invalidate()
+
+
+def invalidate():
+    cache.bump('gen:stats')
+    transaction.on_commit(lambda: cache.bump('gen:stats'))
+
+
+def rebuild(using='default'):
+    """Recompute every count from the catalog and return the number of rows written."""
+    books = Books.objects.using(using).order_by()
+    through = Books._meta.get_field('author').remote_field.through
+    pages = Case(
+        *[When(book_pages__gte=bound, then=Value(bound)) for bound in reversed(PAGE_BUCKETS)],
+        output_field=IntegerField(),
+    )
+    groups = (
+        (GENRE, books, 'genre'),
+        (YEAR, books.annotate(year=ExtractYear('release_date')), 'year'),
+        (PAGES, books.annotate(bucket=pages), 'bucket'),
+        (AUTHOR, through._default_manager.using(using).order_by(), 'author_id'),
+    )
+    rows = [
+        FacetCount(facet=BOOKS, value=0, count=books.count()),
+        FacetCount(facet=AUTHORS, value=0, count=Author.objects.using(using).count()),
+    ]
+    for facet, queryset, column in groups:
+        rows.extend(
+            FacetCount(facet=facet, value=value, count=count)
+            for value, count in queryset.values(column).annotate(count=Count('pk')).values_list(column, 'count')
+        )
+    with transaction.atomic(using=using):
+        FacetCount.objects.using(using).all().delete()
+        FacetCount.objects.using(using).bulk_create(rows, batch_size=1000)
+    invalidate()
+    return len(rows)
+
+
+def cache_key(key):
+    return f'stats:{cache.get_token("gen:stats")}:{key}'
+
+
+def cached(key, compute):
+    key = cache_key(key)
+    value = cache.get_cache().get(key)
+    if value is None:
+        value = compute()
+        cache.get_cache().set(key, value, settings.STATS_CACHE_TIMEOUT)
+    return value
+
+
+def count_queryset(facet, value):
+    return FacetCount.objects.filter(facet=facet, value=value).values_list('count', flat=True)
+
+
+def count(facet, value=0):
+    """The cached count of books with ``value`` for ``facet``, or the ``books``/``authors`` total."""
+    return cached(f'{facet}:{value}', lambda: count_queryset(facet, value).first() or 0)
+
+
+async def acount(facet, value=0):
+    backend = cache.get_cache()
+
+    def lookup():
+        key = cache_key(f'{facet}:{value}')
+        return key, backend.get(key)
+
+    key, result = await cache.call(backend, lookup)
+    if result is None:
+        result = await count_queryset(facet, value).afirst() or 0
+        await cache.call(backend, backend.set, key, result, settings.STATS_CACHE_TIMEOUT)
+    return result
+
+
+def facets(facet, limit=None):
+    """(value, count) pairs of ``facet``, largest first when ``limit`` is given, else by value."""
+    def compute():
+        rows = FacetCount.objects.filter(facet=facet, count__gt=0)
+        if limit is not None:
+            rows = rows.order_by('-count', 'value')[:limit]
+        else:
+            rows = rows.order_by('value')
+        return list(rows.values_list('value', 'count'))
+
+    return cached(f'{facet}:all:{limit}', compute)
@@ -0,0 +1,114 @@
+"""
+Content-addressed storage for author images.
+
+Uploads are hashed in a streaming pass and stored as
+``images/ab/cd/<sha256><ext>``, so identical files share one copy and a name
+never changes content, which makes the URLs safe to cache forever. Files
+derived from a stored image (thumbnails) are named after their source,
+e.g. ``images/ab/cd/<sha256>_64.jpg``, and are kept as named.
+"""
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+HASH_CHUNK_SIZE = 64 * 2 ** 10
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    prefix = 'images'
+
+    def __init__(self, *args, prefix=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if prefix is not None:
+            self.prefix = prefix
+        self.addressed_re = re.compile(
+            rf'^{re.escape(self.prefix)}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/(?P<digest>[0-9a-f]{{64}})(_[\w-]+)?(\.\w+)?$'
+        )
+
+    def digest(self, content):
+        sha = hashlib.sha256()
+        for chunk in content.chunks(HASH_CHUNK_SIZE):
+            sha.update(chunk)
+        content.seek(0)
+        return sha.hexdigest()
+
+    def addressed_name(self, digest, ext=''):
+        return f'{self.prefix}/{digest[:2]}/{digest[2:4]}/{digest}{ext.lower()}'
+
+    def source_digest(self, name):
+        """The content hash ``name`` is stored under or derived from, if any."""
+        match = self.addressed_re.match(name or '')
+        return match.group('digest') if match else None
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        if self.source_digest(name) is None:
+            name = self.addressed_name(self.digest(content), os.path.splitext(name)[1])
+        return self._save(name, content)
+
+    def _save(self, name, content):
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            # Refresh mtime so garbage collection doesn't race this reference.
+            os.utime(full_path)
+            return name
+
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, mode=self.directory_permissions_mode or 0o777, exist_ok=True)
+        # Write aside and rename so concurrent uploads of the same content
+        # never see a partial file.
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                for chunk in content.chunks():
+                    handle.write(chunk)
+            os.chmod(tmp_path, self.file_permissions_mode or 0o644)
+            os.replace(tmp_path, full_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return name
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def related_names(self, name):
+        """``name`` and every file derived from it."""
+        digest = self.source_digest(name)
+        if digest is None:
+            return [name] if self.exists(name) else []
+        directory = os.path.dirname(name)
+        try:
+            _, files = self.listdir(directory)
+        except FileNotFoundError:
+            return []
+        return [f'{directory}/{filename}' for filename in files if filename.startswith(digest)]
+
+    def age(self, name):
+        return time.time() - os.path.getmtime(self.path(name))
+
+    def walk(self, directory=None):
+        """Yield the name of every file under ``directory`` (``prefix``)."""
+        root = self.path(directory or self.prefix)
+        for dirpath, _, files in os.walk(root):
+            relative = os.path.relpath(dirpath, self.location).replace(os.sep, '/')
+            for filename in files:
+                yield f'{relative}/{filename}'
+
+
+author_image_storage = ContentAddressedStorage()
+
+
+def get_author_image_storage():
+    return author_image_storage
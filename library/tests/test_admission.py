@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from library import admission, cache, metrics, throttling
+from library.models import Books
+from .test_books import BOOKS_URL, detail_url
+
+LIMITS = {'books-list': {'concurrency': 1, 'queue': 1, 'max_wait': 0.5}}
+
+
+class LimiterTests(SimpleTestCase):
+
+    def test_queue_and_handoff(self):
+        limiter = admission.Limiter(1, queue=1, max_wait=5)
+        started = limiter.acquire()
+        admitted = []
+        waiter = threading.Thread(target=lambda: admitted.append(limiter.acquire()))
+        waiter.start()
+        while not limiter.waiters:
+            time.sleep(0.001)
+
+        with self.assertRaises(admission.Rejected) as rejected:
+            limiter.acquire()
+        self.assertEqual(rejected.exception.reason, 'queue full')
+
+        limiter.release(started)
+        waiter.join()
+        self.assertEqual(len(admitted), 1)
+        self.assertEqual(limiter.active, 1)
+        limiter.release(admitted[0])
+        self.assertEqual(limiter.active, 0)
+
+    def test_timeout(self):
+        limiter = admission.Limiter(1, queue=1, max_wait=0.01)
+        limiter.acquire()
+
+        with self.assertRaises(admission.Rejected) as rejected:
+            limiter.acquire()
+
+        self.assertEqual(rejected.exception.reason, 'timed out')
+        self.assertFalse(limiter.waiters)
+
+    def test_rejects_waits_past_max_wait(self):
+        limiter = admission.Limiter(1, queue=10, max_wait=1)
+        limiter.acquire()
+        limiter.service_time = 3
+
+        with self.assertRaises(admission.Rejected) as rejected:
+            limiter.acquire()
+
+        self.assertEqual(rejected.exception.reason, 'too slow')
+        self.assertEqual(rejected.exception.retry_after, 3)
+
+    async def test_async_handoff(self):
+        limiter = admission.Limiter(1, queue=2, max_wait=5)
+        started = limiter.acquire()
+        first = asyncio.ensure_future(limiter.aacquire())
+        second = asyncio.ensure_future(limiter.aacquire())
+        await asyncio.sleep(0)
+
+        # A cancelled waiter leaves the queue to the next one.
+        first.cancel()
+        await asyncio.sleep(0)
+        threading.Thread(target=limiter.release, args=(started,)).start()
+
+        await second
+        self.assertTrue(first.cancelled())
+        self.assertEqual(limiter.active, 1)
+        self.assertFalse(limiter.waiters)
+
+
+@override_settings(ADMISSION_LIMITS=LIMITS)
+class AdmissionMiddlewareTests(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        admission.reset()
+        self.addCleanup(admission.reset)
+        self.book = Books.objects.create(title='book', book_pages=10, genre=1, release_date='2023-01-01')
+
+    def test_rejects_when_full(self):
+        limiter = admission.get_limiter('books-list', 'GET')
+        limiter.acquire()
+        limiter.service_time = 2
+        before = metrics.REJECTED.values.get(('books-list', 'too slow'), 0)
+
+        response = self.client.get(BOOKS_URL)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '2')
+        self.assertEqual(metrics.REJECTED.values[('books-list', 'too slow')], before + 1)
+        # Other routes are not limited, and writes have their own slots.
+        self.assertEqual(self.client.get(detail_url(self.book.id)).status_code, 200)
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(username='test', password='123456'))
+        payload = {'title': 'new', 'book_pages': 10, 'genre': 1, 'release_date': '2023-01-01'}
+        self.assertEqual(client.post(BOOKS_URL, payload, format='json').status_code, 201)
+
+    def test_releases_slot(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get(BOOKS_URL).status_code, 200)
+        self.assertEqual(admission.get_limiter('books-list', 'GET').active, 0)
+
+    @override_settings(ROOT_URLCONF='library.tests.test_async')
+    async def test_async(self):
+        limiter = admission.get_limiter('books-list', 'GET')
+        started = limiter.acquire()
+        request = asyncio.ensure_future(self.async_client.get(BOOKS_URL, accept='application/json'))
+        while not limiter.waiters:
+            await asyncio.sleep(0.001)
+
+        limiter.release(started)
+        response = await request
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['results'][0]['title'], 'book')
+        self.assertEqual(limiter.active, 0)
+
+
+@override_settings(THROTTLE_BUCKETS={'user': (1, 2), 'anon': (1, 3)})
+class ThrottleTests(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        throttling.reset()
+        self.addCleanup(throttling.reset)
+
+    def test_anonymous_burst(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get(BOOKS_URL).status_code, 200)
+
+        response = self.client.get(BOOKS_URL)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_per_user(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(username='test', password='123456'))
+        statuses = [client.get(BOOKS_URL).status_code for _ in range(3)]
+
+        self.assertEqual(statuses, [200, 200, 429])
+        # Anonymous clients have their own bucket.
+        self.assertEqual(self.client.get(BOOKS_URL).status_code, 200)
+
+    def test_unthrottled_scope(self):
+        with self.settings(THROTTLE_BUCKETS={'anon': None}):
+            for _ in range(5):
+                self.assertEqual(self.client.get(BOOKS_URL).status_code, 200)
+
+    @override_settings(THROTTLE_CACHE_ALIAS='default')
+    def test_shared_buckets(self):
+        self.addCleanup(caches['default'].clear)
+        statuses = [self.client.get(BOOKS_URL).status_code for _ in range(4)]
+
+        self.assertEqual(statuses, [200, 200, 200, 429])
+        self.assertFalse(throttling.local_buckets.full_at)
+        # Stored as wall-clock time, which other hosts can compare against.
+        full_at = caches['default'].get('throttle:' + hashlib.sha256(b'anon:127.0.0.1').hexdigest())
+        self.assertAlmostEqual(full_at, time.time() + 3, delta=1)
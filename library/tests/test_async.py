@@ -0,0 +1,148 @@
+import asyncio
+import json
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import include, path, resolve
+from rest_framework.authtoken.models import Token
+from rest_framework.routers import DefaultRouter
+from library import cache, views
+from library.models import Books
+from library.serializers import BooksSerializer
+from .test_author import sample_author
+
+with override_settings(ASYNC_VIEWS=True):
+    router = DefaultRouter(trailing_slash=False)
+    router.register(r'books', views.BooksViewSet)
+    router.register(r'author', views.AuthorViewSet)
+    urlpatterns = [path('v1/', include(router.urls))]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncViewTests(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.author = sample_author(name='leo')
+        self.books = []
+        for index in range(3):
+            book = Books.objects.create(
+                title=f'book{index}', book_pages=10, genre=index, release_date='2023-01-01'
+            )
+            book.author.add(self.author)
+            self.books.append(book)
+        user = get_user_model().objects.create_user(username='abc', password='test123456')
+        self.token = Token.objects.create(user=user)
+
+    def test_routes_are_coroutines(self):
+        self.assertTrue(asyncio.iscoroutinefunction(resolve('/v1/books').func))
+        self.assertTrue(asyncio.iscoroutinefunction(resolve('/v1/author/1').func))
+        self.assertFalse(asyncio.iscoroutinefunction(resolve('/v1/books/search').func))
+
+    async def test_list_matches_sync_serializer(self):
+        response = await self.async_client.get('/v1/books', {'page_size': 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        body = json.loads(response.content)
+        books = await sync_to_async(
+            lambda: BooksSerializer(Books.objects.prefetch_related('author')[:2], many=True).data
+        )()
+        self.assertEqual(body['results'], json.loads(json.dumps(books)))
+
+        response = await self.async_client.get(body['next'])
+        self.assertEqual([book['title'] for book in json.loads(response.content)['results']], ['book2'])
+
+    async def test_list_filters(self):
+        response = await self.async_client.get('/v1/books', {'genre': 1})
+        self.assertEqual([book['title'] for book in json.loads(response.content)['results']], ['book1'])
+
+        response = await self.async_client.get('/v1/books', {'released_after': 'soon'})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_retrieve(self):
+        response = await self.async_client.get(f'/v1/books/{self.books[0].id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['author'][0]['name'], 'leo')
+
+        self.assertEqual((await self.async_client.get('/v1/books/999')).status_code, 404)
+        self.assertEqual((await self.async_client.get('/v1/books/abc')).status_code, 404)
+
+    async def test_conditional_get(self):
+        etag = (await self.async_client.get(f'/v1/author/{self.author.id}'))['ETag']
+
+        response = await self.async_client.get(f'/v1/author/{self.author.id}', if_none_match=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    async def test_response_cache_off_event_loop(self):
+        threads = []
+        fetch = cache.fetch
+
+        def recording_fetch(key):
+            threads.append(threading.get_ident())
+            return fetch(key)
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        network_cache = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory}
+        with mock.patch('library.cache.fetch', recording_fetch):
+            self.assertEqual((await self.async_client.get('/v1/books')).status_code, 200)
+            with override_settings(CACHES={**settings.CACHES, 'api': network_cache}):
+                for _ in range(2):
+                    self.assertEqual((await self.async_client.get('/v1/books')).status_code, 200)
+
+        # Local memory is called on the event loop, any other backend in a thread.
+        self.assertEqual(threads[0], threading.get_ident())
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(threading.get_ident(), threads[1:])
+
+    async def test_create(self):
+        payload = {'title': 'async', 'book_pages': 5, 'genre': 1, 'release_date': '2023-01-01',
+                   'author_ids': [self.author.id]}
+
+        response = await self.async_client.post(
+            '/v1/books', payload, content_type='application/json',
+            authorization=f'Token {self.token.key}',
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(json.loads(response.content)['author'][0]['id'], self.author.id)
+        book = await Books.objects.aget(title='async')
+        self.assertEqual([author async for author in book.author.values_list('id', flat=True)], [self.author.id])
+
+    async def test_create_validation_and_auth(self):
+        payload = {'title': 'book0', 'book_pages': 5, 'genre': 1, 'release_date': '2023-01-01'}
+
+        response = await self.async_client.post('/v1/books', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+        response = await self.async_client.post(
+            '/v1/books', payload, content_type='application/json', authorization='Token nope',
+        )
+        self.assertEqual(response.status_code, 401)
+
+        response = await self.async_client.post(
+            '/v1/books', payload, content_type='application/json',
+            authorization=f'Token {self.token.key}',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('title', json.loads(response.content))
+
+    async def test_other_requests_use_sync_views(self):
+        response = await self.async_client.get('/v1/books', accept='text/html')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+
+        response = await self.async_client.patch(
+            f'/v1/author/{self.author.id}', {'fb_name': 'leo.fb'}, content_type='application/json',
+            authorization=f'Token {self.token.key}',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['fb_name'], 'leo.fb')
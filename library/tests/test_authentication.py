@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import exceptions, status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
+from library.authentication import CachedTokenAuthentication
+
+TOKEN_URL = reverse('token')
+AUTHOR_URL = reverse('author-list')
+
+
+class CachedTokenAuthenticationTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='abc', password='test123456')
+        response = APIClient().post(TOKEN_URL, {'username': 'abc', 'password': 'test123456'})
+        self.key = response.data['token']
+        self.request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Token {self.key}')
+
+    def authenticate(self):
+        return CachedTokenAuthentication().authenticate(self.request)
+
+    def test_issued_token_is_cached(self):
+        with self.assertNumQueries(0):
+            user, token = self.authenticate()
+        self.assertEqual(user, self.user)
+        self.assertEqual(token.key, self.key)
+
+    def test_write_with_token(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.key}')
+        payload = {'name': 'a', 'surname': 'b', 'email': 'a@gmail.com', 'phone': 1}
+        response = client.post(AUTHOR_URL, payload)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_deleted_token_rejected(self):
+        self.authenticate()
+        Token.objects.filter(key=self.key).delete()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate()
+
+    def test_deactivated_user_rejected(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate()
+
+    def test_invalid_token(self):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION='Token nope')
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            CachedTokenAuthentication().authenticate(request)
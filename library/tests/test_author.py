@@ -1,12 +1,17 @@
+import io
 import os
 import tempfile
+from unittest import mock
 from PIL import Image
-from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
+from library import images
 from library.models import Author
+from library.querycheck import QueryCheckMixin
 from library.serializers import AuthorSerializer
 
 AUTHOR_URL = reverse('author-list')
@@ -32,7 +37,7 @@ def sample_author(**params):
     return Author.objects.create(**defaults)
 
 
-class AuthorViewTests(TestCase):
+class AuthorViewTests(QueryCheckMixin, TestCase):
 
     def setUp(self):
         self.client = APIClient()
@@ -51,8 +56,8 @@ class AuthorViewTests(TestCase):
         serializer = AuthorSerializer(author, many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data['results'], serializer.data)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_detail_view_unauthorized_read_only(self):
         author = sample_author()
@@ -82,8 +87,17 @@ class AuthorViewTests(TestCase):
         serializer = AuthorSerializer(author, many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data['results'], serializer.data)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_list_query_count_constant(self):
+        created = []
+
+        def add_authors(count):
+            for _ in range(count):
+                created.append(sample_author(name=f'name{len(created)}', email=f'{len(created)}@gmail.com'))
+
+        self.assertQueryCountConstant(lambda: self.client.get(AUTHOR_URL), add_authors)
 
     def test_detail_view(self):
         author = sample_author()
@@ -150,7 +164,7 @@ class AuthorViewTests(TestCase):
         response = self.client.get(AUTHOR_URL + f'?search={author.name}')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(
-            len(response.json()),
+            len(response.json()['results']),
             Author.objects.filter(name=author.name).count()
         )
 
@@ -159,7 +173,7 @@ class AuthorViewTests(TestCase):
         response = self.client.get(AUTHOR_URL + f'?search={author.email}')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(
-            len(response.json()),
+            len(response.json()['results']),
             Author.objects.filter(email=author.email).count()
         )
 
@@ -168,10 +182,33 @@ class AuthorViewTests(TestCase):
         response = self.client.get(AUTHOR_URL + f'?search={author.surname}')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(
-            len(response.json()),
+            len(response.json()['results']),
             Author.objects.filter(surname=author.surname).count()
         )
 
+    def test_search_no_match(self):
+        sample_author()
+        response = self.client.get(AUTHOR_URL + '?search=missing')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()['results']), 0)
+
+    def test_filter_surname_prefix(self):
+        sample_author(surname='smith')
+        sample_author(surname='smithson')
+        sample_author(surname='jones')
+        response = self.client.get(AUTHOR_URL + '?surname=smith')
+        self.assertEqual(
+            sorted(author['surname'] for author in response.data['results']),
+            ['smith', 'smithson'],
+        )
+
+    def test_filter_email(self):
+        sample_author(name='a', email='a@gmail.com')
+        sample_author(name='b', email='b@gmail.com')
+        response = self.client.get(AUTHOR_URL + '?email=b@gmail.com')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['name'], 'b')
+
     def test_upload_image_to_recipe(self):
         author = sample_author()
         url = image_upload_url(author.id)
@@ -191,3 +228,68 @@ class AuthorViewTests(TestCase):
         url = image_upload_url(author.id)
         res = self.client.post(url, {'image': 'testnotimage'}, format='multipart')
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+def jpeg_bytes(size=(600, 400)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color='red').save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+@override_settings(IMAGE_PROCESSING_EAGER=True)
+class AuthorImageProcessingTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='test',
+            password='123456'
+        )
+        self.client.force_authenticate(self.user)
+        self.author = sample_author()
+
+    def tearDown(self):
+        self.author.refresh_from_db()
+        if self.author.image:
+            self.author.image.delete()
+        for name in self.author.image_variants.values():
+            images.image_storage().delete(name)
+
+    def upload(self, content, filename='portrait.jpg'):
+        upload = SimpleUploadedFile(filename, content, content_type='image/jpeg')
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                image_upload_url(self.author.id), {'image': upload}, format='multipart'
+            )
+
+    def test_thumbnails_generated(self):
+        response = self.upload(jpeg_bytes())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['thumbnails'], {})
+
+        self.author.refresh_from_db()
+        self.assertEqual(sorted(self.author.image_variants, key=int), ['64', '256', '512'])
+        with images.image_storage().open(self.author.image_variants['64']) as handle:
+            self.assertEqual(max(Image.open(handle).size), 64)
+
+        response = self.client.get(detail_url(self.author.id))
+        self.assertEqual(len(response.data['thumbnails']), 3)
+        self.assertTrue(response.data['thumbnails']['256'].startswith('http://testserver/media/'))
+
+    def test_corrupt_image_discarded(self):
+        with self.assertLogs('library.images', 'WARNING'):
+            response = self.upload(jpeg_bytes()[:1000])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.author.refresh_from_db()
+        self.assertFalse(self.author.image)
+        self.assertEqual(self.author.image_variants, {})
+
+    @override_settings(IMAGE_PROCESSING_EAGER=False)
+    def test_processing_runs_in_background(self):
+        with mock.patch('library.images.get_executor') as get_executor:
+            self.upload(jpeg_bytes())
+        self.author.refresh_from_db()
+        get_executor.return_value.submit.assert_called_once_with(
+            images.run_in_worker, self.author.id, self.author.image.name
+        )
@@ -3,7 +3,8 @@ from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
-from library.models import Books
+from library.models import Books, Author
+from library.querycheck import QueryCheckMixin
 from library.serializers import BooksSerializer
 from .test_author import sample_author
 
@@ -24,10 +25,12 @@ def sample_book(**params):
     defaults.update(params)
     book = Books.objects.create(**defaults)
     book.author.add(sample_author(name='test2'))
+    # Adding an author moves the book's modified timestamp.
+    book.refresh_from_db()
     return book
 
 
-class BooksViewTests(TestCase):
+class BooksViewTests(QueryCheckMixin, TestCase):
     maxDiff = None
     # fixtures = [
     #     "author.json",
@@ -51,8 +54,8 @@ class BooksViewTests(TestCase):
         serializer = BooksSerializer(book, many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data['results'], serializer.data)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_detail_view_unauthorized_read_only(self):
         book = sample_book()
@@ -82,8 +85,8 @@ class BooksViewTests(TestCase):
         serializer = BooksSerializer(books, many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data['results'], serializer.data)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_detail_view(self):
         book = sample_book()
@@ -109,6 +112,24 @@ class BooksViewTests(TestCase):
         self.assertEqual(response.data['book_pages'], payload['book_pages'])
         self.assertEqual(response.data['genre'], payload['genre'])
 
+    def test_create_with_author_ids(self):
+        author = sample_author()
+        payload = {
+            'title': 'book5',
+            'book_pages': 50,
+            'genre': 1,
+            'author_ids': [author.id],
+            'release_date': '2023-01-01',
+        }
+        response = self.client.post(BOOKS_URL, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['author'][0]['id'], author.id)
+
+        payload['title'] = 'book6'
+        payload['author_ids'] = [author.id + 100]
+        response = self.client.post(BOOKS_URL, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_partial_update(self):
         book = sample_book()
         payload = {
@@ -153,7 +174,7 @@ class BooksViewTests(TestCase):
         response = self.client.get(BOOKS_URL + f'?search={book.title}')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(
-            len(response.json()),
+            len(response.json()['results']),
             Books.objects.filter(title=book.title).count()
         )
 
@@ -162,7 +183,7 @@ class BooksViewTests(TestCase):
         response = self.client.get(BOOKS_URL + f'?search=test2')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(
-            len(response.json()),
+            len(response.json()['results']),
             Books.objects.filter(author__name='test2').count()
         )
 
@@ -171,7 +192,7 @@ class BooksViewTests(TestCase):
         response = self.client.get(BOOKS_URL + f'?search={book.book_pages}')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(
-            len(response.json()),
+            len(response.json()['results']),
             Books.objects.filter(book_pages=book.book_pages).count()
         )
 
@@ -180,7 +201,7 @@ class BooksViewTests(TestCase):
         response = self.client.get(BOOKS_URL + f'?search={book.book_pages}')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(
-            len(response.json()),
+            len(response.json()['results']),
             Books.objects.filter(book_pages=book.book_pages).count()
         )
 
@@ -189,6 +210,102 @@ class BooksViewTests(TestCase):
         response = self.client.get(BOOKS_URL + f'?search=2023-01-01')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(
-            len(response.json()),
+            len(response.json()['results']),
             Books.objects.filter(release_date='2023-01-01').count()
         )
+
+
+class BooksQueryCountTests(QueryCheckMixin, TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def create_books(self, count, authors_per_book=2):
+        start = Books.objects.count()
+        for i in range(start, start + count):
+            book = Books.objects.create(
+                title=f'book-{i}',
+                book_pages=100,
+                genre=1,
+                release_date='2023-01-01',
+            )
+            for j in range(authors_per_book):
+                book.author.add(
+                    sample_author(name=f'name-{i}-{j}', surname=f'surname-{i}-{j}')
+                )
+
+    def test_list_query_count_constant(self):
+        for size in (1, 10, 50):
+            Books.objects.all().delete()
+            Author.objects.all().delete()
+            self.create_books(size)
+            # collection versions (books and authors in one lookup), count,
+            # page, author prefetch
+            with self.assertNumQueries(4):
+                response = self.client.get(BOOKS_URL)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['results']), size)
+
+    def test_detail_query_count_constant(self):
+        for authors_per_book in (1, 5, 20):
+            Books.objects.all().delete()
+            Author.objects.all().delete()
+            self.create_books(1, authors_per_book)
+            book = Books.objects.get()
+            # row version, book, author prefetch
+            with self.assertNumQueries(3):
+                response = self.client.get(detail_url(book.id))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['author']), authors_per_book)
+
+    def test_search_query_count_constant(self):
+        self.assertQueryCountConstant(
+            lambda: self.client.get(BOOKS_URL + '?search=book'),
+            self.create_books,
+        )
+
+
+class BooksFilterTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author = sample_author(name='ann')
+        self.books = []
+        for title, genre, release_date in (
+            ('Night river', 1, '2001-05-01'),
+            ('Night garden', 2, '2010-01-01'),
+            ('night owl', 1, '2020-01-01'),
+        ):
+            self.books.append(Books.objects.create(
+                title=title, book_pages=10, genre=genre, release_date=release_date,
+            ))
+        self.books[0].author.add(self.author)
+
+    def titles(self, query):
+        response = self.client.get(BOOKS_URL + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(book['title'] for book in response.data['results'])
+
+    def test_filter_title_prefix(self):
+        self.assertEqual(self.titles('?title=Night'), ['Night garden', 'Night river'])
+
+    def test_filter_author_name(self):
+        self.assertEqual(self.titles('?author=ann'), ['Night river'])
+
+    def test_filter_release_date_range(self):
+        self.assertEqual(
+            self.titles('?released_after=2005-01-01&released_before=2015-01-01'),
+            ['Night garden'],
+        )
+
+    def test_filter_genre(self):
+        self.assertEqual(self.titles('?genre=1'), ['Night river', 'night owl'])
+
+    def test_search_no_match(self):
+        self.assertEqual(self.titles('?search=missing'), [])
+
+    def test_filter_invalid_value(self):
+        response = self.client.get(BOOKS_URL + '?released_after=yesterday&genre=x')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('released_after', response.data)
+        self.assertIn('genre', response.data)
@@ -0,0 +1,161 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from library.models import Author, Books
+from .test_author import sample_author
+
+BOOKS_BULK_URL = reverse('books-bulk')
+AUTHOR_BULK_URL = reverse('author-bulk')
+
+
+def book_payload(title, **params):
+    payload = {
+        'title': title,
+        'book_pages': 100,
+        'genre': 1,
+        'release_date': '2023-01-01',
+    }
+    payload.update(params)
+    return payload
+
+
+class BulkViewTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='test',
+            password='123456'
+        )
+        self.client.force_authenticate(self.user)
+        self.authors = [sample_author(name=f'name{i}') for i in range(3)]
+
+    def test_bulk_unauthorized(self):
+        response = APIClient().post(BOOKS_BULK_URL, [book_payload('a')], format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bulk_create_books(self):
+        author_ids = [author.id for author in self.authors]
+        payload = [
+            book_payload(f'book{i}', author_ids=author_ids[:i + 1]) for i in range(3)
+        ]
+        # author ids, titles, savepoint, two inserts, collection version,
+        # statistics (books and links, insert, an update per distinct
+        # delta), release, re-read with prefetch
+        with self.assertNumQueries(15):
+            response = self.client.post(BOOKS_BULK_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([book['title'] for book in response.data], ['book0', 'book1', 'book2'])
+        self.assertEqual(len(response.data[2]['author']), 3)
+        self.assertEqual(Books.objects.get(title='book1').author.count(), 2)
+
+    def test_bulk_create_reports_errors_per_item(self):
+        Books.objects.create(**book_payload('taken'))
+        payload = [
+            book_payload('ok'),
+            book_payload('taken'),
+            book_payload('bad', book_pages='many'),
+            book_payload('dup'),
+            book_payload('dup'),
+            book_payload('ghost', author_ids=[999]),
+        ]
+        response = self.client.post(BOOKS_BULK_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data), len(payload))
+        self.assertEqual(response.data[0], {})
+        self.assertIn('title', response.data[1])
+        self.assertIn('book_pages', response.data[2])
+        self.assertEqual(response.data[3], {})
+        self.assertIn('title', response.data[4])
+        self.assertIn('author_ids', response.data[5])
+        self.assertFalse(Books.objects.filter(title='ok').exists())
+
+    def test_bulk_update_books(self):
+        books = [Books.objects.create(**book_payload(f'book{i}')) for i in range(2)]
+        books[0].author.add(self.authors[0])
+        payload = [
+            {'id': books[0].id, 'book_pages': 500, 'author_ids': [self.authors[1].id]},
+            {'id': books[1].id, 'title': 'renamed'},
+        ]
+        response = self.client.patch(BOOKS_BULK_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        books[0].refresh_from_db()
+        books[1].refresh_from_db()
+        self.assertEqual(books[0].book_pages, 500)
+        self.assertEqual(list(books[0].author.all()), [self.authors[1]])
+        self.assertEqual(books[1].title, 'renamed')
+        self.assertEqual(books[1].book_pages, 100)
+
+    def test_bulk_update_keeps_own_unique_values(self):
+        book = Books.objects.create(**book_payload('same'))
+        payload = [{'id': book.id, 'title': 'same', 'genre': 3}]
+        response = self.client.patch(BOOKS_BULK_URL, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_bulk_update_unknown_id(self):
+        payload = [{'id': 12345, 'title': 'x'}, {'title': 'no id'}]
+        response = self.client.patch(BOOKS_BULK_URL, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('id', response.data[0])
+        self.assertIn('id', response.data[1])
+
+    def test_bulk_rejects_boolean_ids(self):
+        book = Books.objects.create(**book_payload('book'))
+
+        response = self.client.patch(BOOKS_BULK_URL, [{'id': True, 'title': 'x'}, {'id': 'a'}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, [{'id': ['A valid integer is required.']}] * 2)
+
+        response = self.client.delete(BOOKS_BULK_URL, [book.id, True], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[1], {'id': ['A valid integer is required.']})
+        book.refresh_from_db()
+        self.assertEqual(book.title, 'book')
+
+    def test_bulk_delete(self):
+        books = [Books.objects.create(**book_payload(f'book{i}')) for i in range(3)]
+        ids = [books[0].id, books[2].id]
+        response = self.client.delete(BOOKS_BULK_URL, ids, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(list(Books.objects.values_list('id', flat=True)), [books[1].id])
+
+    def test_bulk_delete_unknown_id(self):
+        book = Books.objects.create(**book_payload('book'))
+        response = self.client.delete(BOOKS_BULK_URL, [book.id, 999], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertTrue(Books.objects.filter(id=book.id).exists())
+
+    def test_bulk_create_authors(self):
+        payload = [
+            {'name': 'new', 'surname': f's{i}', 'email': f'{i}@gmail.com', 'phone': i}
+            for i in range(5)
+        ]
+        response = self.client.post(AUTHOR_BULK_URL, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Author.objects.filter(name='new').count(), 5)
+
+    def test_bulk_rejects_non_list_and_oversized(self):
+        response = self.client.post(AUTHOR_BULK_URL, {'name': 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(AUTHOR_BULK_URL, [{}] * 1001, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_authors_unique_together(self):
+        payload = [
+            {'name': 'name0', 'surname': 'author', 'email': 'a@gmail.com', 'phone': 1},
+            {'name': 'x', 'surname': 'y', 'email': 'b@gmail.com', 'phone': 2},
+            {'name': 'x', 'surname': 'y', 'email': 'c@gmail.com', 'phone': 3},
+        ]
+        response = self.client.post(AUTHOR_BULK_URL, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('non_field_errors', response.data[0])
+        self.assertEqual(response.data[1], {})
+        self.assertIn('non_field_errors', response.data[2])
@@ -0,0 +1,100 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from library import cache
+from library.models import Books
+from .test_author import sample_author
+
+BOOKS_URL = reverse('books-list')
+AUTHOR_URL = reverse('author-list')
+
+
+def detail_url(book_id):
+    return reverse('books-detail', args=[book_id])
+
+
+class ResponseCacheTests(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.client = APIClient()
+        self.author = sample_author(name='leo')
+        self.book = Books.objects.create(
+            title='book1', book_pages=10, genre=1, release_date='2023-01-01'
+        )
+        self.book.author.add(self.author)
+
+    def test_repeated_reads_skip_database(self):
+        first = self.client.get(BOOKS_URL)
+        self.client.get(detail_url(self.book.id))
+        with self.assertNumQueries(0):
+            second = self.client.get(BOOKS_URL)
+            self.client.get(detail_url(self.book.id))
+        self.assertEqual(first.data, second.data)
+
+    def test_etag_not_modified(self):
+        response = self.client.get(detail_url(self.book.id))
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get(detail_url(self.book.id), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(detail_url(self.book.id), HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_book_save_invalidates(self):
+        self.client.get(BOOKS_URL)
+        etag = self.client.get(detail_url(self.book.id))['ETag']
+
+        self.book.title = 'renamed'
+        self.book.save()
+
+        self.assertEqual(self.client.get(BOOKS_URL).data['results'][0]['title'], 'renamed')
+        response = self.client.get(detail_url(self.book.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'renamed')
+
+    def test_book_authors_change_invalidates(self):
+        self.client.get(detail_url(self.book.id))
+        self.book.author.add(sample_author(name='jane'))
+        self.assertEqual(len(self.client.get(detail_url(self.book.id)).data['author']), 2)
+
+        self.book.author.clear()
+        self.assertEqual(self.client.get(detail_url(self.book.id)).data['author'], [])
+
+    def test_author_change_invalidates_books(self):
+        self.client.get(BOOKS_URL)
+        self.client.get(detail_url(self.book.id))
+        self.client.get(AUTHOR_URL)
+
+        self.author.surname = 'tolstoy'
+        self.author.save()
+
+        self.assertEqual(self.client.get(AUTHOR_URL).data['results'][0]['surname'], 'tolstoy')
+        self.assertEqual(
+            self.client.get(detail_url(self.book.id)).data['author'][0]['surname'], 'tolstoy'
+        )
+        self.assertEqual(
+            self.client.get(BOOKS_URL).data['results'][0]['author'][0]['surname'], 'tolstoy'
+        )
+
+        self.author.delete()
+        self.assertEqual(self.client.get(detail_url(self.book.id)).data['author'], [])
+
+    def test_bulk_write_invalidates(self):
+        self.client.get(BOOKS_URL)
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(username='u', password='123456'))
+        payload = [{'title': 'book2', 'book_pages': 1, 'genre': 1, 'release_date': '2023-01-01'}]
+        client.post(reverse('books-bulk'), payload, format='json')
+
+        self.assertEqual(len(self.client.get(BOOKS_URL).data['results']), 2)
+
+    def test_deleted_book_not_served(self):
+        self.client.get(detail_url(self.book.id))
+        self.book.delete()
+        response = self.client.get(detail_url(self.book.id))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APIClient
+from library import cache
+from library.models import Books
+from .test_author import sample_author
+
+BOOKS_URL = reverse('books-list')
+
+
+def detail_url(book_id):
+    return reverse('books-detail', args=[book_id])
+
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author = sample_author(name='leo')
+        self.book = Books.objects.create(
+            title='book1', book_pages=10, genre=1, release_date='2023-01-01'
+        )
+        self.book.author.add(self.author)
+
+    def get(self, url, **headers):
+        # Bypass the response cache so the row versions are what answers.
+        cache.get_cache().clear()
+        return self.client.get(url, **headers)
+
+    def test_detail_not_modified_without_loading_book(self):
+        etag = self.get(detail_url(self.book.id))['ETag']
+        cache.get_cache().clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(detail_url(self.book.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_detail_if_modified_since(self):
+        self.book.refresh_from_db()
+        since = http_date((self.book.modified + timedelta(seconds=1)).timestamp())
+        response = self.get(detail_url(self.book.id), HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        since = http_date((self.book.modified - timedelta(seconds=1)).timestamp())
+        response = self.get(detail_url(self.book.id), HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_author_links_bump_book_version(self):
+        etag = self.get(detail_url(self.book.id))['ETag']
+        modified = Books.objects.get().modified
+
+        self.book.author.add(sample_author(name='jane'))
+
+        self.assertGreater(Books.objects.get().modified, modified)
+        response = self.get(detail_url(self.book.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_reverse_author_links_bump_book_version(self):
+        modified = Books.objects.get().modified
+        self.author.books_set.clear()
+        self.assertGreater(Books.objects.get().modified, modified)
+
+    def test_author_change_changes_book_etag(self):
+        etag = self.get(detail_url(self.book.id))['ETag']
+        self.author.email = 'new@gmail.com'
+        self.author.save()
+        response = self.get(detail_url(self.book.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_version(self):
+        etag = self.get(BOOKS_URL)['ETag']
+        response = self.get(BOOKS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        other = Books.objects.create(
+            title='book2', book_pages=10, genre=1, release_date='2023-01-01'
+        )
+        changed = self.get(BOOKS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+
+        # Deleting an older row leaves the newest timestamp unchanged.
+        self.book.delete()
+        response = self.get(BOOKS_URL, HTTP_IF_NONE_MATCH=changed['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([book['id'] for book in response.data['results']], [other.id])
+
+    def test_list_not_modified_in_one_query(self):
+        etag = self.get(BOOKS_URL)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.get(BOOKS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Embedded authors are part of the list version too.
+        self.author.name = 'leon'
+        self.author.save()
+        self.assertEqual(self.get(BOOKS_URL, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_missing_book(self):
+        response = self.get(detail_url(12345), HTTP_IF_NONE_MATCH='"x"')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+
+from django.db import OperationalError, connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import TestCase, override_settings
+
+
+def pragma(wrapper, name):
+    with wrapper.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+class SqlitePragmaTests(TestCase):
+
+    def open_file_database(self, directory=None):
+        if directory is None:
+            directory = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, directory)
+        wrapper = DatabaseWrapper(
+            {**connection.settings_dict, 'NAME': os.path.join(directory, 'db.sqlite3')}, alias='file'
+        )
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def test_pragmas_applied_to_connections(self):
+        self.assertEqual(pragma(connection, 'synchronous'), 1)
+        self.assertEqual(pragma(connection, 'busy_timeout'), 5000)
+
+    def test_file_database_uses_wal(self):
+        wrapper = self.open_file_database()
+
+        self.assertEqual(pragma(wrapper, 'journal_mode'), 'wal')
+        self.assertEqual(pragma(wrapper, 'mmap_size'), 256 * 2 ** 20)
+
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': 250})
+    def test_pragmas_configurable(self):
+        wrapper = self.open_file_database()
+
+        self.assertEqual(pragma(wrapper, 'busy_timeout'), 250)
+        self.assertEqual(pragma(wrapper, 'journal_mode'), 'delete')
+
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': 0})
+    def test_transactions_take_write_lock(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        first, second = self.open_file_database(directory), self.open_file_database(directory)
+        with first.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (name TEXT)')
+
+        # What atomic() does; a deferred BEGIN would leave the lock free.
+        first._start_transaction_under_autocommit()
+        self.addCleanup(first.connection.rollback)
+
+        with self.assertRaisesMessage(OperationalError, 'database is locked'):
+            with second.cursor() as cursor:
+                cursor.execute("INSERT INTO item VALUES ('x')")
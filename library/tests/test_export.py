@@ -0,0 +1,171 @@
+import csv
+import io
+import json
+import threading
+from unittest import mock
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from library.export import asgi_lines, from_thread, in_thread, ndjson_lines
+from library.models import Books
+from library.serializers import BooksSerializer
+from library.views import BooksViewSet
+from .test_author import sample_author
+
+EXPORT_URL = reverse('books-export')
+
+
+class BooksExportTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        for i in range(5):
+            book = Books.objects.create(
+                title=f'book{i}', book_pages=10 + i, genre=i % 2, release_date='2023-01-01'
+            )
+            book.author.add(sample_author(name=f'name{i}'), sample_author(name=f'other{i}'))
+
+    def export(self, query=''):
+        response = self.client.get(EXPORT_URL + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_export_ndjson(self):
+        response, body = self.export()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        rows = [json.loads(line) for line in body.splitlines()]
+        expected = json.loads(json.dumps(
+            BooksSerializer(Books.objects.order_by('id'), many=True).data
+        ))
+        self.assertEqual(rows, expected)
+
+    def test_export_csv(self):
+        response, body = self.export('?type=csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['title'], 'book0')
+        self.assertEqual(len(json.loads(rows[0]['author'])), 2)
+
+    def test_export_filtered(self):
+        _, body = self.export('?genre=1')
+        self.assertEqual(len(body.splitlines()), 2)
+
+    def test_export_queries_per_chunk(self):
+        chunk_size = BooksViewSet.export_chunk_size
+        BooksViewSet.export_chunk_size = 2
+        try:
+            response = self.client.get(EXPORT_URL)
+            # One streamed books query plus an author prefetch per chunk.
+            with self.assertNumQueries(4):
+                b''.join(response.streaming_content)
+        finally:
+            BooksViewSet.export_chunk_size = chunk_size
+
+    def test_export_invalid_type(self):
+        response = self.client.get(EXPORT_URL + '?type=xml')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+async def asgi_get(path, query=b''):
+    """The status and body of a GET through the ASGI handler, as served by library_app.asgi."""
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': path, 'query_string': query,
+        'headers': [(b'host', b'testserver')], 'server': ('testserver', 80),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    # Like django.test.Client: keep the test transaction's connection open.
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    try:
+        await ASGIHandler()(scope, receive, send)
+    finally:
+        request_started.connect(close_old_connections)
+        request_finished.connect(close_old_connections)
+    body = b''.join(message.get('body', b'') for message in messages if message['type'] == 'http.response.body')
+    return messages[0]['status'], body
+
+
+class AsgiExportTests(TransactionTestCase):
+    # Committed rows: on Django 4.1 the export is read on its own connection.
+
+    def setUp(self):
+        for i in range(5):
+            Books.objects.create(title=f'book{i}', book_pages=10, genre=i % 2, release_date='2023-01-01')
+
+    async def test_export(self):
+        chunk_size = BooksViewSet.export_chunk_size
+        BooksViewSet.export_chunk_size = 2
+        try:
+            status_code, body = await asgi_get(EXPORT_URL, b'genre=1')
+        finally:
+            BooksViewSet.export_chunk_size = chunk_size
+
+        self.assertEqual(status_code, 200)
+        self.assertEqual([json.loads(line)['title'] for line in body.decode().splitlines()], ['book1', 'book3'])
+
+    async def test_lines_in_thread(self):
+        # The async iterator asgi_lines gives Django 4.2 and later.
+        lines = [line async for line in in_thread(ndjson_lines(Books.objects.all(), 2), 2)]
+
+        self.assertEqual(len(lines), 5)
+
+    async def test_lines_from_thread(self):
+        # What asgi_lines gives Django 4.1, which iterates synchronously.
+        lines = list(from_thread(ndjson_lines(Books.objects.all(), 2), 2))
+
+        self.assertEqual(len(lines), 5)
+
+
+class FromThreadTests(SimpleTestCase):
+
+    def test_versions(self):
+        with mock.patch('django.VERSION', (4, 1, 6)):
+            self.assertEqual(asgi_lines(iter('abc')).__name__, 'from_thread')
+        with mock.patch('django.VERSION', (4, 2, 0)):
+            self.assertEqual(asgi_lines(iter('abc')).__name__, 'in_thread')
+
+    def test_bounded_and_stops_when_closed(self):
+        produced = []
+        finished = threading.Event()
+
+        def lines():
+            try:
+                for i in range(1000):
+                    produced.append(i)
+                    yield i
+            finally:
+                finished.set()
+
+        content = from_thread(lines(), chunk_size=10, buffered=2)
+        self.assertEqual(next(content), 0)
+        content.close()
+
+        self.assertTrue(finished.wait(5))
+        # The chunk being consumed, two buffered and one waiting to be put.
+        self.assertLessEqual(len(produced), 40)
+
+    def test_errors_reach_the_consumer(self):
+        def lines():
+            yield 'a'
+            raise ValueError('broken')
+
+        content = from_thread(lines(), chunk_size=1)
+        self.assertEqual(next(content), 'a')
+        with self.assertRaisesMessage(ValueError, 'broken'):
+            next(content)
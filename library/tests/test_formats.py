@@ -0,0 +1,158 @@
+import gzip
+import json
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from library import cache, compression
+from library.models import Books
+from library.renderers import ColumnarJSONRenderer, msgpack
+from .test_author import sample_author
+from .test_books import BOOKS_URL, detail_url
+from .test_export import EXPORT_URL
+
+
+class FormatTestCase(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.authors = [sample_author(name=f'name{index}') for index in range(3)]
+        for index in range(30):
+            book = Books.objects.create(
+                title=f'book{index}', book_pages=100, genre=index % 3, release_date='2023-01-01'
+            )
+            book.author.set(self.authors[:index % 3 + 1])
+
+    def get(self, url, **headers):
+        cache.get_cache().clear()
+        return self.client.get(url, **headers)
+
+
+def vary(response):
+    return {header.strip() for header in response.get('Vary', '').split(',')}
+
+
+class CompressionTests(FormatTestCase):
+
+    def test_gzip(self):
+        plain = self.get(BOOKS_URL, HTTP_ACCEPT='application/json')
+        response = self.get(BOOKS_URL, HTTP_ACCEPT='application/json', HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(vary(response), {'Accept', 'Accept-Encoding'})
+        self.assertLess(len(response.content), len(plain.content) / 4)
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(response['ETag'], 'W/' + plain['ETag'])
+
+    def test_conditional_request_with_weak_etag(self):
+        etag = self.get(BOOKS_URL, HTTP_ACCEPT_ENCODING='gzip')['ETag']
+
+        response = self.client.get(BOOKS_URL, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('Accept', vary(response))
+
+    def test_not_compressed(self):
+        for headers in (
+            {'HTTP_ACCEPT_ENCODING': 'identity'},
+            {'HTTP_ACCEPT_ENCODING': 'gzip;q=0, br;q=0'},
+        ):
+            self.assertFalse(self.get(BOOKS_URL, **headers).has_header('Content-Encoding'))
+
+        book = Books.objects.get(title='book0')
+        small = self.get(detail_url(book.id), HTTP_ACCEPT='application/json', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(small.has_header('Content-Encoding'))
+
+    def test_streaming(self):
+        plain = b''.join(self.client.get(EXPORT_URL).streaming_content)
+
+        response = self.client.get(EXPORT_URL, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+
+    async def test_async_stream(self):
+        async def chunks():
+            for chunk in (b'{"a": 1}\n', b'{"b": 2}\n'):
+                yield chunk
+
+        compressed = [chunk async for chunk in compression.acompress_stream(chunks(), 'gzip')]
+
+        self.assertEqual(gzip.decompress(b''.join(compressed)), b'{"a": 1}\n{"b": 2}\n')
+
+    @unittest.skipUnless(compression.brotli, 'brotli is not installed')
+    def test_brotli(self):
+        plain = self.get(BOOKS_URL, HTTP_ACCEPT='application/json')
+        response = self.get(BOOKS_URL, HTTP_ACCEPT='application/json', HTTP_ACCEPT_ENCODING='gzip, br')
+
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(response.content), plain.content)
+
+    def test_choose_encoding(self):
+        self.assertEqual(compression.choose_encoding('gzip;q=0.5, deflate'), 'gzip')
+        self.assertEqual(compression.choose_encoding('*'), compression.available()[0])
+        self.assertIsNone(compression.choose_encoding('deflate, *;q=0'))
+        self.assertIsNone(compression.choose_encoding(''))
+
+
+class ColumnarTests(FormatTestCase):
+
+    def test_list(self):
+        plain = json.loads(self.get(BOOKS_URL, HTTP_ACCEPT='application/json').content)
+        response = self.get(BOOKS_URL, HTTP_ACCEPT=ColumnarJSONRenderer.media_type)
+
+        self.assertEqual(response['Content-Type'], ColumnarJSONRenderer.media_type)
+        self.assertIn('Accept', vary(response))
+        body = json.loads(response.content)
+        self.assertEqual(body['count'], 30)
+        self.assertEqual(len(body['included']['author']['rows']), 3)
+        included = body['included']['author']
+        authors = {row[0]: dict(zip(included['fields'], row)) for row in included['rows']}
+        books = [dict(zip(body['fields'], row)) for row in body['rows']]
+        for book in books:
+            book['author'] = [authors[author_id] for author_id in book['author']]
+        self.assertEqual(books, plain['results'])
+
+    @override_settings(ROOT_URLCONF='library.tests.test_async')
+    async def test_async_list(self):
+        response = await self.async_client.get(BOOKS_URL, accept=ColumnarJSONRenderer.media_type)
+
+        self.assertEqual(response['Content-Type'], ColumnarJSONRenderer.media_type)
+        self.assertIn('Accept', vary(response))
+
+    def test_detail_and_errors_are_plain_json(self):
+        book = Books.objects.get(title='book0')
+
+        detail = self.get(detail_url(book.id), HTTP_ACCEPT=ColumnarJSONRenderer.media_type)
+        error = self.get(BOOKS_URL + '?fields=nope', HTTP_ACCEPT=ColumnarJSONRenderer.media_type)
+
+        self.assertEqual(json.loads(detail.content)['title'], 'book0')
+        self.assertEqual(json.loads(error.content), {'fields': ['Unknown fields: nope.']})
+
+
+@unittest.skipUnless(msgpack, 'msgpack is not installed')
+class MessagePackTests(FormatTestCase):
+
+    def test_list(self):
+        plain = json.loads(self.get(BOOKS_URL, HTTP_ACCEPT='application/json').content)
+
+        response = self.get(BOOKS_URL, HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), plain)
+
+    def test_create(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(username='test', password='123456'))
+        payload = {'title': 'packed', 'book_pages': 10, 'genre': 1, 'release_date': '2023-01-01'}
+
+        response = client.post(
+            BOOKS_URL, msgpack.packb(payload), content_type='application/msgpack', HTTP_ACCEPT='application/msgpack'
+        )
+        invalid = client.post(BOOKS_URL, b'\xc1', content_type='application/msgpack')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(msgpack.unpackb(response.content)['title'], 'packed')
+        self.assertEqual(invalid.status_code, 400)
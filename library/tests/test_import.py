@@ -0,0 +1,146 @@
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from library.management.commands.import_catalog import Command
+from library.models import Author, Books
+from .test_author import sample_author
+
+
+def catalog_row(title, *authors, **params):
+    row = {
+        'title': title,
+        'book_pages': 100,
+        'genre': 1,
+        'release_date': '2023-01-01',
+        'author': [
+            {'name': name, 'surname': surname, 'email': f'{name}@gmail.com', 'phone': 1}
+            for name, surname in authors
+        ],
+    }
+    row.update(params)
+    return row
+
+
+class ImportCatalogTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(content)
+        return path
+
+    def write_ndjson(self, rows):
+        return self.write('catalog.ndjson', ''.join(json.dumps(row) + '\n' for row in rows))
+
+    def run_import(self, path, *args):
+        out, err = io.StringIO(), io.StringIO()
+        call_command('import_catalog', path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_ndjson(self):
+        path = self.write_ndjson([
+            catalog_row('book1', ('leo', 'tolstoy')),
+            catalog_row('book2', ('leo', 'tolstoy'), ('jane', 'austen')),
+        ])
+        out, _ = self.run_import(path, '--batch-size', '1')
+
+        self.assertIn('Imported 2 books', out)
+        self.assertIn('rows/s', out)
+        self.assertEqual(Author.objects.count(), 2)
+        self.assertEqual(
+            sorted(Books.objects.get(title='book2').author.values_list('surname', flat=True)),
+            ['austen', 'tolstoy'],
+        )
+        self.assertFalse(os.path.exists(path + '.checkpoint'))
+
+    def test_upserts_existing_rows(self):
+        author = sample_author(name='leo', surname='tolstoy', email='old@gmail.com')
+        book = Books.objects.create(title='book1', book_pages=1, genre=1, release_date='2000-01-01')
+        book.author.add(sample_author(name='someone'))
+
+        path = self.write_ndjson([catalog_row('book1', ('leo', 'tolstoy'), book_pages=300)])
+        self.run_import(path)
+
+        author.refresh_from_db()
+        book.refresh_from_db()
+        self.assertEqual(author.email, 'leo@gmail.com')
+        self.assertEqual(book.book_pages, 300)
+        self.assertEqual(list(book.author.all()), [author])
+        self.assertEqual(Books.objects.count(), 1)
+
+    def test_invalid_rows_skipped(self):
+        content = (
+            json.dumps(catalog_row('good')) + '\n'
+            + 'not json\n'
+            + json.dumps(catalog_row('bad', genre='x')) + '\n'
+        )
+        out, err = self.run_import(self.write('catalog.ndjson', content))
+
+        self.assertIn('skipped 2', out)
+        self.assertIn('line 2', err)
+        self.assertIn('line 3', err)
+        self.assertEqual(list(Books.objects.values_list('title', flat=True)), ['good'])
+
+    def test_resume_skips_committed_rows(self):
+        path = self.write_ndjson([catalog_row(f'book{i}') for i in range(4)])
+        self.write('catalog.ndjson.checkpoint', json.dumps({'rows': 3}))
+
+        self.run_import(path, '--resume')
+        self.assertEqual(list(Books.objects.values_list('title', flat=True)), ['book3'])
+
+    def test_resume_seeks_to_offset(self):
+        # Rows before the offset are never read again, so garbage there is
+        # not reported.
+        done = 'not json\n' * 2
+        rows = ''.join(json.dumps(catalog_row(f'book{i}')) + '\n' for i in range(2))
+        path = self.write('catalog.ndjson', done + rows)
+        self.write('catalog.ndjson.checkpoint', json.dumps({'rows': 2, 'offset': len(done), 'line': 2}))
+
+        out, err = self.run_import(path, '--resume')
+
+        self.assertIn('skipped 0', out)
+        self.assertEqual(err, '')
+        self.assertEqual(sorted(Books.objects.values_list('title', flat=True)), ['book0', 'book1'])
+
+    def test_interrupted_csv_import_resumes(self):
+        header = 'id,title,book_pages,genre,release_date,author\n'
+        rows = [f'{i},book{i},10,1,2023-01-01,[]\n' for i in range(3)]
+        path = self.write('catalog.csv', header + ''.join(rows))
+        with mock.patch.object(Command, 'import_batch', side_effect=[None, KeyboardInterrupt]):
+            with self.assertRaises(KeyboardInterrupt):
+                self.run_import(path, '--batch-size', '1')
+        with open(path + '.checkpoint') as handle:
+            self.assertEqual(json.load(handle), {'rows': 1, 'offset': len(header + rows[0]), 'line': 2})
+
+        out, err = self.run_import(path, '--resume', '--batch-size', '1')
+
+        self.assertIn('Resuming after 1 rows', out)
+        self.assertEqual(err, '')
+        self.assertEqual(sorted(Books.objects.values_list('title', flat=True)), ['book1', 'book2'])
+
+    def test_csv_export_round_trip(self):
+        book = Books.objects.create(title='book1', book_pages=12, genre=3, release_date='2001-02-03')
+        book.author.add(sample_author(name='leo'), sample_author(name='jane'))
+        response = APIClient().get(reverse('books-export') + '?type=csv')
+        path = self.write('catalog.csv', b''.join(response.streaming_content).decode())
+
+        Books.objects.all().delete()
+        Author.objects.all().delete()
+        self.run_import(path)
+
+        book = Books.objects.get()
+        self.assertEqual((book.title, book.book_pages, book.genre), ('book1', 12, 3))
+        self.assertEqual(book.author.count(), 2)
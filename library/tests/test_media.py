@@ -0,0 +1,111 @@
+import os
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from library import images
+
+CONTENT = b'0123456789abcdef'
+
+
+class MediaServingTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        os.makedirs(os.path.join(self.media_root, 'docs'))
+        with open(os.path.join(self.media_root, 'docs', 'notes.txt'), 'wb') as handle:
+            handle.write(CONTENT)
+
+    def get(self, path='docs/notes.txt', **headers):
+        return self.client.get(f'/media/{path}', **headers)
+
+    def test_whole_file(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(response['Content-Type'], 'text/plain')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('max-age=3600', response['Cache-Control'])
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_content_addressed_files_immutable(self):
+        name = images.image_storage().save('portrait.jpg', ContentFile(b'jpeg'))
+
+        response = self.get(name)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+
+    def test_byte_ranges(self):
+        for header, expected, content_range in (
+            ('bytes=2-5', b'2345', 'bytes 2-5/16'),
+            ('bytes=10-', b'abcdef', 'bytes 10-15/16'),
+            ('bytes=-3', b'def', 'bytes 13-15/16'),
+            ('bytes=14-100', b'ef', 'bytes 14-15/16'),
+        ):
+            with self.subTest(header):
+                response = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(b''.join(response.streaming_content), expected)
+                self.assertEqual(response['Content-Range'], content_range)
+                self.assertEqual(response['Content-Length'], str(len(expected)))
+
+    def test_unsatisfiable_range(self):
+        response = self.get(HTTP_RANGE='bytes=16-')
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */16')
+
+    def test_multiple_or_stale_ranges_get_whole_file(self):
+        etag = self.get()['ETag']
+
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-1,4-5').status_code, 200)
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE='"stale"').status_code, 200)
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE=etag).status_code, 206)
+
+    def test_conditional_get(self):
+        etag = self.get()['ETag']
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('max-age', response['Cache-Control'])
+
+    def test_missing_and_outside_files(self):
+        self.assertEqual(self.get('docs/missing.txt').status_code, 404)
+        self.assertEqual(self.get('docs').status_code, 404)
+        self.assertEqual(self.get('../etc/passwd').status_code, 404)
+
+    def test_only_safe_methods(self):
+        self.assertEqual(self.client.post('/media/docs/notes.txt').status_code, 405)
+
+    @override_settings(MEDIA_ACCEL_REDIRECT='x-accel-redirect')
+    def test_x_accel_redirect(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/docs/notes.txt')
+        self.assertEqual(response.content, b'')
+
+    @override_settings(MEDIA_ACCEL_REDIRECT='x-sendfile')
+    def test_x_sendfile(self):
+        response = self.get()
+
+        self.assertEqual(response['X-Sendfile'], os.path.join(self.media_root, 'docs', 'notes.txt'))
+
+    async def test_asgi_range(self):
+        # AsyncClient takes extra headers by their HTTP name.
+        response = await self.async_client.get('/media/docs/notes.txt', range='bytes=2-5')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
@@ -0,0 +1,104 @@
+import re
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from library import cache, metrics
+from library.models import Books
+from .test_author import sample_author
+
+BOOKS_URL = reverse('books-list')
+
+
+def sample(text, name):
+    match = re.search(rf'^{re.escape(name)} (\S+)$', text, re.MULTILINE)
+    return match and float(match.group(1))
+
+
+class HistogramTests(TestCase):
+
+    def test_exposition(self):
+        histogram = metrics.Histogram('test_seconds', 'Test.', ('route',), buckets=(0.1, 1))
+        self.addCleanup(metrics.REGISTRY.remove, histogram)
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(('a',), value)
+
+        text = metrics.exposition()
+
+        self.assertIn('# TYPE test_seconds histogram', text)
+        self.assertEqual(sample(text, 'test_seconds_bucket{route="a",le="0.1"}'), 2)
+        self.assertEqual(sample(text, 'test_seconds_bucket{route="a",le="1"}'), 3)
+        self.assertEqual(sample(text, 'test_seconds_bucket{route="a",le="+Inf"}'), 4)
+        self.assertEqual(sample(text, 'test_seconds_sum{route="a"}'), 3.65)
+        self.assertEqual(sample(text, 'test_seconds_count{route="a"}'), 4)
+
+
+class InstrumentationTests(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        metrics.reset()
+        book = Books.objects.create(title='book', book_pages=10, genre=1, release_date='2023-01-01')
+        book.author.add(sample_author())
+
+    def test_records_route_metrics(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(BOOKS_URL, HTTP_ACCEPT='application/json')
+        query_count = len(queries)
+        self.client.get(BOOKS_URL, HTTP_ACCEPT='application/json')
+
+        text = self.client.get('/metrics').content.decode()
+        labels = 'route="books-list",method="GET"'
+        self.assertEqual(sample(text, f'library_requests_total{{{labels},status="200"}}'), 2)
+        self.assertEqual(sample(text, f'library_request_duration_seconds_count{{{labels}}}'), 2)
+        # The second request is answered from the response cache.
+        self.assertEqual(sample(text, f'library_db_queries_sum{{{labels}}}'), query_count)
+        self.assertEqual(sample(text, f'library_db_queries_bucket{{{labels},le="0"}}'), 1)
+        self.assertGreater(sample(text, f'library_serialize_duration_seconds_sum{{{labels}}}'), 0)
+        self.assertGreater(sample(text, f'library_render_duration_seconds_sum{{{labels}}}'), 0)
+        self.assertEqual(sample(text, f'library_response_size_bytes_sum{{{labels}}}'), 2 * len(response.content))
+
+    def test_server_timing(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(BOOKS_URL)
+
+        self.assertRegex(
+            response['Server-Timing'],
+            rf'^db;dur=[\d.]+;desc="{len(queries)} queries", serialize;dur=[\d.]+, render;dur=[\d.]+, total;dur=[\d.]+$',
+        )
+
+    @override_settings(VALUES_SERIALIZERS=False)
+    def test_serialize_time(self):
+        for url in (BOOKS_URL, reverse('books-detail', args=[Books.objects.get().pk])):
+            with self.subTest(url=url):
+                cache.get_cache().clear()
+                response = self.client.get(url)
+
+                serialize = re.search(r'serialize;dur=([\d.]+)', response['Server-Timing'])
+                self.assertGreater(float(serialize.group(1)), 0)
+
+    @override_settings(SERVER_TIMING=False)
+    def test_server_timing_disabled(self):
+        self.assertFalse(self.client.get(BOOKS_URL).has_header('Server-Timing'))
+
+    def test_unmatched_route(self):
+        self.client.get('/nowhere')
+
+        text = metrics.exposition()
+        self.assertEqual(sample(text, 'library_requests_total{route="unmatched",method="GET",status="404"}'), 1)
+
+    def test_queries_outside_requests_ignored(self):
+        self.assertIn(metrics.record_query, connection.execute_wrappers)
+        Books.objects.count()
+
+        self.assertNotIn('library_db_queries_count', metrics.exposition())
+
+    @override_settings(ROOT_URLCONF='library.tests.test_async')
+    async def test_async_views(self):
+        response = await self.async_client.get(BOOKS_URL, accept='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="[1-9]\d* queries", serialize;dur=0\.\d*[1-9], render;dur=0\.\d*[1-9]')
+        text = metrics.exposition()
+        self.assertGreater(sample(text, 'library_db_queries_sum{route="books-list",method="GET"}'), 0)
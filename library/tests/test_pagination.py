@@ -0,0 +1,67 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from library.models import Books
+from .test_author import sample_author
+
+BOOKS_URL = reverse('books-list')
+AUTHOR_URL = reverse('author-list')
+
+
+def create_books(count, start=0):
+    return Books.objects.bulk_create(
+        Books(
+            title=f'book-{i}',
+            book_pages=100,
+            genre=1,
+            release_date='2023-01-01',
+        )
+        for i in range(start, start + count)
+    )
+
+
+class CursorPaginationTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def collect_ids(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_books_pages_cover_catalog_once(self):
+        create_books(25)
+        ids = self.collect_ids(BOOKS_URL + '?page_size=10')
+        self.assertEqual(ids, list(Books.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_authors_paginated(self):
+        for i in range(3):
+            sample_author(name=f'name-{i}')
+        response = self.client.get(AUTHOR_URL + '?page_size=2')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+        self.assertIsNone(response.data['previous'])
+
+    def test_stable_under_inserts(self):
+        create_books(10)
+        response = self.client.get(BOOKS_URL + '?page_size=5')
+        first_page = [item['id'] for item in response.data['results']]
+
+        create_books(5, start=10)
+        ids = first_page + self.collect_ids(response.data['next'])
+
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), 15)
+
+    def test_page_size_capped(self):
+        create_books(3)
+        response = self.client.get(BOOKS_URL + '?page_size=100000')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 3)
@@ -0,0 +1,100 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from library import views
+from library.models import Author, Books
+from library.querycheck import QueryCheckMixin, QueryDetector, QueryProblems, fingerprint
+from .test_author import sample_author
+from .test_books import BOOKS_URL
+
+
+def add_books(count):
+    author = Author.objects.first() or sample_author()
+    start = Books.objects.count()
+    for index in range(start, start + count):
+        book = Books.objects.create(title=f'book{index}', book_pages=10, genre=1, release_date='2023-01-01')
+        book.author.add(author)
+
+
+class QueryDetectorTests(QueryCheckMixin, TestCase):
+    check_request_queries = False
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = %s AND name = 'x''y' AND n IN (%s, %s)  LIMIT 21"),
+            'SELECT * FROM t WHERE id = ? AND name = ? AND n IN (...) LIMIT ?',
+        )
+        self.assertEqual(fingerprint('WHERE id IN (%s)'), fingerprint('WHERE id IN (%s, %s, %s)'))
+
+    def test_repeated_queries(self):
+        add_books(5)
+        books = list(Books.objects.all())
+
+        with QueryDetector(repeat_threshold=5) as detector:
+            for book in books:
+                Books.objects.get(pk=book.pk)
+            Books.objects.count()
+
+        self.assertEqual(len(detector), 6)
+        [(sql, count)] = detector.repeated()
+        self.assertEqual(count, 5)
+        self.assertIn('WHERE "library_books"."id" = ?', sql)
+        with self.assertRaisesMessage(QueryProblems, 'Query repeated 5 times'):
+            detector.check()
+
+    def test_slow_queries(self):
+        with QueryDetector(slow_threshold=0) as detector:
+            Books.objects.count()
+
+        self.assertEqual(len(detector.slow()), 1)
+        self.assertTrue(detector.problems()[0].startswith('Slow query'))
+
+    # Without the prefetch the instance serializers query per row.
+    @override_settings(VALUES_SERIALIZERS=False)
+    def test_assert_query_count_constant_catches_n_plus_one(self):
+        client = APIClient()
+        with mock.patch.object(views.BooksViewSet, 'queryset', Books.objects.all()):
+            with self.assertRaisesMessage(AssertionError, 'Query count grows with result size'):
+                self.assertQueryCountConstant(
+                    lambda: client.get(BOOKS_URL),
+                    add_books,
+                )
+
+
+class RequestCheckTests(QueryCheckMixin, TestCase):
+
+    # Without the prefetch the instance serializers query per row.
+    @override_settings(VALUES_SERIALIZERS=False)
+    def test_request_fails_on_n_plus_one(self):
+        add_books(5)
+        self.client.get(BOOKS_URL)
+
+        with mock.patch.object(views.BooksViewSet, 'queryset', Books.objects.all()):
+            with self.assertRaisesMessage(QueryProblems, 'Query repeated 5 times'):
+                self.client.get(BOOKS_URL + '?page_size=10')
+
+    def test_slow_queries_only_fail_when_enabled(self):
+        with override_settings(QUERY_SLOW_THRESHOLD=0):
+            self.assertEqual(self.client.get(BOOKS_URL).status_code, 200)
+
+        with mock.patch.object(RequestCheckTests, 'slow_query_threshold', 0):
+            with self.assertRaisesMessage(QueryProblems, 'Slow query'):
+                # Another URL than above, which the response cache answers.
+                self.client.get(BOOKS_URL + '?genre=1')
+
+
+@override_settings(DEBUG=True)
+class QueryInspectionMiddlewareTests(TestCase):
+
+    # Without the prefetch the instance serializers query per row.
+    @override_settings(VALUES_SERIALIZERS=False)
+    def test_logs_repeated_queries(self):
+        add_books(5)
+
+        with mock.patch.object(views.BooksViewSet, 'queryset', Books.objects.all()):
+            with self.assertLogs('library.queries', 'WARNING') as logs:
+                self.client.get(BOOKS_URL)
+
+        self.assertIn('GET /v1/books: Query repeated 5 times', logs.output[0])
@@ -0,0 +1,151 @@
+import hashlib
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.core.cache import cache as default_cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from library import cache, routers
+from library.models import Author, Books
+from .test_author import sample_author
+
+BOOKS_URL = reverse('books-list')
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_LAG=5)
+class ReplicaRoutingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # A second SQLite file standing in for a replica that hasn't caught
+        # up, so each test can tell which database served a read. It's added
+        # after the test databases are set up, so tests clean it by hand.
+        cls.directory = tempfile.mkdtemp()
+        default = connections['default'].settings_dict
+        connections.settings['replica'] = connections.configure_settings({
+            'default': default,
+            'replica': {**default, 'NAME': f'{cls.directory}/replica.sqlite3'},
+        })['replica']
+        call_command('migrate', database='replica', verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        shutil.rmtree(cls.directory)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.get_cache().clear()
+        default_cache.clear()
+        self.user = get_user_model().objects.create_user(username='test', password='123456')
+        self.client = APIClient()
+        Books.objects.create(title='primary', book_pages=1, genre=1, release_date='2023-01-01')
+        Books.objects.using('replica').create(title='replica', book_pages=1, genre=1, release_date='2023-01-01')
+        self.addCleanup(Books.objects.using('replica').all().delete)
+
+    def titles(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [book['title'] for book in response.data['results']]
+
+    def test_router(self):
+        router = routers.ReplicaRouter()
+
+        self.assertEqual(router.db_for_read(Books), 'default')
+        with routers.use_replicas():
+            self.assertEqual(router.db_for_read(Books), 'replica')
+            self.assertEqual(router.db_for_read(Author), 'replica')
+            self.assertEqual(router.db_for_read(Token), 'default')
+            self.assertEqual(router.db_for_write(Books), 'default')
+            with override_settings(DATABASE_REPLICAS=[]):
+                self.assertEqual(router.db_for_read(Books), 'default')
+
+    def test_reads_use_replica(self):
+        self.assertEqual(self.titles(self.client.get(BOOKS_URL)), ['replica'])
+        book = Books.objects.using('replica').get()
+        self.assertEqual(self.client.get(reverse('books-detail', args=[book.pk])).data['title'], 'replica')
+
+    def test_writes_use_primary_and_pin_reads(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            BOOKS_URL, {'title': 'new', 'book_pages': 2, 'genre': 1, 'release_date': '2023-01-02'}
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Books.objects.filter(title='new').exists())
+        self.assertFalse(Books.objects.using('replica').filter(title='new').exists())
+        self.assertIn('db_pin', response.cookies)
+        self.assertEqual(self.titles(self.client.get(BOOKS_URL)), ['primary', 'new'])
+
+    def test_expired_pin_reads_replica(self):
+        self.client.cookies['db_pin'] = str(time.time() - 1)
+
+        self.assertEqual(self.titles(self.client.get(BOOKS_URL)), ['replica'])
+
+    def test_pinned_by_authorization_without_cookies(self):
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        author = sample_author()
+
+        response = self.client.patch(reverse('author-detail', args=[author.pk]), {'name': 'c'})
+        self.assertEqual(response.status_code, 200)
+        self.client.cookies.clear()
+
+        self.assertEqual(self.titles(self.client.get(BOOKS_URL)), ['primary'])
+        self.assertEqual(self.titles(APIClient().get(f'{BOOKS_URL}?genre=1')), ['replica'])
+
+    @override_settings(
+        REPLICA_PIN_CACHE_ALIAS='pins',
+        CACHES={**settings.CACHES, 'pins': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'pins'}},
+    )
+    def test_pins_in_shared_cache(self):
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        author = sample_author()
+        self.client.patch(reverse('author-detail', args=[author.pk]), {'name': 'c'})
+        self.client.cookies.clear()
+
+        # Another worker's handle on the shared cache sees the pin; the
+        # per-process default cache doesn't hold it.
+        key = 'db_pin:' + hashlib.sha256(f'Token {token.key}'.encode()).hexdigest()
+        other_worker = LocMemCache('pins', {})
+        self.addCleanup(other_worker.clear)
+        self.assertTrue(other_worker.get(key))
+        self.assertIsNone(default_cache.get(key))
+        self.assertEqual(self.titles(self.client.get(BOOKS_URL)), ['primary'])
+
+    def test_failed_write_does_not_pin(self):
+        response = self.client.post(BOOKS_URL, {'title': 'new'})
+
+        self.assertEqual(response.status_code, 401)
+        self.assertNotIn('db_pin', response.cookies)
+
+    def test_replica_responses_cached_for_lag(self):
+        with mock.patch('library.cache.store', wraps=cache.store) as store:
+            self.client.get(BOOKS_URL)
+            self.client.cookies['db_pin'] = str(time.time() + 5)
+            self.client.get(f'{BOOKS_URL}?genre=1')
+
+        self.assertEqual(store.call_args_list[0].kwargs['timeout'], 5)
+        self.assertNotEqual(store.call_args_list[1].kwargs['timeout'], 5)
+
+    def test_writer_not_served_other_clients_replica_response(self):
+        self.client.force_authenticate(self.user)
+        self.client.post(BOOKS_URL, {'title': 'mine', 'book_pages': 2, 'genre': 1, 'release_date': '2023-01-02'})
+
+        # Another client caches the lagging replica's list under the
+        # generation the write just started.
+        self.assertEqual(self.titles(APIClient().get(BOOKS_URL)), ['replica'])
+
+        self.assertEqual(self.titles(self.client.get(BOOKS_URL)), ['primary', 'mine'])
@@ -0,0 +1,89 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from library.models import Books
+from library import search
+from .test_author import sample_author
+
+SEARCH_URL = reverse('books-search')
+
+
+def create_book(title, *authors):
+    book = Books.objects.create(
+        title=title, book_pages=100, genre=1, release_date='2023-01-01'
+    )
+    book.author.add(*authors)
+    return book
+
+
+class BooksSearchTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.tolstoy = sample_author(name='Leo', surname='Tolstoy')
+        self.austen = sample_author(name='Jane', surname='Austen')
+        self.war = create_book('War and Peace', self.tolstoy)
+        self.pride = create_book('Pride and Prejudice', self.austen)
+        self.war_story = create_book('Stories', self.tolstoy, self.austen)
+
+    def titles(self, query):
+        response = self.client.get(SEARCH_URL, {'q': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [book['title'] for book in response.data['results']]
+
+    def test_fts_installed(self):
+        self.assertTrue(search.fts_available())
+
+    def test_availability_is_remembered(self):
+        search.fts_available()
+        with CaptureQueriesContext(connection) as queries:
+            self.titles('pride')
+        self.assertFalse([query for query in queries.captured_queries if 'sqlite_master' in query['sql']])
+
+    def test_search_title(self):
+        self.assertEqual(self.titles('pride'), ['Pride and Prejudice'])
+
+    def test_search_author(self):
+        self.assertCountEqual(self.titles('tolstoy'), ['War and Peace', 'Stories'])
+
+    def test_search_prefix_and_multiple_words(self):
+        self.assertEqual(self.titles('tol war'), ['War and Peace'])
+
+    def test_search_ranks_title_first(self):
+        create_book('Austen', self.tolstoy)
+        self.assertEqual(self.titles('austen')[0], 'Austen')
+
+    def test_search_syntax_is_escaped(self):
+        self.assertEqual(self.titles('"pride" ) * ('), ['Pride and Prejudice'])
+
+    def test_empty_query(self):
+        self.assertEqual(self.titles(''), [])
+
+    def test_index_follows_changes(self):
+        self.war.title = 'Anna Karenina'
+        self.war.save()
+        self.assertEqual(self.titles('karenina'), ['Anna Karenina'])
+
+        self.austen.surname = 'Bronte'
+        self.austen.save()
+        self.assertCountEqual(self.titles('bronte'), ['Pride and Prejudice', 'Stories'])
+
+        self.war_story.author.remove(self.austen)
+        self.assertEqual(self.titles('bronte'), ['Pride and Prejudice'])
+
+        self.pride.delete()
+        self.assertEqual(self.titles('bronte'), [])
+
+    def test_fallback_without_fts(self):
+        with mock.patch('library.search.fts_available', return_value=False):
+            self.assertCountEqual(self.titles('tolstoy'), ['War and Peace', 'Stories'])
+            self.assertEqual(self.titles('prejudice'), ['Pride and Prejudice'])
+
+    def test_invalid_limit(self):
+        response = self.client.get(SEARCH_URL, {'q': 'war', 'limit': 'all'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,99 @@
+import json
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from library import cache
+from library.models import Books
+from .test_author import sample_author
+
+
+class SparseFieldsTests(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.authors = [sample_author(name=f'name{index}', fb_name=None) for index in range(2)]
+        self.book = Books.objects.create(title='book', book_pages=10, genre=1, release_date='2023-01-01')
+        self.book.author.set(self.authors)
+
+    def get(self, url):
+        cache.get_cache().clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_ACCEPT='application/json')
+        sql = [query['sql'] for query in queries.captured_queries]
+        return response, sql
+
+    def results(self, url):
+        for enabled in (True, False):
+            with self.subTest(values_serializers=enabled), override_settings(VALUES_SERIALIZERS=enabled):
+                response, sql = self.get(url)
+                self.assertEqual(response.status_code, 200)
+                yield json.loads(response.content)['results'], sql
+
+    def test_fields(self):
+        for results, sql in self.results('/v1/books?fields=id,title'):
+            self.assertEqual(results, [{'id': self.book.id, 'title': 'book'}])
+            self.assertFalse([query for query in sql if 'library_books_author' in query])
+            self.assertNotIn('book_pages', sql[-1])
+
+    def test_author_ids(self):
+        author_ids = [author.id for author in self.authors]
+        for results, sql in self.results('/v1/books?fields=title,author&expand='):
+            self.assertEqual(results, [{'author': author_ids, 'title': 'book'}])
+            self.assertNotIn('email', sql[-1])
+
+    def test_author_fields(self):
+        for results, sql in self.results('/v1/books?fields=title,author.name'):
+            self.assertEqual(results, [{'author': [{'name': 'name0'}, {'name': 'name1'}], 'title': 'book'}])
+            self.assertNotIn('email', sql[-1])
+
+        response, _ = self.get(f'/v1/books/{self.book.id}?fields=id,author.surname')
+        self.assertEqual(json.loads(response.content), {
+            'id': self.book.id, 'author': [{'surname': author.surname} for author in self.authors],
+        })
+
+    def test_expand_adds_the_relation(self):
+        for results, _ in self.results('/v1/books?fields=title&expand=author'):
+            self.assertEqual([author['email'] for author in results[0]['author']], [a.email for a in self.authors])
+
+    def test_authors(self):
+        for results, _ in self.results('/v1/author?fields=name'):
+            self.assertEqual(results, [{'name': 'name0'}, {'name': 'name1'}])
+
+    def test_unchanged_without_parameters(self):
+        full, _ = self.get('/v1/books')
+        self.assertEqual(json.loads(full.content)['results'][0]['author'][0]['name'], 'name0')
+        self.assertIn('book_pages', json.loads(full.content)['results'][0])
+
+    def test_invalid(self):
+        response, _ = self.get('/v1/books?fields=title,pages,author.nickname')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content), {'fields': ['Unknown fields: pages, author.nickname.']})
+
+        response, _ = self.get('/v1/author?expand=books')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('expand', json.loads(response.content))
+
+    def test_search(self):
+        response, sql = self.get('/v1/books/search?q=book&fields=id,author.name')
+
+        self.assertEqual(json.loads(response.content)['results'], [
+            {'id': self.book.id, 'author': [{'name': author.name} for author in self.authors]},
+        ])
+        self.assertFalse([query for query in sql if 'email' in query])
+        response, _ = self.get('/v1/books/search?q=book&fields=nope')
+        self.assertEqual(response.status_code, 400)
+
+    def test_etag_depends_on_selection(self):
+        etags = {self.get(url)[0]['ETag'] for url in ('/v1/books', '/v1/books?fields=id', '/v1/books?fields=title')}
+
+        self.assertEqual(len(etags), 3)
+
+    @override_settings(ROOT_URLCONF='library.tests.test_async')
+    async def test_async(self):
+        response = await self.async_client.get('/v1/books', {'fields': 'id,author.name'}, accept='application/json')
+
+        self.assertEqual(json.loads(response.content)['results'], [
+            {'id': self.book.id, 'author': [{'name': 'name0'}, {'name': 'name1'}]},
+        ])
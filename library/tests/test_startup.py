@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.urls import get_resolver
+
+from library import serializers, views, warmup
+
+API_WORKER = '''
+import json, sys
+import library_app.wsgi
+from django.test import Client
+from django.urls import NoReverseMatch, reverse
+try:
+    reverse('admin:index')
+    admin = True
+except NoReverseMatch:
+    admin = False
+response = Client(HTTP_HOST='localhost').get('/v1/', HTTP_ACCEPT='application/json')
+print(json.dumps({
+    'status': response.status_code,
+    'admin': admin,
+    'imported': [name for name in ('PIL', 'django.contrib.sessions.middleware') if name in sys.modules],
+}))
+'''
+
+
+class WarmUpTests(SimpleTestCase):
+
+    def test_warm_up(self):
+        self.assertGreater(warmup.warm_up(), 0)
+        self.assertTrue(get_resolver()._populated)
+
+    def test_views(self):
+        routed = {(view_class.__name__, action) for view_class, _, action in warmup.views(get_resolver().url_patterns)}
+
+        self.assertIn(('BooksViewSet', 'list'), routed)
+        self.assertIn(('AuthorViewSet', 'upload_image'), routed)
+        self.assertIn(('StatsView', None), routed)
+
+
+class LazyExportTests(SimpleTestCase):
+
+    def test_exports(self):
+        from library.serializers.catalog import CatalogBookSerializer
+        from library.views.books import BooksViewSet
+
+        self.assertIs(views.BooksViewSet, BooksViewSet)
+        self.assertIs(serializers.CatalogBookSerializer, CatalogBookSerializer)
+        with self.assertRaises(AttributeError):
+            views.Missing
+
+
+class StartupTests(SimpleTestCase):
+
+    def test_api_settings(self):
+        environment = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'library_app.settings_api'}
+        result = subprocess.run(
+            [sys.executable, '-c', API_WORKER], capture_output=True, text=True, cwd=settings.BASE_DIR,
+            env=environment, check=True,
+        )
+
+        self.assertEqual(json.loads(result.stdout), {'status': 200, 'admin': False, 'imported': []})
+
+    def test_profile_startup(self):
+        out = StringIO()
+        call_command('profile_startup', limit=3, stdout=out)
+
+        self.assertIn('warm_up', out.getvalue())
+        self.assertIn('Import time by package', out.getvalue())
+        self.assertIn('django', out.getvalue())
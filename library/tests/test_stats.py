@@ -0,0 +1,167 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from library import cache, stats
+from library.models import Books, FacetCount
+from .test_author import sample_author
+from .test_bulk import BOOKS_BULK_URL, book_payload
+
+
+def snapshot():
+    return {(row.facet, row.value): row.count for row in FacetCount.objects.all() if row.count}
+
+
+class StatsMaintenanceTests(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.authors = [sample_author(name=f'name{index}') for index in range(3)]
+
+    def assertMatchesRebuild(self):
+        maintained = snapshot()
+        stats.rebuild()
+        self.assertEqual(maintained, snapshot())
+
+    def create_book(self, title, **fields):
+        fields = {'book_pages': 150, 'genre': 2, 'release_date': '2001-05-01', **fields}
+        return Books.objects.create(title=title, **fields)
+
+    def test_saves_and_deletes(self):
+        book = self.create_book('one')
+        other = self.create_book('two', book_pages=1500, release_date='1999-01-01')
+        self.assertEqual(snapshot()[(stats.PAGES, 1000)], 1)
+        self.assertMatchesRebuild()
+
+        book.genre = 7
+        book.book_pages = 20
+        book.save()
+        book.save(update_fields=['modified'])
+        self.assertMatchesRebuild()
+
+        other.author.add(*self.authors)
+        other.delete()
+        self.assertEqual(snapshot()[(stats.BOOKS, 0)], 1)
+        self.assertMatchesRebuild()
+
+    def test_author_links(self):
+        book = self.create_book('one')
+        other = self.create_book('two')
+        book.author.add(*self.authors)
+        book.author.add(self.authors[0])
+        self.authors[0].books_set.add(other)
+        self.assertEqual(snapshot()[(stats.AUTHOR, self.authors[0].pk)], 2)
+        self.assertMatchesRebuild()
+
+        book.author.remove(self.authors[1], self.authors[1])
+        self.authors[0].books_set.remove(book)
+        self.assertMatchesRebuild()
+
+        self.authors[0].books_set.clear()
+        book.author.set([self.authors[1]])
+        self.assertMatchesRebuild()
+
+        self.authors[1].delete()
+        self.assertEqual(snapshot()[(stats.AUTHORS, 0)], 2)
+        self.assertMatchesRebuild()
+
+    def test_bulk_writes(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(username='test', password='123456'))
+        author_ids = [author.id for author in self.authors]
+
+        response = client.post(BOOKS_BULK_URL, [
+            book_payload(f'book{index}', genre=index, author_ids=author_ids[:index + 1]) for index in range(3)
+        ], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertMatchesRebuild()
+
+        ids = [book['id'] for book in response.data]
+        client.patch(BOOKS_BULK_URL, [
+            {'id': ids[0], 'genre': 9, 'author_ids': author_ids[2:]},
+            {'id': ids[1], 'release_date': '1980-01-01'},
+        ], format='json')
+        self.assertMatchesRebuild()
+
+        client.delete(BOOKS_BULK_URL, ids[1:], format='json')
+        self.assertEqual(snapshot()[(stats.BOOKS, 0)], 1)
+        self.assertMatchesRebuild()
+
+    def test_concurrently_created_row(self):
+        bulk_create = FacetCount.objects.bulk_create
+
+        def racing_bulk_create(rows, **kwargs):
+            # Another write creates the genre row just before this insert.
+            FacetCount.objects.create(facet=stats.GENRE, value=4, count=5)
+            return bulk_create(rows, **kwargs)
+
+        with mock.patch.object(FacetCount.objects, 'bulk_create', racing_bulk_create):
+            stats.apply({(stats.GENRE, 4): 1, (stats.YEAR, 1990): 2})
+
+        self.assertEqual(snapshot()[(stats.GENRE, 4)], 6)
+        self.assertEqual(snapshot()[(stats.YEAR, 1990)], 2)
+
+    def test_rebuild_command(self):
+        self.create_book('one')
+        FacetCount.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_stats', stdout=out)
+
+        self.assertIn('for 1 books', out.getvalue())
+        self.assertEqual(snapshot()[(stats.GENRE, 2)], 1)
+
+
+class StatsApiTests(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.authors = [sample_author(name=f'name{index}') for index in range(2)]
+        for index in range(4):
+            book = Books.objects.create(
+                title=f'book{index}', book_pages=90 + index * 100, genre=index % 2, release_date=f'200{index}-01-01',
+            )
+            book.author.set(self.authors[:index % 2 + 1])
+
+    def get(self, url):
+        cache.get_cache().clear()
+        response = self.client.get(url, HTTP_ACCEPT='application/json')
+        return json.loads(response.content)
+
+    def test_stats(self):
+        with self.assertNumQueries(7):
+            body = self.client.get('/v1/stats', {'author_limit': 1}, HTTP_ACCEPT='application/json').json()
+
+        self.assertEqual(body['books'], 4)
+        self.assertEqual(body['authors'], 2)
+        self.assertEqual(body['genre'], [{'value': 0, 'count': 2}, {'value': 1, 'count': 2}])
+        self.assertEqual([year['value'] for year in body['release_year']], [2000, 2001, 2002, 2003])
+        self.assertEqual(body['pages'][:2], [{'min': 0, 'max': 99, 'count': 1}, {'min': 100, 'max': 199, 'count': 1}])
+        self.assertEqual(body['author'], [
+            {'id': self.authors[0].id, 'name': 'name0', 'surname': self.authors[0].surname, 'count': 4},
+        ])
+
+        # Served from the cache until the next change.
+        with self.assertNumQueries(1):
+            self.client.get('/v1/stats', {'author_limit': 1}, HTTP_ACCEPT='application/json')
+        Books.objects.filter(title='book0').delete()
+        self.assertEqual(self.client.get('/v1/stats', HTTP_ACCEPT='application/json').json()['books'], 3)
+
+    def test_list_counts(self):
+        self.assertEqual(self.get('/v1/books?page_size=1')['count'], 4)
+        self.assertEqual(self.get('/v1/books?genre=1')['count'], 2)
+        self.assertEqual(self.get('/v1/books?genre=5')['count'], 0)
+        self.assertIsNone(self.get('/v1/books?genre=1&title=book')['count'])
+        self.assertIsNone(self.get('/v1/books?search=book')['count'])
+        self.assertEqual(self.get('/v1/author')['count'], 2)
+
+    @override_settings(ROOT_URLCONF='library.tests.test_async')
+    async def test_async_list_count(self):
+        response = await self.async_client.get('/v1/books', {'genre': 0}, accept='application/json')
+
+        self.assertEqual(json.loads(response.content)['count'], 2)
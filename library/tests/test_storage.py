@@ -0,0 +1,126 @@
+import io
+import os
+import shutil
+import tempfile
+
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from library import images
+from library.models import Author
+from library.storage import ContentAddressedStorage
+
+
+def image_upload_url(author_id):
+    return reverse('author-upload-image', args=[author_id])
+
+
+def jpeg_bytes(color='red'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (300, 200), color=color).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+class ContentAddressedStorageTests(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.storage = ContentAddressedStorage(location=self.root)
+
+    def test_identical_content_stored_once(self):
+        first = self.storage.save('a.JPG', ContentFile(b'same bytes'))
+        second = self.storage.save('uploads/b.jpg', ContentFile(b'same bytes'))
+        other = self.storage.save('a.jpg', ContentFile(b'other bytes'))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        digest = self.storage.source_digest(first)
+        self.assertEqual(first, f'images/{digest[:2]}/{digest[2:4]}/{digest}.jpg')
+        self.assertEqual(len(list(self.storage.walk())), 2)
+
+    def test_derived_names_kept(self):
+        source = self.storage.save('a.jpg', ContentFile(b'source'))
+        thumbnail = self.storage.save(images.thumbnail_name(source, 64), ContentFile(b'thumb'))
+
+        self.assertEqual(thumbnail, source.replace('.jpg', '_64.jpg'))
+        self.assertEqual(sorted(self.storage.related_names(source)), [source, thumbnail])
+
+
+class AuthorImageStorageTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root, IMAGE_PROCESSING_EAGER=True, IMAGE_GC_GRACE=0
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(username='test', password='123456')
+        )
+        self.authors = [
+            Author.objects.create(name='author', surname=str(i), email='a@b.com', phone=1)
+            for i in range(2)
+        ]
+        self.storage = images.image_storage()
+
+    def upload(self, author, content):
+        upload = SimpleUploadedFile('portrait.jpg', content, content_type='image/jpeg')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(image_upload_url(author.id), {'image': upload}, format='multipart')
+        author.refresh_from_db()
+        return author
+
+    def stored(self):
+        return sorted(self.storage.walk())
+
+    def test_same_image_shared(self):
+        first, second = (self.upload(author, jpeg_bytes()) for author in self.authors)
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(first.image_variants, second.image_variants)
+        self.assertEqual(len(self.stored()), 1 + len(images.thumbnail_sizes()))
+        self.assertEqual(images.reference_count(first.image.name), 2)
+
+    def test_replaced_image_released_when_unreferenced(self):
+        first, second = (self.upload(author, jpeg_bytes()) for author in self.authors)
+        shared = first.image.name
+
+        self.upload(first, jpeg_bytes('blue'))
+        self.assertTrue(self.storage.exists(shared))
+
+        self.upload(second, jpeg_bytes('blue'))
+        self.assertFalse(self.storage.related_names(shared))
+        self.assertEqual(len(self.stored()), 1 + len(images.thumbnail_sizes()))
+
+    def test_deleted_author_releases_image(self):
+        author = self.upload(self.authors[0], jpeg_bytes())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            author.delete()
+
+        self.assertEqual(self.stored(), [])
+
+    def test_gc_removes_orphans(self):
+        author = self.upload(self.authors[0], jpeg_bytes())
+        orphan = self.storage.save('orphan.jpg', ContentFile(jpeg_bytes('green')))
+        legacy = os.path.join(self.media_root, 'uploads', 'recipe')
+        os.makedirs(legacy)
+        open(os.path.join(legacy, 'old.jpg'), 'wb').close()
+
+        call_command('gc_images', '--grace', '0', stdout=io.StringIO())
+
+        self.assertFalse(self.storage.exists(orphan))
+        self.assertFalse(self.storage.exists('uploads/recipe/old.jpg'))
+        self.assertTrue(self.storage.exists(author.image.name))
+        self.assertEqual(len(self.stored()), 1 + len(images.thumbnail_sizes()))
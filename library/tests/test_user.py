@@ -5,6 +5,8 @@ from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from library.querycheck import QueryCheckMixin
+
 CREATE_USER_URL = reverse('create')
 TOKEN_URL = reverse('token')
 
@@ -13,7 +15,7 @@ def create_user(**params):
     return get_user_model().objects.create_user(**params)
 
 
-class UserApiTest(TestCase):
+class UserApiTest(QueryCheckMixin, TestCase):
 
     def setUp(self):
         self.client = APIClient()
@@ -0,0 +1,106 @@
+import datetime
+import decimal
+import json
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from library import cache
+from library.models import Author, Books
+from library.renderers import FastJSONRenderer
+from library.serializers import AuthorSerializer, BooksSerializer
+from library.serializers.books import AUTHORS
+from library.serializers.values import ValuesSerializer
+from .test_author import sample_author
+
+
+class ValuesSerializerTests(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.authors = [sample_author(name=f'name{index}', fb_name=None) for index in range(3)]
+        Author.objects.filter(pk=self.authors[0].pk).update(
+            image='images/ab/cd/abcd.jpg', image_variants={'64': 'images/ab/cd/abcd_64.jpg'},
+        )
+        for index in range(5):
+            book = Books.objects.create(
+                title=f'book{index}', book_pages=10 + index, genre=index, release_date='2023-01-0%d' % (index + 1)
+            )
+            book.author.set(self.authors[:index % 4])
+
+    def test_books_match_model_serializer(self):
+        context = {'request': APIRequestFactory().get('/v1/books')}
+        values = ValuesSerializer(BooksSerializer(context=context))
+
+        rows = list(values.get_queryset(Books.objects.order_by('id')))
+        expected = BooksSerializer(Books.objects.prefetch_related(AUTHORS).order_by('id'), many=True, context=context)
+        with self.assertNumQueries(1):
+            data = values.data(rows)
+
+        self.assertEqual(JSONRenderer().render(data), JSONRenderer().render(expected.data))
+        self.assertEqual(data[0]['author'], [])
+        self.assertEqual(data[1]['author'][0]['image'], 'http://testserver/media/images/ab/cd/abcd.jpg')
+
+    def test_authors_match_model_serializer(self):
+        values = ValuesSerializer(AuthorSerializer())
+
+        data = values.data(list(values.get_queryset(Author.objects.order_by('id'))))
+
+        expected = AuthorSerializer(Author.objects.order_by('id'), many=True).data
+        self.assertEqual(JSONRenderer().render(data), JSONRenderer().render(expected))
+
+    def test_api_output_unchanged(self):
+        for url in ('/v1/books?page_size=2', '/v1/author?page_size=2', '/v1/books?genre=3'):
+            pages = {}
+            for enabled in (True, False):
+                cache.get_cache().clear()
+                with override_settings(VALUES_SERIALIZERS=enabled):
+                    response = self.client.get(url, HTTP_ACCEPT='application/json')
+                    next_page = self.client.get(json.loads(response.content)['next'] or url)
+                pages[enabled] = (response.content, next_page.content)
+            self.assertEqual(pages[True], pages[False])
+
+    @override_settings(ROOT_URLCONF='library.tests.test_async')
+    async def test_async_list(self):
+        response = await self.async_client.get('/v1/books', {'page_size': 3}, accept='application/json')
+
+        body = json.loads(response.content)
+        self.assertEqual([book['title'] for book in body['results']], ['book0', 'book1', 'book2'])
+        self.assertEqual([author['name'] for author in body['results'][2]['author']], ['name0', 'name1'])
+
+    def test_unsupported_fields(self):
+        class MethodSerializer(serializers.ModelSerializer):
+            extra = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Author
+                fields = ('id', 'extra')
+
+        with self.assertRaises(TypeError):
+            ValuesSerializer(MethodSerializer())
+
+
+class FastJSONRendererTests(TestCase):
+    data = {
+        'text': 'caf\u00e9 \u2028 "quoted"',
+        'date': datetime.date(2023, 1, 2),
+        'time': datetime.datetime(2023, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+        'decimal': decimal.Decimal('1.50'),
+        'nested': [{'a': None, 'b': True, 'c': 1.5}],
+        1: 'int key',
+    }
+
+    def test_matches_json_renderer(self):
+        self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_without_orjson(self):
+        with mock.patch('library.renderers.orjson', None):
+            self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_indent(self):
+        rendered = FastJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
@@ -0,0 +1,117 @@
+"""
+Per-client rate limits as token buckets, for DRF's throttling.
+
+A bucket is kept as the time it would next be full (the GCRA form of a
+token bucket), so each check is one read and one write of a single float.
+Buckets live in this process unless ``THROTTLE_CACHE_ALIAS`` names a cache
+shared by all workers. Shared buckets are best-effort: the read and the
+write are separate cache calls, so concurrent requests from one client that
+read the same value all pass.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+from library import metrics
+
+# Most clients tracked in process; the least recently seen are dropped.
+MAX_LOCAL_BUCKETS = 100_000
+
+
+class LocalBuckets:
+    """Buckets in this process, on the monotonic clock."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.full_at = OrderedDict()
+
+    def take(self, key, interval, tolerance):
+        now = time.monotonic()
+        with self.lock:
+            wait = consume(self.full_at.get(key, now), interval, tolerance, now)
+            if wait is None:
+                self.full_at[key] = max(self.full_at.get(key, now), now) + interval
+                self.full_at.move_to_end(key)
+                if len(self.full_at) > MAX_LOCAL_BUCKETS:
+                    self.full_at.popitem(last=False)
+            return wait
+
+
+class CacheBuckets:
+    """
+    Buckets in a shared cache, on the wall clock: unlike the monotonic
+    clock it means the same on every host and across restarts.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def take(self, key, interval, tolerance):
+        now = time.time()
+        cache = caches[self.alias]
+        key = 'throttle:' + hashlib.sha256(key.encode()).hexdigest()
+        full_at = cache.get(key, now)
+        wait = consume(full_at, interval, tolerance, now)
+        if wait is None:
+            full_at = max(full_at, now) + interval
+            cache.set(key, full_at, timeout=int(full_at - now) + 1)
+        return wait
+
+
+def consume(full_at, interval, tolerance, now):
+    """None when a request fits in the bucket, else the seconds until one does."""
+    wait = max(full_at, now) - now - tolerance
+    return wait if wait > 0 else None
+
+
+local_buckets = LocalBuckets()
+
+
+def get_buckets():
+    alias = settings.THROTTLE_CACHE_ALIAS
+    return CacheBuckets(alias) if alias else local_buckets
+
+
+def reset():
+    global local_buckets
+    local_buckets = LocalBuckets()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Allows each client ``rate`` requests per second on average and bursts of
+    up to ``burst``, from ``THROTTLE_BUCKETS['user']`` for authenticated
+    requests (per token, or per user for session logins) and
+    ``THROTTLE_BUCKETS['anon']`` for the rest (per address). A scope set to
+    None is not throttled.
+    """
+
+    def get_scope_and_key(self, request):
+        token = getattr(request.auth, 'key', None)
+        if token is not None:
+            return 'user', f'token:{token}'
+        if request.user and request.user.is_authenticated:
+            return 'user', f'user:{request.user.pk}'
+        return 'anon', f'anon:{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        scope, key = self.get_scope_and_key(request)
+        limits = settings.THROTTLE_BUCKETS.get(scope)
+        if limits is None:
+            return True
+        rate, burst = limits
+        interval = 1 / rate
+        self.wait_time = get_buckets().take(key, interval, interval * (burst - 1))
+        if self.wait_time is None:
+            return True
+        match = getattr(request, 'resolver_match', None)
+        metrics.REJECTED.inc((match.view_name if match is not None else 'unmatched', 'throttled'))
+        return False
+
+    def wait(self):
+        return self.wait_time
@@ -10,6 +10,7 @@ router.register(r'books', views.BooksViewSet)
 router.register(r'author', views.AuthorViewSet)
 
 urlpatterns = [
+    path('v1/stats', views.StatsView.as_view(), name='stats'),
     re_path('v1/', include(router.urls)),
     path('create/', views.CreateUserView.as_view(), name='create'),
     path('token/', views.CreateTokenView.as_view(), name='token'),
@@ -0,0 +1,41 @@
+"""
+Collection versions for list ETags: one CollectionVersion row per model,
+moved by every write to the model's table.
+
+Signal handlers cover saves, deletes and author link changes (see
+library.signals); bulk writes, queryset updates and imports, which send
+no signals, call ``touch`` themselves next to their cache invalidation.
+"""
+from django.db.models import F
+from django.utils import timezone
+
+from library.models import CollectionVersion
+
+
+def touch(*models):
+    now = timezone.now()
+    for model in models:
+        label = model._meta.label_lower
+        updated = CollectionVersion.objects.filter(label=label).update(version=F('version') + 1, modified=now)
+        if not updated:
+            CollectionVersion.objects.bulk_create(
+                [CollectionVersion(label=label, version=1, modified=now)], ignore_conflicts=True,
+            )
+
+
+def versions_queryset(models):
+    labels = [model._meta.label_lower for model in models]
+    return CollectionVersion.objects.filter(label__in=labels).values_list('label', 'version', 'modified'), labels
+
+
+def get(*models):
+    """[(version, modified)] of ``models``, in order; (None, None) for one never written."""
+    queryset, labels = versions_queryset(models)
+    rows = {label: (version, modified) for label, version, modified in queryset}
+    return [rows.get(label, (None, None)) for label in labels]
+
+
+async def aget(*models):
+    queryset, labels = versions_queryset(models)
+    rows = {label: (version, modified) async for label, version, modified in queryset}
+    return [rows.get(label, (None, None)) for label in labels]
@@ -1,3 +1,19 @@
-from .books import BooksViewSet
-from .author import AuthorViewSet
-from .user import CreateUserView, CreateTokenView
+from importlib import import_module
+
+# Imported on first access, so that importing one view module (from a
+# management command, say) does not import every view and serializer.
+EXPORTS = {
+    'BooksViewSet': 'books',
+    'AuthorViewSet': 'author',
+    'CreateUserView': 'user',
+    'CreateTokenView': 'user',
+    'StatsView': 'stats',
+}
+
+__all__ = list(EXPORTS)
+
+
+def __getattr__(name):
+    if name not in EXPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    return getattr(import_module(f'.{EXPORTS[name]}', __name__), name)
@@ -0,0 +1,178 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import prefetch_related_objects
+from django.http import Http404, HttpResponse
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from library import metrics
+
+
+async def afetch(queryset):
+    """Evaluate ``queryset`` with the async ORM, then run its prefetches."""
+    # aiterator() refuses prefetch_related(), so prefetch the rows it returns.
+    lookups = queryset._prefetch_related_lookups
+    objects = [obj async for obj in queryset.prefetch_related(None).aiterator()]
+    if objects and lookups:
+        await sync_to_async(prefetch_related_objects)(objects, *lookups)
+    return objects
+
+
+class AsyncModelMixin:
+    """
+    Coroutine ``list``, ``retrieve`` and ``create`` for ASGI deployments.
+
+    With ``ASYNC_VIEWS`` on, the list and detail routes become async views:
+    JSON ``list``/``retrieve``/``create`` requests run ``alist``/``aretrieve``/
+    ``acreate`` on the event loop with the async ORM, and everything else
+    (other methods, the browsable API) goes to the usual synchronous view.
+    Mixins hook in by overriding the ``a*`` methods, as they do the sync ones.
+    """
+    async_actions = ('list', 'retrieve', 'create')
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        sync_view = super().as_view(actions, **initkwargs)
+        if not settings.ASYNC_VIEWS or not set(actions.values()) & set(cls.async_actions):
+            return sync_view
+        return cls.as_async_view(sync_view, actions, **initkwargs)
+
+    @classmethod
+    def as_async_view(cls, sync_view, actions, **initkwargs):
+        actions = dict(actions)
+        if 'get' in actions and 'head' not in actions:
+            actions['head'] = actions['get']
+        fallback = sync_to_async(sync_view)
+
+        async def view(request, *args, **kwargs):
+            if actions.get(request.method.lower()) in cls.async_actions:
+                self = cls(**initkwargs)
+                self.action_map = actions
+                response = await self.adispatch(request, *args, **kwargs)
+                if response is not None:
+                    return response
+            return await fallback(request, *args, **kwargs)
+
+        view.cls = cls
+        view.initkwargs = initkwargs
+        view.actions = actions
+        view.csrf_exempt = True
+        return view
+
+    async def adispatch(self, request, *args, **kwargs):
+        """``APIView.dispatch``, or ``None`` to leave the request to the sync view."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            self.format_kwarg = self.get_format_suffix(**kwargs)
+            negotiated = self.perform_content_negotiation(request)
+            if not isinstance(negotiated[0], JSONRenderer):
+                return None
+            request.accepted_renderer, request.accepted_media_type = negotiated
+            request.version, request.versioning_scheme = self.determine_version(request, *args, **kwargs)
+            await self.aperform_authentication(request)
+            self.check_permissions(request)
+            self.check_throttles(request)
+            response = await getattr(self, f'a{self.action}')(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        if not isinstance(self.response, Response):
+            return self.response
+        # The ASGI handler renders template responses in a worker thread;
+        # render here and hand back a plain response instead.
+        with metrics.timed_render():
+            self.response.render()
+        rendered = HttpResponse(
+            self.response.content,
+            status=self.response.status_code,
+            headers=self.response.headers,
+        )
+        rendered.cookies = self.response.cookies
+        return rendered
+
+    async def aperform_authentication(self, request):
+        # Sets request.user up front; reading it unset would authenticate
+        # synchronously.
+        try:
+            for authenticator in request.authenticators:
+                if hasattr(authenticator, 'aauthenticate'):
+                    user_auth = await authenticator.aauthenticate(request)
+                else:
+                    user_auth = await sync_to_async(authenticator.authenticate)(request)
+                if user_auth is not None:
+                    request.user, request.auth = user_auth
+                    return
+        except exceptions.APIException:
+            self.set_unauthenticated(request)
+            raise
+        self.set_unauthenticated(request)
+
+    def set_unauthenticated(self, request):
+        user, token = api_settings.UNAUTHENTICATED_USER, api_settings.UNAUTHENTICATED_TOKEN
+        request.user = user() if user else None
+        request.auth = token() if token else None
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            objects = await afetch(queryset.filter(**filter_kwargs)[:2])
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        if not objects:
+            raise Http404
+        if len(objects) > 1:
+            raise queryset.model.MultipleObjectsReturned()
+
+        self.check_object_permissions(self.request, objects[0])
+        return objects[0]
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(await afetch(queryset), many=True)
+        return Response(serializer.data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+    async def acreate(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        # DRF validators are synchronous and may query (unique checks).
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        await self.aperform_create(serializer)
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+
+    async def aperform_create(self, serializer):
+        model = self.queryset.model
+        data = dict(serializer.validated_data)
+        many_to_many = {
+            field.name: data.pop(field.name)
+            for field in model._meta.many_to_many if field.name in data
+        }
+        instance = await model._default_manager.acreate(**data)
+        for name, values in many_to_many.items():
+            # Related managers have no async API before Django 4.2.
+            await sync_to_async(getattr(instance, name).set)(values)
+        await sync_to_async(prefetch_related_objects)(
+            [instance], *self.get_queryset()._prefetch_related_lookups
+        )
+        serializer.instance = instance
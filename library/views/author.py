@@ -1,18 +1,44 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from library.serializers import AuthorSerializer, AuthorImageSerializer
+from library.views.asynchronous import AsyncModelMixin
+from library.views.bulk import BulkModelMixin
+from library.views.caching import CachedResponseMixin
+from library.views.conditional import ConditionalGetMixin
+from library.views.negotiation import VaryOnAcceptMixin
+from library.views.sparse import SparseFieldsMixin
+from library.views.stats import FacetCountMixin
+from library.views.values import ValuesListMixin
+from library import stats
+from library.authentication import CachedTokenAuthentication
 from library.models import Author
 
 
-class AuthorViewSet(viewsets.ModelViewSet):
+class AuthorViewSet(
+    VaryOnAcceptMixin,
+    CachedResponseMixin,
+    SparseFieldsMixin,
+    ConditionalGetMixin,
+    ValuesListMixin,
+    FacetCountMixin,
+    AsyncModelMixin,
+    BulkModelMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = AuthorSerializer
     queryset = Author.objects.all()
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticatedOrReadOnly,)
+    replica_reads = True
+    count_facet = stats.AUTHORS
     search_fields = ('name', 'surname', 'email')
+    filter_fields = {
+        'name': 'name__prefix',
+        'surname': 'surname__prefix',
+        'email': 'email',
+    }
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
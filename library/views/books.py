@@ -1,13 +1,102 @@
-from rest_framework import viewsets
-from rest_framework.authentication import TokenAuthentication
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
-from serializers import BooksSerializer
+from library.serializers import BooksSerializer
+from library.views.asynchronous import AsyncModelMixin
+from library.views.bulk import BulkModelMixin
+from library.views.caching import CachedResponseMixin
+from library.views.conditional import ConditionalGetMixin
+from library.views.negotiation import VaryOnAcceptMixin
+from library.views.sparse import SparseFieldsMixin
+from library.views.stats import FacetCountMixin
+from library.views.values import ValuesListMixin
+from library import stats
+from library.authentication import CachedTokenAuthentication
 from library.models import Books
+from library.serializers.books import AUTHORS
+from library.search import search_books
+from library.export import asgi_lines, csv_lines, ndjson_lines
 
 
-class BooksViewSet(viewsets.ModelViewSet):
+def filter_by_author_name(queryset, value):
+    # A subquery on the through table keeps one row per book, so no DISTINCT
+    # is needed when a book has several authors sharing a first name.
+    through = Books.author.through
+    return queryset.filter(
+        id__in=through.objects.filter(author__name=value).values('books_id')
+    )
+
+
+EXPORT_TYPES = {
+    'ndjson': (ndjson_lines, 'application/x-ndjson'),
+    'csv': (csv_lines, 'text/csv'),
+}
+
+
+class BooksViewSet(
+    VaryOnAcceptMixin,
+    CachedResponseMixin,
+    SparseFieldsMixin,
+    ConditionalGetMixin,
+    ValuesListMixin,
+    FacetCountMixin,
+    AsyncModelMixin,
+    BulkModelMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = BooksSerializer
-    queryset = Books.objects.all()
-    authentication_classes = (TokenAuthentication,)
+    queryset = Books.objects.prefetch_related(AUTHORS)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticatedOrReadOnly,)
+    replica_reads = True
     search_fields = ('title', 'author__name', 'book_pages', 'release_date')
+    filter_fields = {
+        'title': 'title__prefix',
+        'author': filter_by_author_name,
+        'genre': 'genre',
+        'released_after': 'release_date__gte',
+        'released_before': 'release_date__lte',
+    }
+    version_related = ('author',)
+    count_facet = stats.BOOKS
+    filter_facets = {'genre': stats.GENRE}
+    sparse_actions = ('list', 'retrieve', 'search')
+    expandable = ('author',)
+    default_expand = ('author',)
+    export_chunk_size = 2000
+
+    @action(methods=['GET'], detail=False)
+    def search(self, request):
+        query = request.query_params.get('q', '')
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except ValueError:
+            return Response(
+                {'limit': ['A valid integer is required.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        books = search_books(self.get_queryset(), query, limit)
+        serializer = self.get_serializer(books, many=True)
+        return Response({'results': serializer.data})
+
+    @action(methods=['GET'], detail=False)
+    def export(self, request):
+        export_type = request.query_params.get('type', 'ndjson')
+        if export_type not in EXPORT_TYPES:
+            return Response(
+                {'type': [f'Expected one of: {", ".join(EXPORT_TYPES)}.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        lines, content_type = EXPORT_TYPES[export_type]
+        queryset = self.filter_queryset(Books.objects.all())
+        content = lines(queryset, self.export_chunk_size)
+        if isinstance(request._request, ASGIRequest):
+            content = asgi_lines(content, self.export_chunk_size)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="books.{export_type}"'
+        return response
@@ -0,0 +1,119 @@
+from django.db import IntegrityError, transaction
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from library import cache, stats, versions
+
+
+class BulkModelMixin:
+    """
+    Adds ``/bulk`` to a ModelViewSet: POST a list of objects to create them,
+    PATCH a list of objects with ``id`` to update them, DELETE a list of ids
+    to delete them. Every write happens in a single transaction and errors
+    are returned as a list aligned with the request body.
+    """
+    bulk_max_items = 1000
+
+    def check_bulk_payload(self, data):
+        if not isinstance(data, list):
+            return Response(
+                {'non_field_errors': ['Expected a list of items.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(data) > self.bulk_max_items:
+            return Response(
+                {'non_field_errors': [f'At most {self.bulk_max_items} items per request.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return None
+
+    def get_bulk_instances(self, ids):
+        """Return instances aligned with ``ids`` and per-item lookup errors."""
+        # Not isinstance(): booleans are ints, and true would update pk 1.
+        valid = [type(pk) is int for pk in ids]
+        found = self.get_queryset().in_bulk(
+            [pk for pk, is_valid in zip(ids, valid) if is_valid]
+        )
+        instances = [found.get(pk) if is_valid else None for pk, is_valid in zip(ids, valid)]
+        errors = [
+            {} if instance else {'id': ['Not found.' if is_valid else 'A valid integer is required.']}
+            for instance, is_valid in zip(instances, valid)
+        ]
+        return instances, errors
+
+    def bulk_response(self, instances, response_status):
+        # Re-read through get_queryset() so nested relations are prefetched
+        # instead of queried once per item while serializing.
+        found = self.get_queryset().in_bulk([instance.pk for instance in instances])
+        serializer = self.get_serializer([found[instance.pk] for instance in instances], many=True)
+        return Response(serializer.data, status=response_status)
+
+    def save_bulk(self, serializer):
+        try:
+            with transaction.atomic():
+                # bulk_create and bulk_update send no signals, so the
+                # statistics are updated from the rows before and after.
+                model = self.queryset.model
+                before = stats.tally(model, [instance.pk for instance in serializer.instance or ()])
+                instances = serializer.save()
+                pks = [instance.pk for instance in instances]
+                cache.invalidate_objects(model, pks)
+                versions.touch(model)
+                stats.apply(stats.difference(stats.tally(model, pks), before))
+                return instances
+        except IntegrityError as exc:
+            return Response(
+                {'non_field_errors': [str(exc)]},
+                status=status.HTTP_409_CONFLICT
+            )
+
+    @action(methods=['POST'], detail=False)
+    def bulk(self, request):
+        error = self.check_bulk_payload(request.data)
+        if error:
+            return error
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        instances = self.save_bulk(serializer)
+        if isinstance(instances, Response):
+            return instances
+        return self.bulk_response(instances, status.HTTP_201_CREATED)
+
+    @bulk.mapping.patch
+    def bulk_update(self, request):
+        error = self.check_bulk_payload(request.data)
+        if error:
+            return error
+
+        ids = [item.get('id') if isinstance(item, dict) else None for item in request.data]
+        instances, errors = self.get_bulk_instances(ids)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(instances, data=request.data, many=True, partial=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        instances = self.save_bulk(serializer)
+        if isinstance(instances, Response):
+            return instances
+        return self.bulk_response(instances, status.HTTP_200_OK)
+
+    @bulk.mapping.delete
+    def bulk_destroy(self, request):
+        error = self.check_bulk_payload(request.data)
+        if error:
+            return error
+
+        instances, errors = self.get_bulk_instances(request.data)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            cache.invalidate_objects(self.queryset.model, [instance.pk for instance in instances])
+            self.get_queryset().filter(pk__in=[instance.pk for instance in instances]).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
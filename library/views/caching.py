@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework.response import Response
+
+from library import cache, routers
+
+
+class CachedResponseMixin:
+    """
+    Serves ``list`` and ``retrieve`` from the API cache. Hits are revalidated
+    against the ETag and Last-Modified stored with the entry, so a cached
+    304 costs no database query either.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, None, super().list)
+
+    def retrieve(self, request, *args, **kwargs):
+        object_id = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return self.cached_response(request, object_id, super().retrieve, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response(request, None, super().alist)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        object_id = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return await self.acached_response(request, object_id, super().aretrieve, *args, **kwargs)
+
+    def get_cache_key(self, request, object_id):
+        key = cache.response_key(self.queryset.model._meta.label_lower, object_id, request)
+        # Replica reads are kept apart, so a client pinned to the primary
+        # is never served what a lagging replica returned to someone else.
+        return key + ':replica' if routers.reading_from_replica() else key
+
+    def store_response(self, key, response):
+        # A replica may be behind the invalidation that picked this key, so
+        # entries built from replica reads only live as long as the lag.
+        timeout = settings.REPLICA_LAG if routers.reading_from_replica() else DEFAULT_TIMEOUT
+        return cache.store(
+            key,
+            response.data,
+            etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(response.get('Last-Modified')),
+            timeout=timeout,
+        )
+
+    def cached_response(self, request, object_id, view, *args, **kwargs):
+        key = self.get_cache_key(request, object_id)
+        entry = cache.fetch(key)
+        if entry is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            entry = self.store_response(key, response)
+        else:
+            response = Response(entry['data'])
+        return self.revalidate(request, entry, response)
+
+    async def acached_response(self, request, object_id, view, *args, **kwargs):
+        def lookup():
+            key = self.get_cache_key(request, object_id)
+            return key, cache.fetch(key)
+
+        key, entry = await cache.call(cache.get_cache(), lookup)
+        if entry is None:
+            response = await view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            entry = await cache.call(cache.get_cache(), self.store_response, key, response)
+        else:
+            response = Response(entry['data'])
+        return self.revalidate(request, entry, response)
+
+    def revalidate(self, request, entry, response):
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        return get_conditional_response(
+            request,
+            etag=entry['etag'],
+            last_modified=entry['last_modified'],
+            response=response,
+        )
@@ -0,0 +1,110 @@
+import hashlib
+
+from django.db.models import Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from library import versions
+
+
+class ConditionalGetMixin:
+    """
+    Answers conditional ``list`` and ``retrieve`` requests from row versions.
+
+    Models carry a ``modified`` timestamp and collections a version counter
+    (library.versions), so the validators cost one indexed lookup and a
+    matching ``If-None-Match``/``If-Modified-Since`` gets a 304 before the
+    object is loaded or serialized. ``version_related`` names relations
+    whose rows are embedded in the representation, so that their changes
+    produce a new ETag too.
+    """
+    version_field = 'modified'
+    version_related = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, self.get_collection_version(), super().list)
+
+    def retrieve(self, request, *args, **kwargs):
+        object_id = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        version = self.get_object_version(object_id)
+        return self.conditional_response(request, version, super().retrieve, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        version = await self.aget_collection_version()
+        return await self.aconditional_response(request, version, super().alist)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        object_id = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        version = await self.aget_object_version(object_id)
+        return await self.aconditional_response(request, version, super().aretrieve, *args, **kwargs)
+
+    def get_object_version_queryset(self, object_id):
+        model = self.queryset.model
+        related = [f'{name}__{self.version_field}' for name in self.version_related]
+        queryset = model._default_manager.filter(
+            **{self.lookup_field: object_id}
+        ).annotate(**{
+            f'related_{index}': Max(field) for index, field in enumerate(related)
+        })
+        return queryset.values_list(
+            self.version_field, *[f'related_{index}' for index in range(len(related))]
+        )
+
+    def get_object_version(self, object_id):
+        try:
+            return self.get_object_version_queryset(object_id).first()
+        except (TypeError, ValueError):
+            return None
+
+    async def aget_object_version(self, object_id):
+        try:
+            return await self.get_object_version_queryset(object_id).afirst()
+        except (TypeError, ValueError):
+            return None
+
+    def get_collection_models(self):
+        model = self.queryset.model
+        return [model] + [model._meta.get_field(name).related_model for name in self.version_related]
+
+    def get_collection_version(self):
+        return [value for row in versions.get(*self.get_collection_models()) for value in row]
+
+    async def aget_collection_version(self):
+        return [value for row in await versions.aget(*self.get_collection_models()) for value in row]
+
+    def get_validators(self, request, version):
+        timestamps = [value for value in version if hasattr(value, 'timestamp')]
+        last_modified = int(max(timestamps).timestamp()) if timestamps else None
+        tag = repr((list(version), request.accepted_renderer.format))
+        etag = '"%s"' % hashlib.sha1(tag.encode()).hexdigest()
+        return etag, last_modified
+
+    def set_validators(self, response, etag, last_modified):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def conditional_response(self, request, version, view, *args, **kwargs):
+        if version is None:
+            return view(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators(request, version)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        return self.set_validators(response, etag, last_modified)
+
+    async def aconditional_response(self, request, version, view, *args, **kwargs):
+        if version is None:
+            return await view(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators(request, version)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = await view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        return self.set_validators(response, etag, last_modified)
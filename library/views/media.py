@@ -0,0 +1,154 @@
+"""
+Serving files under MEDIA_ROOT.
+
+Whole files are returned as a ``FileResponse`` over the open file, which WSGI
+servers with ``wsgi.file_wrapper`` (gunicorn, uWSGI) send with ``sendfile``.
+Single byte ranges are supported, content-addressed files (see
+library.storage) are cacheable forever, and with ``MEDIA_ACCEL_REDIRECT`` the
+transfer is handed to the front-end server instead.
+"""
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+from library import images
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+class RangeFile:
+    """
+    ``length`` bytes of an open file from its current position.
+
+    Keeps ``fileno`` so servers can still ``sendfile`` the range: they start
+    at the file position and stop at Content-Length.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Return ``(start, end)`` (inclusive) for a single satisfiable byte range,
+    ``None`` to ignore the header, or raise ``ValueError`` if unsatisfiable.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        # Malformed or multiple ranges: serve the whole file.
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    else:
+        start, end = max(size - int(last), 0), size - 1
+        if int(last) == 0:
+            raise ValueError(header)
+    if start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def cache_headers(response, path):
+    if images.image_storage().source_digest(path):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=getattr(settings, 'MEDIA_MAX_AGE', 3600))
+
+
+def accel_response(path, full_path, content_type):
+    mode = getattr(settings, 'MEDIA_ACCEL_REDIRECT', None)
+    response = HttpResponse(content_type=content_type)
+    if mode == 'x-accel-redirect':
+        prefix = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + path
+    elif mode == 'x-sendfile':
+        response['X-Sendfile'] = full_path
+    else:
+        raise ValueError(f'Unknown MEDIA_ACCEL_REDIRECT {mode!r}.')
+    # The front-end server supplies the body and its length.
+    del response['Content-Length']
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat_result = os.stat(full_path)
+    except (OSError, SuspiciousFileOperation):
+        raise Http404('No such file.')
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise Http404('No such file.')
+
+    size = stat_result.st_size
+    etag = quote_etag(f'{int(stat_result.st_mtime)}-{size:x}')
+    last_modified = stat_result.st_mtime
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        if getattr(settings, 'MEDIA_ACCEL_REDIRECT', None):
+            response = accel_response(path, full_path, content_type)
+        else:
+            response = file_response(request, full_path, size, etag, content_type)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if response.status_code != 416:
+        cache_headers(response, path)
+    return response
+
+
+def file_response(request, full_path, size, etag, content_type):
+    byte_range = None
+    header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if header and (if_range is None or if_range == etag):
+        try:
+            byte_range = parse_range(header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = FileResponse(RangeFile(file, end - start + 1), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,9 @@
+from django.http import HttpResponse
+from django.views.decorators.http import require_safe
+
+from library import metrics
+
+
+@require_safe
+def serve_metrics(request):
+    return HttpResponse(metrics.exposition(), content_type='text/plain; version=0.0.4; charset=utf-8')
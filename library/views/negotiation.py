@@ -0,0 +1,13 @@
+from django.utils.cache import patch_vary_headers
+
+
+class VaryOnAcceptMixin:
+    """
+    Adds ``Accept`` to ``Vary``: the renderer, JSON, columnar JSON or
+    MessagePack, is picked from that header, so shared caches must key on it.
+    """
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        patch_vary_headers(response, ('Accept',))
+        return response
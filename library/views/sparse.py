@@ -0,0 +1,146 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+
+def split(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def readable(serializer):
+    return {name: field for name, field in serializer.fields.items() if not field.write_only}
+
+
+class SparseFieldsMixin:
+    """
+    ``?fields=`` and ``?expand=`` on the read actions in ``sparse_actions``.
+
+    ``fields`` names the fields to return, and ``author.name`` picks fields
+    of an expanded relation. ``expand`` names the relations from
+    ``expandable`` to embed as objects; selected relations that aren't
+    expanded render as lists of ids. ``default_expand`` applies when
+    ``expand`` is not given, so a request with neither parameter gets the
+    full representation. The queryset is narrowed to the selected columns,
+    and relations that aren't selected are not fetched at all.
+    """
+    sparse_actions = ('list', 'retrieve')
+    expandable = ()
+    default_expand = ()
+
+    def get_field_selection(self):
+        """``(fields, expand)`` for this request, or None for the full representation."""
+        if not hasattr(self, '_field_selection'):
+            self._field_selection = self.parse_field_selection(self.request.query_params)
+        return self._field_selection
+
+    def parse_field_selection(self, params):
+        if self.action not in self.sparse_actions or self.request.method not in SAFE_METHODS:
+            return None
+        if not params.get('fields') and 'expand' not in params:
+            return None
+
+        available = readable(self.get_serializer_class()(context=self.get_serializer_context()))
+        expand = set(split(params['expand'])) if 'expand' in params else set(self.default_expand)
+        unknown = sorted(expand - set(self.expandable))
+        if unknown:
+            choices = ', '.join(self.expandable) or 'nothing'
+            raise ValidationError({'expand': [f'Cannot expand {", ".join(unknown)}; expected {choices}.']})
+
+        if not params.get('fields'):
+            return None, expand
+        fields = {}
+        for name in split(params['fields']):
+            name, _, child = name.partition('.')
+            fields.setdefault(name, set())
+            if child:
+                fields[name].add(child)
+                expand.add(name)
+        for name in set(split(params['expand'])) if 'expand' in params else ():
+            fields.setdefault(name, set())
+
+        unknown = sorted(name for name in fields if name not in available)
+        for name, children in fields.items():
+            if children and name not in self.expandable:
+                unknown.append(f'{name}.*')
+            elif children:
+                child_fields = readable(available[name].child)
+                unknown.extend(f'{name}.{child}' for child in sorted(children) if child not in child_fields)
+        if unknown:
+            raise ValidationError({'fields': [f'Unknown fields: {", ".join(unknown)}.']})
+        return {name: sorted(children) for name, children in sorted(fields.items())}, expand
+
+    def get_validators(self, request, version):
+        # Different selections of the same rows need different ETags.
+        selection = self.get_field_selection()
+        if selection is not None:
+            fields, expand = selection
+            version = [*version, repr((fields, sorted(expand)))]
+        return super().get_validators(request, version)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        selection = self.get_field_selection()
+        if selection is not None:
+            self.select_fields(getattr(serializer, 'child', serializer), *selection)
+        return serializer
+
+    def select_fields(self, serializer, fields, expand):
+        for name, field in list(readable(serializer).items()):
+            if fields is not None and name not in fields:
+                del serializer.fields[name]
+            elif name in self.expandable and name not in expand:
+                kwargs = {} if field.source == name else {'source': field.source}
+                serializer.fields[name] = serializers.PrimaryKeyRelatedField(many=True, read_only=True, **kwargs)
+            elif fields is not None and fields[name]:
+                child = field.child
+                for child_name in list(readable(child)):
+                    if child_name not in fields[name]:
+                        del child.fields[child_name]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.get_field_selection() is None:
+            return queryset
+        serializer = self.get_serializer()
+        return self.narrow_queryset(queryset, serializer)
+
+    def narrow_queryset(self, queryset, serializer):
+        model = queryset.model
+        columns, lookups = model_columns(model, serializer)
+        if columns is None:
+            return queryset
+        queryset = queryset.only(*columns).prefetch_related(None)
+        for field in lookups:
+            related_model = model._meta.get_field(field.source).related_model
+            if isinstance(field, serializers.ManyRelatedField):
+                related_columns = [related_model._meta.pk.name]
+            else:
+                related_columns, _ = model_columns(related_model, field.child)
+            related = related_model._default_manager.order_by('pk')
+            if related_columns is not None:
+                related = related.only(*related_columns)
+            queryset = queryset.prefetch_related(Prefetch(field.source, queryset=related))
+        return queryset
+
+
+def model_columns(model, serializer):
+    """
+    The model fields ``serializer`` reads and its many-to-many fields as
+    ``(columns, fields)``, with None for columns when a field isn't
+    backed by a single model field.
+    """
+    columns, lookups = [model._meta.pk.name], []
+    for field in readable(serializer).values():
+        if field.source == '*' or '.' in field.source:
+            return None, lookups
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None, lookups
+        if model_field.many_to_many:
+            lookups.append(field)
+        elif not model_field.is_relation or model_field.concrete:
+            columns.append(model_field.name)
+    return columns, lookups
@@ -0,0 +1,85 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from library import stats
+from library.models import Author
+from library.views.negotiation import VaryOnAcceptMixin
+
+
+class FacetCountMixin:
+    """
+    Gives paginated lists a ``count`` from the catalog statistics instead of
+    a ``COUNT(*)``: the ``count_facet`` total for an unfiltered list, or the
+    count for the value of a ``filter_facets`` filter when it is the only
+    one. Lists with other filters get None.
+    """
+    count_facet = None
+    filter_facets = {}
+
+    def get_count_facet(self):
+        params = [*getattr(self, 'filter_fields', ()), api_settings.SEARCH_PARAM]
+        filters = {
+            param: self.request.query_params[param]
+            for param in params if self.request.query_params.get(param, '') != ''
+        }
+        if not filters:
+            return (self.count_facet, 0) if self.count_facet else None
+        if len(filters) == 1:
+            [(param, value)] = filters.items()
+            if param in self.filter_facets and value.isdigit():
+                return self.filter_facets[param], int(value)
+        return None
+
+    def get_approximate_count(self):
+        facet = self.get_count_facet()
+        return stats.count(*facet) if facet else None
+
+    async def aget_approximate_count(self):
+        facet = self.get_count_facet()
+        return await stats.acount(*facet) if facet else None
+
+
+class StatsView(VaryOnAcceptMixin, APIView):
+    """
+    Book counts per genre, release year, page-count bucket and author (the
+    ``author_limit`` authors with most books), from the catalog statistics.
+    """
+    replica_reads = True
+    author_limit = 20
+    max_author_limit = 1000
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('author_limit', self.author_limit))
+        except ValueError:
+            return Response(
+                {'author_limit': ['A valid integer is required.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = min(max(limit, 0), self.max_author_limit)
+
+        bounds = stats.PAGE_BUCKETS
+        pages = [
+            {
+                'min': bound,
+                'max': bounds[bounds.index(bound) + 1] - 1 if bound != bounds[-1] else None,
+                'count': count,
+            }
+            for bound, count in stats.facets(stats.PAGES)
+        ]
+        top_authors = stats.facets(stats.AUTHOR, limit) if limit else []
+        names = Author.objects.only('name', 'surname').in_bulk([author_id for author_id, _ in top_authors])
+        authors = [
+            {'id': author_id, 'name': names[author_id].name, 'surname': names[author_id].surname, 'count': count}
+            for author_id, count in top_authors if author_id in names
+        ]
+        return Response({
+            'books': stats.count(stats.BOOKS),
+            'authors': stats.count(stats.AUTHORS),
+            'genre': [{'value': genre, 'count': count} for genre, count in stats.facets(stats.GENRE)],
+            'release_year': [{'value': year, 'count': count} for year, count in stats.facets(stats.YEAR)],
+            'pages': pages,
+            'author': authors,
+        })
@@ -1,13 +1,25 @@
 from rest_framework import generics, authentication, permissions
+from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
-from serializers import UserSerializer, AuthTokenSerializer
+from library import authentication as token_cache
+from library.serializers import UserSerializer, AuthTokenSerializer
+from library.views.negotiation import VaryOnAcceptMixin
 
 
-class CreateUserView(generics.CreateAPIView):
+class CreateUserView(VaryOnAcceptMixin, generics.CreateAPIView):
     serializer_class = UserSerializer
 
 
-class CreateTokenView(ObtainAuthToken):
+class CreateTokenView(VaryOnAcceptMixin, ObtainAuthToken):
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        token, created = Token.objects.get_or_create(user=serializer.validated_data['user'])
+        # Warm the auth cache so the first request with this token is free.
+        token_cache.prime(token)
+        return Response({'token': token.key})
@@ -0,0 +1,36 @@
+from django.conf import settings
+from rest_framework.response import Response
+
+from library.serializers.values import ValuesSerializer
+
+
+class ValuesListMixin:
+    """
+    Serves ``list`` from ``.values()`` rows through ValuesSerializer when
+    ``VALUES_SERIALIZERS`` is on. The JSON is the same as the viewset's
+    serializer produces; only the work behind it changes.
+    """
+
+    def get_values_serializer(self):
+        return ValuesSerializer(self.get_serializer())
+
+    def list(self, request, *args, **kwargs):
+        if not settings.VALUES_SERIALIZERS:
+            return super().list(request, *args, **kwargs)
+        values = self.get_values_serializer()
+        queryset = values.get_queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(values.data(page))
+        return Response(values.data(list(queryset)))
+
+    async def alist(self, request, *args, **kwargs):
+        if not settings.VALUES_SERIALIZERS:
+            return await super().alist(request, *args, **kwargs)
+        values = self.get_values_serializer()
+        queryset = values.get_queryset(self.filter_queryset(self.get_queryset()))
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+            if page is not None:
+                return self.get_paginated_response(await values.adata(page))
+        return Response(await values.adata([row async for row in queryset.aiterator()]))
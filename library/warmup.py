@@ -0,0 +1,56 @@
+"""
+Worker warm-up, run by library_app.wsgi and library_app.asgi before the
+worker takes traffic (``LIBRARY_WARM_UP=0`` to skip).
+
+Django compiles URL patterns and DRF builds serializer fields on first use,
+and the first use pulls in the modules and model metadata behind them, so
+without this the first requests to each route on every new worker pay for
+it. Nothing here touches the database.
+"""
+import time
+
+from django.urls import URLResolver, get_resolver
+
+from library.serializers.values import ValuesSerializer
+from library.views.values import ValuesListMixin
+
+
+def views(patterns):
+    """(view class, init kwargs, action) for every DRF view routed in ``patterns``."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from views(pattern.url_patterns)
+            continue
+        callback = pattern.callback
+        if not hasattr(callback, 'cls'):
+            continue
+        actions = getattr(callback, 'actions', None) or {None: None}
+        for action in actions.values():
+            yield callback.cls, callback.initkwargs, action
+
+
+def warm_serializer(view_class, initkwargs, action):
+    view = view_class(**initkwargs)
+    view.action = action
+    get_serializer_class = getattr(view, 'get_serializer_class', None)
+    if get_serializer_class is None:
+        return
+    serializer_class = get_serializer_class()
+    serializer = serializer_class(context={'request': None, 'format': None, 'view': view})
+    serializer.fields
+    if action == 'list' and isinstance(view, ValuesListMixin):
+        ValuesSerializer(serializer)
+
+
+def warm_up():
+    """Compile every URL route and build every routed serializer; returns the seconds taken."""
+    started = time.perf_counter()
+    resolver = get_resolver()
+    # Populating the reverse lookup compiles every pattern on the way.
+    resolver.reverse_dict
+    seen = set()
+    for view_class, initkwargs, action in views(resolver.url_patterns):
+        if (view_class, action) not in seen:
+            seen.add((view_class, action))
+            warm_serializer(view_class, initkwargs, action)
+    return time.perf_counter() - started
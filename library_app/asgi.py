@@ -9,8 +9,18 @@ https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'library_app.settings')
+os.environ.setdefault('LIBRARY_ASYNC_VIEWS', '1')
+# Async requests run queries in short-lived threads, so persistent
+# connections would pile up; use a pool (DB_POOL=1) or PgBouncer instead.
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
+
+if settings.WARM_UP:
+    from library.warmup import warm_up
+
+    warm_up()
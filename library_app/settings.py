@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
+import os
+from importlib.util import find_spec
 from pathlib import Path
 
+import django
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,6 +47,9 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'library.middleware.InstrumentationMiddleware',
+    'library.middleware.CompressionMiddleware',
+    'library.middleware.AdmissionControlMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -50,10 +57,41 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'library.middleware.ReplicaRoutingMiddleware',
+    'library.middleware.QueryInspectionMiddleware',
 ]
 
 ROOT_URLCONF = 'library_app.urls'
 
+# library.middleware.CompressionMiddleware: brotli when the optional brotli
+# package is installed, gzip otherwise, for bodies of at least
+# COMPRESSION_MIN_SIZE bytes. The levels favour speed, as every response
+# is compressed afresh.
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_GZIP_LEVEL = 5
+COMPRESSION_BROTLI_QUALITY = 4
+
+# Per-route timings from library.middleware.InstrumentationMiddleware:
+# Prometheus histograms at /metrics (keep it off the public network) and a
+# Server-Timing header on every response.
+SERVE_METRICS = True
+SERVER_TIMING = True
+
+# library.querycheck: the same SQL repeated this many times in one request is
+# reported as an N+1, and queries taking this long (seconds) as slow.
+# QueryInspectionMiddleware logs both when DEBUG is on.
+QUERY_REPEAT_THRESHOLD = 5
+QUERY_SLOW_THRESHOLD = 0.1
+
+# Route book and author list/retrieve/create through the coroutine views in
+# library.views.asynchronous. asgi.py turns this on; under WSGI every async
+# view would need its own event loop.
+ASYNC_VIEWS = os.environ.get('LIBRARY_ASYNC_VIEWS', '') == '1'
+
+# library.warmup: compile the URL routes and build the serializers when the
+# WSGI/ASGI application loads, before the worker takes requests.
+WARM_UP = os.environ.get('LIBRARY_WARM_UP', '1') == '1'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -72,10 +110,59 @@ TEMPLATES = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.BasicAuthentication',
+        'library.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-    ]
+    ],
+    'DEFAULT_FILTER_BACKENDS': [
+        'library.filters.FieldFilterBackend',
+        'rest_framework.filters.SearchFilter',
+    ],
+    # MessagePack only when the optional msgpack package is installed.
+    'DEFAULT_RENDERER_CLASSES': [
+        'library.renderers.FastJSONRenderer',
+        'library.renderers.ColumnarJSONRenderer',
+        *(['library.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        *(['library.parsers.MessagePackParser'] if find_spec('msgpack') else []),
+    ],
+    'DEFAULT_THROTTLE_CLASSES': ['library.throttling.TokenBucketThrottle'],
+    'DEFAULT_PAGINATION_CLASS': 'library.pagination.IdCursorPagination',
+    'PAGE_SIZE': 100,
+}
+
+# Book and author lists are serialized from .values() rows (see
+# library.serializers.values) rather than through model instances.
+VALUES_SERIALIZERS = True
+
+# library.middleware.AdmissionControlMiddleware: requests at once, requests
+# queued and seconds queued at most, per URL name and HTTP method, for the
+# expensive routes (per process), so a GET and a POST to books-list each
+# have their own slots. Routes not listed, such as the detail reads, are
+# unlimited.
+ADMISSION_LIMITS = {
+    'books-list': {'concurrency': 8, 'queue': 16, 'max_wait': 1.0},
+    'books-search': {'concurrency': 4, 'queue': 8, 'max_wait': 1.0},
+    'books-export': {'concurrency': 2, 'queue': 2, 'max_wait': 2.0},
+    'books-bulk': {'concurrency': 2, 'queue': 4, 'max_wait': 2.0},
+    'author-upload-image': {'concurrency': 2, 'queue': 4, 'max_wait': 2.0},
+}
+
+# library.throttling.TokenBucketThrottle: (requests per second, burst) per
+# API token or user ('user') and per address ('anon'); None to not throttle.
+# Buckets are per process unless THROTTLE_CACHE_ALIAS names a shared cache.
+THROTTLE_BUCKETS = {
+    'user': (50, 200),
+    'anon': (20, 100),
 }
+THROTTLE_CACHE_ALIAS = None
+
+# Seconds the catalog statistics (/v1/stats and the list counts) are cached.
+STATS_CACHE_TIMEOUT = 60
 
 WSGI_APPLICATION = 'library_app.wsgi.application'
 
@@ -83,13 +170,118 @@ WSGI_APPLICATION = 'library_app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Configured from the environment: DB_ENGINE=postgresql with DB_NAME,
+# DB_USER, DB_PASSWORD, DB_HOST and DB_PORT, or SQLite at DB_NAME (defaults
+# to db.sqlite3). Connections are kept for DB_CONN_MAX_AGE seconds and
+# checked before reuse.
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite3')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'library'),
+            'USER': os.environ.get('DB_USER', ''),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', ''),
+            'PORT': os.environ.get('DB_PORT', ''),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    # psycopg 3 connection pool (Django 5.1+). The pool owns reuse, so
+    # persistent connections are turned off. With the Django 4.1 pinned in
+    # requirements.txt DB_POOL has no effect: put PgBouncer in front instead.
+    if os.environ.get('DB_POOL') == '1' and django.VERSION >= (5, 1):
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
     }
+    # Take the write lock when a transaction starts, so busy_timeout applies
+    # instead of a read-to-write upgrade failing at once with "database is
+    # locked". Django 5.1 has an option for it; before that library.db
+    # issues the BEGIN IMMEDIATE itself.
+    SQLITE_TRANSACTION_MODE = 'IMMEDIATE'
+    if django.VERSION >= (5, 1):
+        DATABASES['default']['OPTIONS']['transaction_mode'] = SQLITE_TRANSACTION_MODE
+
+# Read replicas: DB_REPLICAS lists replica hosts (PostgreSQL) or files
+# (SQLite), comma-separated. Safe catalog requests read from them, except for
+# REPLICA_LAG seconds after the same client wrote (see library.routers).
+DATABASE_REPLICAS = []
+for index, location in enumerate(filter(None, os.environ.get('DB_REPLICAS', '').split(','))):
+    alias = f'replica{index + 1}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST' if DB_ENGINE == 'postgresql' else 'NAME': location.strip(),
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['library.routers.ReplicaRouter']
+REPLICA_LAG = int(os.environ.get('DB_REPLICA_LAG', 5))
+
+# Applied to every new SQLite connection by library.db. WAL lets readers
+# run alongside the writer, NORMAL syncs at checkpoints rather than every
+# commit (still safe in WAL mode), and busy_timeout makes writers wait for
+# the lock instead of failing with "database is locked".
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': int(os.environ.get('DB_SQLITE_BUSY_TIMEOUT', 5000)),
+    'mmap_size': int(os.environ.get('DB_SQLITE_MMAP_SIZE', 256 * 2 ** 20)),
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+# 'api' holds serialized list/detail responses. Local memory is per process;
+# point it at a shared backend (Redis, Memcached) when running several
+# workers so invalidations reach all of them.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+    'auth': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'auth',
+        'TIMEOUT': 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
 }
 
+API_CACHE_ALIAS = 'api'
+AUTH_TOKEN_CACHE_ALIAS = 'auth'
+# Read-your-writes pins for API clients (library.middleware.ReplicaRoutingMiddleware).
+# Like the response cache, it must be shared by all workers in production.
+REPLICA_PIN_CACHE_ALIAS = API_CACHE_ALIAS
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -131,6 +323,23 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = '/vol/web/media'
 STATIC_ROOT = '/vol/web/static'
 
+# Serve MEDIA_URL from Django (library.views.media). Content-addressed images
+# are cached for a year; everything else for MEDIA_MAX_AGE seconds.
+SERVE_MEDIA = True
+MEDIA_MAX_AGE = 3600
+# None streams files from Django; 'x-accel-redirect' (nginx, internal location
+# MEDIA_ACCEL_PREFIX aliased to MEDIA_ROOT) or 'x-sendfile' (Apache, lighttpd)
+# hand the transfer to the front-end server.
+MEDIA_ACCEL_REDIRECT = None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+# Author uploads are decoded and thumbnailed in a background thread pool.
+AUTHOR_THUMBNAIL_SIZES = (64, 256, 512)
+IMAGE_WORKERS = 2
+IMAGE_PROCESSING_EAGER = False
+# Unreferenced images younger than this (seconds) are left to gc_images.
+IMAGE_GC_GRACE = 3600
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
@@ -13,16 +13,32 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
-from django.urls import path, include
-from django.conf.urls.static import static
+from django.apps import apps
+from django.urls import path, include, re_path
 from rest_framework.authtoken import views
 from library import urls as library_url
+from library.views.media import serve_media
+from library.views.metrics import serve_metrics
 from django.conf import settings
 
 
 urlpatterns = [
     path('', include(library_url)),
-    path('admin/', admin.site.urls),
     path('api-token-auth/', views.obtain_auth_token),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+# Not in the API-only settings (library_app.settings_api).
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns.insert(1, path('admin/', admin.site.urls))
+
+if settings.SERVE_METRICS:
+    urlpatterns.append(path('metrics', serve_metrics, name='metrics'))
+
+# Left to the front-end server when it serves MEDIA_ROOT itself (or MEDIA_URL
+# points elsewhere); MEDIA_ACCEL_REDIRECT is the middle ground.
+if settings.SERVE_MEDIA and not settings.MEDIA_URL.startswith(('http://', 'https://', '//')):
+    urlpatterns.append(
+        re_path(rf'^{settings.MEDIA_URL.lstrip("/")}(?P<path>.+)$', serve_media, name='media'),
+    )